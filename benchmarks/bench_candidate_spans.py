@@ -0,0 +1,94 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 18:00
+# File Name: bench_candidate_spans.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+对比逐个枚举 n-gram 再过滤，与 _candidate_spans 自左向右剪枝延伸两种候选短语生成方式
+在长句（无标点的列表、法律文本、表格残留等）上的耗时，并校验二者结果一致。
+
+    $ python benchmarks/bench_candidate_spans.py
+
+"""
+
+import time
+import argparse
+
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+
+
+SAMPLE_TEXT = (
+    '法国媒体最新披露巴黎圣母院火灾当晚第一次消防警报响起时负责查验的保安找错了位置'
+    '因而可能贻误了救火的最佳时机据法国电视台报道巴黎圣母院起火之初教堂内的烟雾报警器两次示警'
+    '值班人员响应警报前往电脑指示地点查看但没有发现火情警报再次响起保安赶到教堂顶部确认起火'
+    '调查人员在巴黎圣母院顶部施工工地上找到了烟头但并未得出乱扔烟头引发火灾的结论'
+    '聚氯乙烯树脂塑料制品切割工具人造革人造金刚石农药针纺织品自产自销')
+
+
+def naive_candidate_spans(extractor, sen_segs, stricted_pos=True, func_word_num=1,
+                          stop_word_num=0, max_phrase_len=25):
+    ''' 原先的做法：枚举全部 n-gram 切片，再逐一用规则过滤 '''
+    spans = list()
+    sen_length = len(sen_segs)
+    for n in range(1, sen_length + 1):
+        for i in range(0, sen_length - n + 1):
+            candidate_phrase = sen_segs[i: i + n]
+            if extractor.extra_date_ptn.match(candidate_phrase[-1][0]) is not None:
+                continue
+            if not stricted_pos:
+                rule_flag = extractor._loose_candidate_phrases_rules(
+                    candidate_phrase, func_word_num=func_word_num,
+                    max_phrase_len=max_phrase_len, stop_word_num=stop_word_num)
+            else:
+                rule_flag = extractor._stricted_candidate_phrases_rules(
+                    candidate_phrase, max_phrase_len=max_phrase_len)
+            if not rule_flag:
+                continue
+            if any(extractor._is_redundant_word(item[0]) for item in candidate_phrase):
+                continue
+            spans.append((n, i))
+    return spans
+
+
+def timeit(func, repeat):
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        res = func()
+    return (time.perf_counter() - begin) / repeat, res
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--lengths', type=int, nargs='+', default=[50, 200, 800, 2000],
+                        help='句子长度（token 数）')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    extractor = ChineseKeyPhrasesExtractor()
+    tokens = extractor.seg.cut(SAMPLE_TEXT)
+
+    print('{:>8} {:>8} {:>12} {:>12} {:>8}'.format(
+        'tokens', 'rule', 'naive(ms)', 'pruned(ms)', 'speedup'))
+    for length in args.lengths:
+        sen_segs = (tokens * (length // len(tokens) + 1))[:length]
+        for stricted_pos in [True, False]:
+            naive_cost, naive_spans = timeit(
+                lambda: naive_candidate_spans(extractor, sen_segs, stricted_pos=stricted_pos),
+                args.repeat)
+            token_features = extractor._token_features(
+                sen_segs, [0.0] * len(sen_segs), allow_topic_weight=False)
+            pruned_cost, pruned_spans = timeit(
+                lambda: extractor._candidate_spans(token_features, stricted_pos=stricted_pos),
+                args.repeat)
+            pruned_spans = [(span[0], span[1]) for span in pruned_spans]
+            assert naive_spans == pruned_spans, 'candidate spans are not identical.'
+
+            print('{:>8} {:>8} {:>12.2f} {:>12.2f} {:>7.1f}x'.format(
+                length, 'strict' if stricted_pos else 'loose',
+                naive_cost * 1000, pruned_cost * 1000, naive_cost / pruned_cost))
+
+
+if __name__ == '__main__':
+    main()
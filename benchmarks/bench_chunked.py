@@ -0,0 +1,90 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 19:00
+# File Name: bench_chunked.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+将生成的语料拼接为一篇超长文本，对比逐篇抽取 extract_keyphrase 与不同进程数下
+分块抽取 extract_keyphrase_chunked 的耗时、主进程峰值内存（tracemalloc），以及
+top_k 短语与逐篇抽取结果的重合度、权重的最大相对误差。
+
+    $ python benchmarks/bench_chunked.py --num 2000 --n-jobs 1 2 4 8 --top-k 20
+    $ python benchmarks/bench_chunked.py --corpus report.jsonl --chunk-top-n -1 -o chunked.json
+
+"""
+
+import json
+import time
+import argparse
+import tracemalloc
+
+from corpus import generate_corpus, load_corpus
+
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+
+
+def measure(func):
+    ''' 返回 (结果, 耗时秒数, 峰值内存 MB)，tracemalloc 会显著拖慢运行，故计时与内存分两次运行 '''
+    begin = time.perf_counter()
+    result = func()
+    cost = time.perf_counter() - begin
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return result, cost, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', default=None,
+                        help='jsonl 语料路径，默认由 corpus.py 按随机种子生成')
+    parser.add_argument('--num', type=int, default=1000, help='生成语料的篇数')
+    parser.add_argument('--seed', type=int, default=7, help='生成语料的随机种子')
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--n-jobs', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--chunk-size', type=int, default=50000, help='每块的字数')
+    parser.add_argument('--chunk-top-n', type=int, default=None,
+                        help='每块保留的候选短语数，-1 表示全部保留')
+    parser.add_argument('-o', '--output', default=None, help='json 结果输出路径')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus is not None \
+        else generate_corpus(num=args.num, seed=args.seed)
+    text = '\n'.join(item['text'] for item in corpus)
+    extractor = ChineseKeyPhrasesExtractor().warmup()
+
+    reference, cost, peak = measure(
+        lambda: extractor.extract_keyphrase(text, top_k=args.top_k, with_weight=True))
+    result = {'chars': len(text), 'top_k': args.top_k, 'chunk_size': args.chunk_size,
+              'chunk_top_n': args.chunk_top_n,
+              'serial': {'seconds': cost, 'peak_mb': peak}, 'chunked': dict()}
+    print('{:<8} {:>10} {:>10} {:>9} {:>9}'.format(
+        'n_jobs', 'seconds', 'peak_mb', 'overlap', 'max_err'))
+    print('{:<8} {:>10.2f} {:>10.1f} {:>9} {:>9}'.format('serial', cost, peak, '-', '-'))
+
+    reference = dict(reference)
+    for n_jobs in args.n_jobs:
+        phrases, cost, peak = measure(lambda: extractor.extract_keyphrase_chunked(
+            text, top_k=args.top_k, with_weight=True, n_jobs=n_jobs,
+            chunk_size=args.chunk_size, chunk_top_n=args.chunk_top_n))
+        phrases = dict(phrases)
+        common = set(reference) & set(phrases)
+        stats = {'seconds': cost, 'peak_mb': peak,
+                 'overlap': len(common) / len(reference) if reference else None,
+                 'max_relative_error': max(
+                     [abs(phrases[p] - reference[p]) / reference[p] for p in common] or [0.0])}
+        result['chunked'][n_jobs] = stats
+        print('{:<8} {:>10.2f} {:>10.1f} {:>9.3f} {:>9.4f}'.format(
+            n_jobs, cost, peak, stats['overlap'] or 0.0, stats['max_relative_error']))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
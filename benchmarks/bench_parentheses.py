@@ -0,0 +1,122 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/18 10:00
+# File Name: bench_parentheses.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+对比原先的文本预处理（依次去除异常字符、冗余字符，再反复用正则去除最内层括号直至文本
+不再变化）与 _preprocessing_text（_char_normalize_ptn 一次 sub，_remove_parentheses
+线性去除括号）的耗时，并在随机生成的嵌套、交叉、不成对括号文本上校验二者输出逐字节一致。
+
+    $ python benchmarks/bench_parentheses.py --num 20000 --depths 10 100 1000 5000
+
+"""
+
+import time
+import random
+import argparse
+
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+
+
+SAMPLE_TEXT = (
+    '大火发生当天（15日）晚上，巴黎检察机关便以“因火灾导致过失损毁”为由展开司法调查。'
+    '农药（不含危险化学品）、针纺织品自产自销【来源：新华社】<br>据报道[1]，{模板}「引用」。')
+
+CHARS = '巴黎圣母院火灾调查人员，。、'
+REDUNDANT_CHARS = ' -\t\n啊哈呀~'
+EXCEPTION_CHARS = 'éß☃ \U0001f600'
+
+# 默认括号之外，另测一组左右括号相同（引号）的配置
+PARENTHESES_CONFIGS = ['{}「」[]【】()（）<>', '()（）""「」']
+
+
+def original_preprocessing(extractor, text):
+    ''' 原先的做法：两次 sub 去除异常字符与冗余字符，再逐层去除括号 '''
+    text = extractor.exception_char_ptn.sub('', text)
+    text = extractor.redundant_char_ptn.sub('', text)
+    length = len(text)
+    while True:
+        text = extractor.remove_parentheses_ptn.sub('', text)
+        if len(text) == length:
+            break
+        length = len(text)
+    return text
+
+
+def random_text(rnd, parentheses, length):
+    ''' 随机混合普通字符、冗余字符、异常字符与各类括号，括号可交叉、不成对 '''
+    pool = CHARS * 3 + REDUNDANT_CHARS + EXCEPTION_CHARS + parentheses * 2
+    return ''.join(rnd.choice(pool) for _ in range(length))
+
+
+def nested_text(rnd, parentheses, depth, balanced=True):
+    ''' 生成 depth 层随机类型的嵌套括号，balanced 为 False 时随机丢弃部分右括号 '''
+    pairs = [parentheses[i: i + 2] for i in range(0, len(parentheses), 2)]
+    stack = [rnd.choice(pairs) for _ in range(depth)]
+    pieces = [pair[0] + rnd.choice(CHARS) for pair in stack]
+    for pair in reversed(stack):
+        if balanced or rnd.random() < 0.8:
+            pieces.append(rnd.choice(CHARS) + pair[1])
+    return ''.join(pieces)
+
+
+def check_identical(extractor, texts):
+    for text in texts:
+        expected = original_preprocessing(extractor, text)
+        result = extractor._preprocessing_text(text)
+        assert result.encode('utf-8') == expected.encode('utf-8'), \
+            'preprocessed text is not identical: {!r}'.format(text)
+    return len(texts)
+
+
+def timeit(func, repeat):
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        res = func()
+    return (time.perf_counter() - begin) / repeat, res
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num', type=int, default=20000, help='每种配置下随机校验的文本数')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--depths', type=int, nargs='+', default=[10, 100, 1000, 5000],
+                        help='计时所用的括号嵌套层数')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    extractor = ChineseKeyPhrasesExtractor()
+
+    # 校验：随机文本、平衡与不平衡的嵌套括号、交叉括号，各括号配置分别检查
+    for parentheses in PARENTHESES_CONFIGS:
+        extractor._update_parentheses_ptn(parentheses)
+        texts = [SAMPLE_TEXT, '{[（}）]', '((（)）)', '】【】【', '（（（）', '(a[b)c]d)']
+        texts.extend(random_text(rnd, parentheses, rnd.randint(0, 60)) for _ in range(args.num))
+        texts.extend(nested_text(rnd, parentheses, rnd.randint(1, 30), balanced=idx % 2 == 0)
+                     for idx in range(args.num // 10))
+        print('{:<24} {:>8} texts identical'.format(
+            repr(parentheses), check_identical(extractor, texts)))
+    extractor._update_parentheses_ptn(PARENTHESES_CONFIGS[0])
+
+    print('{:>8} {:>10} {:>14} {:>12} {:>8}'.format(
+        'depth', 'balanced', 'original(ms)', 'linear(ms)', 'speedup'))
+    for depth in args.depths:
+        for balanced in [True, False]:
+            text = SAMPLE_TEXT + nested_text(rnd, PARENTHESES_CONFIGS[0], depth, balanced=balanced)
+            original_cost, expected = timeit(
+                lambda: original_preprocessing(extractor, text), args.repeat)
+            linear_cost, result = timeit(
+                lambda: extractor._preprocessing_text(text), args.repeat)
+            assert result.encode('utf-8') == expected.encode('utf-8'), \
+                'preprocessed text is not identical.'
+            print('{:>8} {:>10} {:>14.2f} {:>12.2f} {:>7.1f}x'.format(
+                depth, str(balanced), original_cost * 1000, linear_cost * 1000,
+                original_cost / linear_cost))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 10:30
+# File Name: bench_pipeline.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+关键短语抽取全流程的基准测试，结果写为 json，便于不同提交之间对比：
+    1、冷启动：新进程中 import ckpe 并加载模型的耗时；
+    2、分阶段耗时：清洗、分句、分词、词权重、候选短语、MMR 去重、排序，
+       各阶段与整篇耗时给出 mean/p50/p95/p99，并按文本长度类别分别统计；
+    3、吞吐量：串行逐篇抽取，以及 extract_keyphrase_batch 并行抽取的 篇/秒、字/秒；
+    4、峰值内存：进程的最大常驻内存（RSS）。
+
+    $ python benchmarks/bench_pipeline.py -o result_new.json
+    $ python benchmarks/bench_pipeline.py --corpus bench_corpus.jsonl --n-jobs 4 -o result.json
+    $ python benchmarks/compare.py result_old.json result_new.json
+
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import resource
+import subprocess
+
+from corpus import generate_corpus, load_corpus, LENGTH_BUCKETS
+
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+from ckpe.instrument import new_document_stats
+
+
+STAGES = ['preprocess', 'split', 'segment', 'weight', 'candidate', 'mmr', 'sort']
+
+
+def percentile(values, q):
+    ''' 线性插值的分位数 '''
+    if not values:
+        return None
+    values = sorted(values)
+    pos = (len(values) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+def summarize(values):
+    ''' 秒 -> 毫秒的统计量 '''
+    if not values:
+        return {'count': 0}
+    return {'count': len(values),
+            'mean_ms': sum(values) / len(values) * 1000,
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'max_ms': max(values) * 1000}
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    ''' linux 下 ru_maxrss 单位为 KB，mac 下为字节 '''
+    maxrss = resource.getrusage(who).ru_maxrss
+    if sys.platform == 'darwin':
+        return maxrss / 1024 / 1024
+    return maxrss / 1024
+
+
+def measure_cold_start(repeat, model_bundle=None):
+    ''' 在新进程中测量 import 与模型加载耗时，模型为懒加载，故调用 warmup 加载全部资源 '''
+    code = ('import time; begin = time.perf_counter(); import ckpe; '
+            'ckpe.ckpe(model_bundle={!r}).warmup(); print(time.perf_counter() - begin)').format(model_bundle)
+    costs = list()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], check=True,
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+        costs.append(float(output.strip().splitlines()[-1]))
+    return summarize(costs)
+
+
+def run_stages(extractor, text):
+    """
+    逐阶段执行与 _extract_keyphrase 相同的流程，返回 (各阶段耗时, 排序结果)，
+    与 extract_keyphrase(top_k=-1, with_weight=True) 的结果一致
+    """
+    costs = dict()
+    pos_name_set, stricted_pos_name_set, pos_exception_set = extractor._pos_name_sets()
+
+    begin = time.perf_counter()
+    text = extractor._preprocessing_text(text)
+    costs['preprocess'] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    sentences_list = extractor._split_sentences(text)
+    costs['split'] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    sentences_segs_list = extractor._cut_batch(sentences_list)
+    costs['segment'] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    sentences_segs_weights_list = extractor._word_weights(sentences_segs_list, pos_name_set)
+    costs['weight'] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    candidate_phrases_dict = extractor._candidate_phrases(
+        sentences_segs_list, sentences_segs_weights_list,
+        pos_sets=(stricted_pos_name_set, pos_exception_set))
+    costs['candidate'] = time.perf_counter() - begin
+
+    # mmr 去重与排序的耗时由 _finalize_candidates 记入单篇统计
+    doc_stats = new_document_stats()
+    ranked_phrases = extractor._finalize_candidates(
+        candidate_phrases_dict.items(), doc_stats=doc_stats)
+    costs['mmr'] = doc_stats['steps']['mmr']
+    costs['sort'] = doc_stats['steps']['sort']
+
+    return costs, ranked_phrases
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              universal_newlines=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', default=None,
+                        help='jsonl 语料路径，默认由 corpus.py 按随机种子生成')
+    parser.add_argument('--num', type=int, default=200, help='生成语料的篇数')
+    parser.add_argument('--seed', type=int, default=7, help='生成语料的随机种子')
+    parser.add_argument('--repeat', type=int, default=3, help='每篇文本重复测量的次数，取最小值')
+    parser.add_argument('--cold-start-repeat', type=int, default=3)
+    parser.add_argument('--n-jobs', type=int, nargs='*', default=[],
+                        help='额外测量 extract_keyphrase_batch 并行吞吐量的进程数')
+    parser.add_argument('--model-bundle', default=None,
+                        help='由 python -m ckpe.bundle 编译的二进制模型包路径')
+    parser.add_argument('-o', '--output', default=None, help='json 结果输出路径')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus is not None \
+        else generate_corpus(num=args.num, seed=args.seed)
+    total_chars = sum(len(item['text']) for item in corpus)
+
+    result = {
+        'meta': {'commit': git_commit(), 'python': platform.python_version(),
+                 'platform': platform.platform(), 'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                 'corpus': args.corpus, 'num': len(corpus), 'seed': args.seed,
+                 'chars': total_chars, 'repeat': args.repeat}}
+
+    print('measuring cold start ...')
+    result['cold_start'] = measure_cold_start(args.cold_start_repeat, args.model_bundle)
+
+    # 模型为懒加载，先加载全部资源，使内存读数包含模型，且首篇文本的耗时不含加载
+    extractor = ChineseKeyPhrasesExtractor(model_bundle=args.model_bundle).warmup()
+    result['rss_after_load_mb'] = peak_rss_mb()
+
+    # 分阶段耗时，每篇重复 repeat 次取最小值，以减少调度噪声
+    print('measuring per-stage latency ...')
+    stage_costs = {stage: list() for stage in STAGES}
+    bucket_costs = {name: list() for name, _, _, _ in LENGTH_BUCKETS}
+    for item in corpus:
+        best = None
+        for _ in range(args.repeat):
+            costs, ranked_phrases = run_stages(extractor, item['text'])
+            if best is None or sum(costs.values()) < sum(best.values()):
+                best = costs
+        expected = extractor.extract_keyphrase(item['text'], top_k=-1, with_weight=True)
+        assert ranked_phrases == expected, 'stage-wise result differs from extract_keyphrase.'
+        for stage in STAGES:
+            stage_costs[stage].append(best[stage])
+        bucket_costs.setdefault(item['bucket'], list()).append(sum(best.values()))
+    result['stages'] = {stage: summarize(costs) for stage, costs in stage_costs.items()}
+    result['buckets'] = {bucket: summarize(costs) for bucket, costs in bucket_costs.items()}
+
+    # 端到端延迟与串行吞吐量
+    print('measuring end-to-end latency and throughput ...')
+    latencies = list()
+    begin = time.perf_counter()
+    for item in corpus:
+        doc_begin = time.perf_counter()
+        extractor.extract_keyphrase(item['text'])
+        latencies.append(time.perf_counter() - doc_begin)
+    elapsed = time.perf_counter() - begin
+    result['end_to_end'] = summarize(latencies)
+    result['throughput'] = {'serial': {'docs_per_s': len(corpus) / elapsed,
+                                       'chars_per_s': total_chars / elapsed}}
+
+    texts = [item['text'] for item in corpus]
+    for n_jobs in args.n_jobs:
+        begin = time.perf_counter()
+        extractor.extract_keyphrase_batch(texts, n_jobs=n_jobs, chunksize=4)
+        elapsed = time.perf_counter() - begin
+        result['throughput']['batch_{}'.format(n_jobs)] = {
+            'docs_per_s': len(corpus) / elapsed, 'chars_per_s': total_chars / elapsed}
+
+    result['peak_rss_mb'] = peak_rss_mb()
+    result['peak_rss_children_mb'] = peak_rss_mb(resource.RUSAGE_CHILDREN)
+
+    print('{:<12} {:>10} {:>10} {:>10} {:>10}'.format('stage', 'mean(ms)', 'p50', 'p95', 'p99'))
+    for name, stats in list(result['stages'].items()) + [('total', result['end_to_end'])]:
+        print('{:<12} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+            name, stats['mean_ms'], stats['p50_ms'], stats['p95_ms'], stats['p99_ms']))
+    for name, stats in result['throughput'].items():
+        print('{:<12} {:>10.1f} docs/s {:>12.1f} chars/s'.format(
+            name, stats['docs_per_s'], stats['chars_per_s']))
+    print('cold start p50: {:.1f} ms, peak rss: {:.1f} MB'.format(
+        result['cold_start']['p50_ms'], result['peak_rss_mb']))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 21:00
+# File Name: bench_segmentation.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+对比逐句调用 pkuseg 与 _cut_batch 批量分词（句子去重、pkuseg 多进程文件模式）
+在多篇文本上的分词吞吐量（句/秒），并校验二者结果一致。
+
+    $ python benchmarks/bench_segmentation.py --docs 2000 --nthread 1 4 8
+    $ python benchmarks/bench_segmentation.py --input corpus.txt  # 每行一篇文本
+
+"""
+
+import time
+import random
+import argparse
+
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+from ckpe.segmenter import PkusegSegmenter
+
+
+SAMPLE_TEXT = (
+    '法国媒体最新披露，巴黎圣母院火灾当晚，第一次消防警报响起时，负责查验的保安找错了位置，'
+    '因而可能贻误了救火的最佳时机。据法国BFMTV电视台报道，4月15日晚，巴黎圣母院起火之初，'
+    '教堂内的烟雾报警器两次示警。当晚18时20分，值班人员响应警报前往电脑指示地点查看，'
+    '但没有发现火情。20分钟后，警报再次响起，保安赶到教堂顶部确认起火。然而为时已晚，'
+    '火势已迅速蔓延开来。调查人员在巴黎圣母院顶部施工工地上找到了7个烟头，'
+    '但并未得出乱扔烟头引发火灾的结论。截至目前，警方尚未排除其它可能性。')
+
+
+def gen_documents(num, seed=7):
+    ''' 打乱样例文本的句子顺序生成多篇文本，句子间有重复，与新闻语料的情况类似 '''
+    rnd = random.Random(seed)
+    sentences = [sen + '。' for sen in SAMPLE_TEXT.split('。') if sen]
+    clauses = [clause for sen in sentences for clause in sen.split('，')]
+    documents = list()
+    for _ in range(num):
+        doc = rnd.sample(clauses, rnd.randint(3, len(clauses)))
+        # 部分子句拼接数字，模拟不重复的句子
+        documents.append('，'.join(clause + str(rnd.randint(0, 100)) if rnd.random() < 0.5
+                                  else clause for clause in doc))
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', default=None, help='语料文件，每行一篇文本')
+    parser.add_argument('--docs', type=int, default=2000, help='未指定 --input 时生成的文本篇数')
+    parser.add_argument('--nthread', type=int, nargs='+', default=[1, 4],
+                        help='pkuseg 文件模式的进程数')
+    args = parser.parse_args()
+
+    # 句子数很少时也使用文件模式，以便比较
+    extractor = ChineseKeyPhrasesExtractor(segmenter=PkusegSegmenter(min_file_mode_size=1))
+    if args.input is not None:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            documents = [line.strip() for line in f if line.strip()]
+    else:
+        documents = gen_documents(args.docs)
+
+    sentences = list()
+    for text in documents:
+        sentences.extend(extractor._split_sentences(extractor._preprocessing_text(text)))
+    print('documents: {}, sentences: {}, unique sentences: {}'.format(
+        len(documents), len(sentences), len(set(sentences))))
+
+    begin = time.perf_counter()
+    loop_segs = [extractor.seg.cut(sen) for sen in sentences]
+    loop_cost = time.perf_counter() - begin
+    print('{:<24} {:>12.1f} sentences/s'.format('per-sentence loop', len(sentences) / loop_cost))
+
+    for nthread in args.nthread:
+        begin = time.perf_counter()
+        batch_segs = extractor._cut_batch(sentences, nthread=nthread)
+        batch_cost = time.perf_counter() - begin
+        assert [list(map(tuple, segs)) for segs in batch_segs] == \
+            [list(map(tuple, segs)) for segs in loop_segs], 'segmentation results differ.'
+        print('{:<24} {:>12.1f} sentences/s  {:>5.1f}x'.format(
+            'batch nthread={}'.format(nthread), len(sentences) / batch_cost,
+            loop_cost / batch_cost))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 16:30
+# File Name: bench_segmenter.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+在同一份语料上对比不同分词后端（pkuseg、词典分词）：
+    1、分词吞吐量（句/秒、字/秒）与端到端抽取吞吐量（篇/秒）；
+    2、与第一个后端（默认 pkuseg）分词结果的一致程度：以词在句中的起止位置计算的分词 F1，
+       以及切分一致的词中词性相同的比例；
+    3、与第一个后端抽取结果的重合度：每篇 top_k 短语的 Jaccard 相似度，
+       以及第一个后端的短语被召回的比例，按篇平均。
+
+未指定 --pos-lexicon 时，词典分词的 POS 词典由 pkuseg 逐词标注词表得到。
+
+    $ python benchmarks/bench_segmenter.py --num 200 --top-k 10
+    $ python benchmarks/bench_segmenter.py --corpus bench_corpus.jsonl --pos-lexicon pos_lexicon.txt -o seg.json
+
+"""
+
+import json
+import time
+import argparse
+
+from corpus import generate_corpus, load_corpus
+
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+from ckpe.segmenter import DictionarySegmenter
+
+
+def run_backend(extractor, texts, top_k):
+    ''' 返回 (分词耗时, 句子数, 字数, 抽取耗时, 每篇的 top_k 短语, 每句的分词结果) '''
+    sentences = list()
+    for text in texts:
+        sentences.extend(extractor._split_sentences(extractor._preprocessing_text(text)))
+
+    begin = time.perf_counter()
+    segs_list = [extractor.seg.cut(sen) for sen in sentences]
+    seg_cost = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    phrases_list = [extractor.extract_keyphrase(text, top_k=top_k) for text in texts]
+    extract_cost = time.perf_counter() - begin
+    return seg_cost, len(sentences), sum(len(sen) for sen in sentences), \
+        extract_cost, phrases_list, segs_list
+
+
+def _spans(sen_segs):
+    ''' 词在去除空白后的句子中的 (起, 止, 词性) '''
+    spans = dict()
+    begin = 0
+    for word, pos in sen_segs:
+        spans[(begin, begin + len(word))] = pos
+        begin += len(word)
+    return spans
+
+
+def agreement(reference_segs_list, segs_list):
+    ''' 与参照分词结果比较，返回分词 F1 与切分一致的词中词性相同的比例 '''
+    common = reference_num = num = same_pos = 0
+    for reference_segs, sen_segs in zip(reference_segs_list, segs_list):
+        reference_spans, spans = _spans(reference_segs), _spans(sen_segs)
+        reference_num += len(reference_spans)
+        num += len(spans)
+        for span, pos in spans.items():
+            if span in reference_spans:
+                common += 1
+                same_pos += reference_spans[span] == pos
+    f1 = 2 * common / (reference_num + num) if reference_num + num else None
+    return {'seg_f1': f1, 'pos_accuracy': same_pos / common if common else None}
+
+
+def overlap(reference_list, phrases_list):
+    ''' 按篇平均的 Jaccard 相似度与召回率，两边均无短语的篇目不计入 '''
+    jaccards = list()
+    recalls = list()
+    for reference, phrases in zip(reference_list, phrases_list):
+        reference, phrases = set(reference), set(phrases)
+        if not reference and not phrases:
+            continue
+        common = len(reference & phrases)
+        jaccards.append(common / len(reference | phrases))
+        if reference:
+            recalls.append(common / len(reference))
+    return {'jaccard': sum(jaccards) / len(jaccards) if jaccards else None,
+            'recall': sum(recalls) / len(recalls) if recalls else None}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', default=None,
+                        help='jsonl 语料路径，默认由 corpus.py 按随机种子生成')
+    parser.add_argument('--num', type=int, default=200, help='生成语料的篇数')
+    parser.add_argument('--seed', type=int, default=7, help='生成语料的随机种子')
+    parser.add_argument('--top-k', type=int, default=10, help='比较重合度的短语个数')
+    parser.add_argument('--backends', nargs='+', default=['pkuseg', 'dictionary'],
+                        help='参与比较的分词后端，第一个作为重合度的参照')
+    parser.add_argument('--pos-lexicon', default=None,
+                        help='词典分词使用的 POS 词典，可由 python -m ckpe.segmenter 生成；'
+                             '默认由 pkuseg 逐词标注词表得到')
+    parser.add_argument('-o', '--output', default=None, help='json 结果输出路径')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus is not None \
+        else generate_corpus(num=args.num, seed=args.seed)
+    texts = [item['text'] for item in corpus]
+
+    result = {'num': len(texts), 'top_k': args.top_k, 'backends': dict()}
+    reference_list = None
+    reference_segs_list = None
+    print('{:<12} {:>14} {:>14} {:>10} {:>8} {:>8} {:>9} {:>9}'.format(
+        'backend', 'sentences/s', 'chars/s', 'docs/s', 'seg_f1', 'pos_acc', 'jaccard', 'recall'))
+    for backend in args.backends:
+        segmenter = backend
+        if backend == 'dictionary' and args.pos_lexicon is not None:
+            segmenter = DictionarySegmenter(pos_lexicon_path=args.pos_lexicon)
+        extractor = ChineseKeyPhrasesExtractor(segmenter=segmenter).warmup()
+
+        seg_cost, sentence_num, char_num, extract_cost, phrases_list, segs_list = run_backend(
+            extractor, texts, args.top_k)
+        if reference_list is None:
+            reference_list = phrases_list
+            reference_segs_list = segs_list
+        stats = {'sentences_per_s': sentence_num / seg_cost,
+                 'chars_per_s': char_num / seg_cost,
+                 'docs_per_s': len(texts) / extract_cost}
+        stats.update(agreement(reference_segs_list, segs_list))
+        stats.update(overlap(reference_list, phrases_list))
+        result['backends'][backend] = stats
+        print('{:<12} {:>14.1f} {:>14.1f} {:>10.1f} {:>8.3f} {:>8.3f} {:>9.3f} {:>9.3f}'.format(
+            backend, stats['sentences_per_s'], stats['chars_per_s'], stats['docs_per_s'],
+            stats['seg_f1'] or 0.0, stats['pos_accuracy'] or 0.0,
+            stats['jaccard'] or 0.0, stats['recall'] or 0.0))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 20:30
+# File Name: bench_session.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+模拟持续增长的文本（直播稿、讨论串）：将生成的语料逐篇追加，每追加一篇取一次关键短语，
+对比 KeyphraseSession 增量抽取与每次对全文重新调用 extract_keyphrase 的耗时，
+并检查二者 top_k 结果是否一致。
+
+    $ python benchmarks/bench_session.py --num 300 --every 20 -o session.json
+
+"""
+
+import json
+import time
+import argparse
+
+from corpus import generate_corpus, load_corpus
+
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--corpus', default=None,
+                        help='jsonl 语料路径，默认由 corpus.py 按随机种子生成')
+    parser.add_argument('--num', type=int, default=300, help='生成语料的篇数')
+    parser.add_argument('--seed', type=int, default=7, help='生成语料的随机种子')
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--every', type=int, default=20,
+                        help='每追加多少篇，与全文重新抽取对比一次')
+    parser.add_argument('-o', '--output', default=None, help='json 结果输出路径')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus is not None \
+        else generate_corpus(num=args.num, seed=args.seed)
+    texts = [item['text'] for item in corpus]
+    extractor = ChineseKeyPhrasesExtractor().warmup()
+    session = extractor.create_session(top_k=args.top_k)
+
+    checkpoints = list()
+    print('{:>6} {:>10} {:>12} {:>12} {:>8}'.format(
+        'docs', 'chars', 'session_ms', 'full_ms', 'same'))
+    for idx, text in enumerate(texts, 1):
+        begin = time.perf_counter()
+        session.append(text)
+        phrases = session.keyphrases()
+        session_cost = time.perf_counter() - begin
+        if idx % args.every and idx != len(texts):
+            continue
+
+        full_text = '\n'.join(texts[:idx])
+        begin = time.perf_counter()
+        full_phrases = extractor.extract_keyphrase(full_text, top_k=args.top_k)
+        full_cost = time.perf_counter() - begin
+        checkpoint = {'docs': idx, 'chars': len(full_text),
+                      'session_ms': session_cost * 1000, 'full_ms': full_cost * 1000,
+                      'same': phrases == full_phrases}
+        checkpoints.append(checkpoint)
+        print('{docs:>6} {chars:>10} {session_ms:>12.2f} {full_ms:>12.2f} {same!s:>8}'.format(
+            **checkpoint))
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'top_k': args.top_k, 'checkpoints': checkpoints}, f,
+                      ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 11:00
+# File Name: compare.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+对比两次 bench_pipeline.py 的 json 结果，列出各项指标的变化，
+变慢（或吞吐量下降）超过阈值的指标标记为 REGRESSION，存在时以返回码 1 退出。
+
+    $ python benchmarks/compare.py result_old.json result_new.json --threshold 0.1
+
+"""
+
+import sys
+import json
+import argparse
+
+
+def collect_metrics(result):
+    ''' 展开为 {指标名: (数值, 数值越大越好)} '''
+    metrics = dict()
+    for group in ['stages', 'buckets']:
+        for name, stats in result.get(group, dict()).items():
+            for key in ['p50_ms', 'p95_ms', 'p99_ms']:
+                if key in stats:
+                    metrics['{}.{}.{}'.format(group, name, key)] = (stats[key], False)
+    for key in ['p50_ms', 'p95_ms', 'p99_ms']:
+        for group in ['end_to_end', 'cold_start']:
+            if key in result.get(group, dict()):
+                metrics['{}.{}'.format(group, key)] = (result[group][key], False)
+    for name, stats in result.get('throughput', dict()).items():
+        metrics['throughput.{}.docs_per_s'.format(name)] = (stats['docs_per_s'], True)
+    if 'peak_rss_mb' in result:
+        metrics['peak_rss_mb'] = (result['peak_rss_mb'], False)
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('old', help='基准结果 json')
+    parser.add_argument('new', help='待对比结果 json')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='相对变化超过该比例视为性能退化')
+    args = parser.parse_args()
+
+    with open(args.old, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    old_metrics = collect_metrics(old)
+    new_metrics = collect_metrics(new)
+    print('{} -> {}'.format(old['meta'].get('commit'), new['meta'].get('commit')))
+    print('{:<36} {:>12} {:>12} {:>9}'.format('metric', 'old', 'new', 'change'))
+
+    regressions = 0
+    for name in sorted(set(old_metrics) & set(new_metrics)):
+        old_value, higher_better = old_metrics[name]
+        new_value, _ = new_metrics[name]
+        if not old_value:
+            continue
+        change = (new_value - old_value) / old_value
+        worse = -change if higher_better else change
+        flag = ''
+        if worse > args.threshold:
+            flag = 'REGRESSION'
+            regressions += 1
+        print('{:<36} {:>12.3f} {:>12.3f} {:>+8.1%} {}'.format(
+            name, old_value, new_value, change, flag))
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 10:00
+# File Name: corpus.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+生成可复现的基准测试语料：由若干篇样例文本的句子按固定随机种子重新组合，
+覆盖短标题到 50KB 长报告等不同长度，同一种子、同一参数生成的语料完全相同。
+
+    $ python benchmarks/corpus.py -o bench_corpus.jsonl --seed 7
+
+"""
+
+import json
+import random
+import argparse
+
+
+SAMPLE_TEXTS = [
+    '法国媒体最新披露，巴黎圣母院火灾当晚，第一次消防警报响起时，负责查验的保安找错了位置，'
+    '因而可能贻误了救火的最佳时机。据法国BFMTV电视台报道，4月15日晚，巴黎圣母院起火之初，'
+    '教堂内的烟雾报警器两次示警。当晚18时20分，值班人员响应警报前往电脑指示地点查看，'
+    '但没有发现火情。20分钟后，警报再次响起，保安赶到教堂顶部确认起火。然而为时已晚，'
+    '火势已迅速蔓延开来。报道援引火因调查知情者的话说，18时20分首次报警时，'
+    '监控系统侦测到的失火位置准确无误。当时没有发生电脑故障，而是负责现场查验的工作人员'
+    '走错了地方，因而属于人为失误。调查人员在巴黎圣母院顶部施工工地上找到了7个烟头，'
+    '但并未得出乱扔烟头引发火灾的结论。截至目前，警方尚未排除其它可能性。'
+    '大火发生当天（15日）晚上，巴黎检察机关便以“因火灾导致过失损毁”为由展开司法调查。'
+    '目前，巴黎司法警察共抽调50名警力参与调查工作。',
+    '朝鲜确认金正恩出访俄罗斯，将与普京举行会谈。朝中社报道，朝鲜国务委员会委员长金正恩'
+    '将应俄罗斯总统普京的邀请，于近日对俄罗斯进行访问。俄罗斯克里姆林宫此前证实，'
+    '金正恩将于本月下旬访俄，双方将在符拉迪沃斯托克举行会谈。俄方表示，会谈将重点讨论'
+    '朝鲜半岛核问题的政治外交解决方案。此前，普京曾通过朝方转交邀请金正恩访俄的亲笔信。'
+    '分析人士认为，最高司令官金正恩此次访问将为两国关系发展注入新的动力。',
+    '聚氯乙烯树脂、塑料制品、切割工具、人造革、人造金刚石、农药（不含危险化学品）、'
+    '针纺织品自产自销。经营本企业自产产品及相关技术的出口业务，经营本企业生产所需的原辅材料、'
+    '仪器仪表、机械设备、零配件及相关技术的进口业务。（依法须经批准的项目，经相关部门批准后'
+    '方可开展经营活动）',
+    '国务院下发通知，山西省法院、陕西省检察院、四川省法院、成都市教育局、北京市公安局、'
+    '上海市卫生健康委员会等单位联合开展专项检查工作。通知要求，各地区各部门要高度重视，'
+    '切实加强组织领导，明确责任分工，确保各项工作落到实处。检查结果将于年底前向社会公布。',
+]
+
+# (类别, 篇数占比, 最少字符数, 最多字符数)，长报告约 50KB（utf-8 下每个汉字 3 字节）
+LENGTH_BUCKETS = [
+    ('title', 0.3, 10, 50),
+    ('short', 0.35, 100, 800),
+    ('article', 0.25, 1000, 5000),
+    ('report', 0.1, 8000, 17000),
+]
+
+
+def _sentences():
+    sentences = list()
+    for text in SAMPLE_TEXTS:
+        sentences.extend(sen + '。' for sen in text.split('。') if sen)
+    return sentences
+
+
+def generate_corpus(num=200, seed=7):
+    """
+    生成可复现的语料
+    :param num: 文本篇数
+    :param seed: 随机种子
+    :return: [{'id': int, 'bucket': str, 'text': str}]
+    """
+    rnd = random.Random(seed)
+    sentences = _sentences()
+    corpus = list()
+    for idx in range(num):
+        bucket, _, min_len, max_len = rnd.choices(
+            LENGTH_BUCKETS, weights=[item[1] for item in LENGTH_BUCKETS])[0]
+        target_len = rnd.randint(min_len, max_len)
+        pieces = list()
+        length = 0
+        while length < target_len:
+            sen = rnd.choice(sentences)
+            # 替换部分数字，使重复的句子不完全相同
+            sen = ''.join(str(rnd.randint(0, 9)) if char.isdigit() else char for char in sen)
+            pieces.append(sen)
+            length += len(sen)
+        text = ''.join(pieces)[:target_len]
+        corpus.append({'id': idx, 'bucket': bucket, 'text': text})
+    return corpus
+
+
+def load_corpus(path):
+    ''' 读取 jsonl 语料，每行包含 text 字段，bucket 字段缺失时按长度划分 '''
+    corpus = list()
+    with open(path, 'r', encoding='utf-8') as f:
+        for idx, line in enumerate(f):
+            if line.strip() == '':
+                continue
+            item = json.loads(line)
+            text = item['text']
+            if 'bucket' not in item:
+                item['bucket'] = next(
+                    (name for name, _, _, max_len in LENGTH_BUCKETS if len(text) <= max_len),
+                    LENGTH_BUCKETS[-1][0])
+            item.setdefault('id', idx)
+            corpus.append(item)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-o', '--output', required=True, help='jsonl 输出路径')
+    parser.add_argument('--num', type=int, default=200, help='文本篇数')
+    parser.add_argument('--seed', type=int, default=7, help='随机种子')
+    args = parser.parse_args()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for item in generate_corpus(num=args.num, seed=args.seed):
+            f.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
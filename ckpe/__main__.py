@@ -0,0 +1,60 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 15:00
+# File Name: __main__.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+import sys
+import json
+import argparse
+
+from ckpe.cli import add_extraction_arguments, extraction_options
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m ckpe',
+        description='从语料中逐篇抽取中文关键短语，结果以 jsonl 格式输出。')
+    parser.add_argument('input', help='输入语料路径，每行一篇文本或一个 json，- 表示标准输入')
+    parser.add_argument('-o', '--output', default='-', help='输出路径，默认为标准输出')
+    parser.add_argument('--format', dest='input_format', choices=['line', 'jsonl'],
+                        default=None, help='输入格式，默认根据文件后缀判断')
+    parser.add_argument('--text-key', default='text', help='jsonl 中文本所在的字段名')
+    parser.add_argument('--id-key', default='id', help='jsonl 中文档 id 所在的字段名')
+    parser.add_argument('--model-bundle', default=None,
+                        help='由 python -m ckpe.bundle 编译的二进制模型包路径')
+    parser.add_argument('-j', '--n-jobs', type=int, default=1, help='进程数，-1 表示全部 cpu')
+    parser.add_argument('--window', type=int, default=64, help='处理中文本数的上限')
+    parser.add_argument('--ordered', action='store_true', help='按输入顺序输出结果')
+
+    # 与 extract_keyphrase 一致的参数
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--with-weight', action='store_true')
+    add_extraction_arguments(parser)
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+
+    from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+    ckpe_obj = ChineseKeyPhrasesExtractor(model_bundle=args.model_bundle)
+
+    results = ckpe_obj.extract_keyphrase_stream(
+        args.input, n_jobs=args.n_jobs, window=args.window, ordered=args.ordered,
+        input_format=args.input_format, text_key=args.text_key, id_key=args.id_key,
+        top_k=args.top_k, with_weight=args.with_weight, **extraction_options(args))
+
+    f = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        for doc_id, phrases in results:
+            f.write(json.dumps({'id': doc_id, 'phrases': phrases},
+                               ensure_ascii=False) + '\n')
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+if __name__ == '__main__':
+    main()
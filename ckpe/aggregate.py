@@ -0,0 +1,289 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 21:00
+# File Name: aggregate.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+语料级（一个信息流、一个话题簇、一天的新闻）关键短语汇总，map-reduce 方式计算。
+
+逐篇调用 extract_keyphrase(top_k=-1, with_weight=True) 再在外部合并，既慢又占内存，
+且每篇已做过的 mmr 去重在合并后还须重做。本模块：
+    1、map：每篇文本只执行 step1~step4，得到 mmr 去重之前的候选短语，累加进一个分片汇总
+       PhraseSummary：短语 -> (权重和, 文档频率, token 列表)；
+    2、分片汇总可序列化为 json，在进程间、机器间按任意顺序两两合并；
+    3、reduce：对合并后的汇总统一做一次 mmr 去重，按权重和排序。
+
+汇总中的短语数以 capacity 为上限：超过 2 * capacity 时只保留权重和最高的 capacity 个，
+被剪掉的最大权重和累加进 error。任一短语的真实权重和不超过汇总中的值（未出现时为 0）加上
+error，权重和高于 error 的短语不会被遗漏。
+
+权重和以互不重叠的浮点数分量精确累加（Shewchuk 算法，与 math.fsum 相同），取值时用 fsum
+舍入，结果不受浮点加法顺序影响。未发生剪枝时，合并结果与合并顺序无关。
+
+使用方法：
+    $ python -m ckpe.aggregate shard_0.jsonl -o summary_0.json -j 8 --max-phrase-len 12
+    $ python -m ckpe.aggregate --merge summary_*.json -o day.json --top-k 50
+    >>> summary = summarize_documents(ckpe_obj, texts, n_jobs=8)
+    >>> summary.merge(PhraseSummary.load('summary_1.json'))
+    >>> summary.keyphrases(top_k=50, with_weight=True)
+
+"""
+
+import sys
+import json
+import math
+import heapq
+import logging
+import argparse
+from itertools import islice
+
+from ckpe import parallel
+from ckpe import stream
+from ckpe.cli import add_extraction_arguments, extraction_options
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_VERSION = 2
+
+
+def _add_partials(partials, x):
+    """
+    将 x 精确累加进 partials，partials 为互不重叠、按绝对值升序的浮点数分量，
+    其精确和即为全部累加值之和，math.fsum(partials) 得到正确舍入的结果
+    """
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+
+
+class PhraseSummary(object):
+    """
+    可合并、可序列化的短语汇总
+    :param capacity: 剪枝后保留的短语数，汇总中最多保存 2 * capacity 个短语
+    """
+    def __init__(self, capacity=100000):
+        if capacity < 1:
+            raise ValueError('`capacity` must be a positive integer.')
+        self.capacity = capacity
+        self.entries = dict()  # 短语 -> [权重和的精确分量, 文档频率, token 列表]
+        self.doc_num = 0
+        self.error = 0.0  # 被剪掉的权重和的上界
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, phrase):
+        return phrase in self.entries
+
+    def get(self, phrase):
+        ''' 返回 (权重和, 文档频率, token 列表)，不存在时返回 None '''
+        entry = self.entries.get(phrase)
+        return None if entry is None else (math.fsum(entry[0]), entry[1], entry[2])
+
+    def add_document(self, candidate_phrases_dict):
+        """
+        累加一篇文本的候选短语
+        :param candidate_phrases_dict: {短语: [token 列表, 权重]}，即 _extract_candidates 的返回值
+        """
+        entries = self.entries
+        for phrase, (tokens, weight) in candidate_phrases_dict.items():
+            if weight <= 0:
+                continue
+            entry = entries.get(phrase)
+            if entry is None:
+                entries[phrase] = [[weight], 1, [tuple(token) for token in tokens]]
+            else:
+                _add_partials(entry[0], weight)
+                entry[1] += 1
+        self.doc_num += 1
+        if len(entries) > 2 * self.capacity:
+            self.prune()
+
+    def merge(self, other):
+        """
+        将另一个汇总合并进来，满足结合律与交换律（剪枝时结果在 error 范围内一致）
+        :return: self
+        """
+        entries = self.entries
+        for phrase, (partials, doc_freq, tokens) in other.entries.items():
+            entry = entries.get(phrase)
+            if entry is None:
+                entries[phrase] = [list(partials), doc_freq, tokens]
+            else:
+                for x in partials:
+                    _add_partials(entry[0], x)
+                entry[1] += doc_freq
+        self.doc_num += other.doc_num
+        self.error += other.error
+        if len(entries) > 2 * self.capacity:
+            self.prune()
+        return self
+
+    def prune(self):
+        ''' 只保留权重和最高的 capacity 个短语 '''
+        if len(self.entries) <= self.capacity:
+            return
+        top_items = heapq.nlargest(
+            self.capacity + 1, self.entries.items(), key=lambda item: math.fsum(item[1][0]))
+        self.error += math.fsum(top_items.pop()[1][0])
+        self.entries = dict(top_items)
+
+    def keyphrases(self, top_k=50, with_weight=False):
+        """
+        对汇总中的短语统一做一次 mmr 去重，按权重和降序返回
+        :param top_k: 返回的短语数，-1 返回所有短语
+        :param with_weight: 是否返回权重和
+        """
+        # token 数相同的短语按权重和、短语排序，使结果与合并顺序无关
+        candidate_phrases_list = sorted(
+            ((phrase, [entry[2], math.fsum(entry[0])]) for phrase, entry in self.entries.items()),
+            key=lambda item: (-len(item[1][0]), -item[1][1], item[0]))
+        return ChineseKeyPhrasesExtractor._finalize_candidates(
+            candidate_phrases_list, top_k=top_k, with_weight=with_weight)
+
+    def to_dict(self):
+        ''' 先剪枝至 capacity 个短语，再转为可 json 序列化的 dict，权重和保存全部精确分量 '''
+        self.prune()
+        return {'version': SUMMARY_VERSION, 'capacity': self.capacity,
+                'doc_num': self.doc_num, 'error': self.error,
+                'entries': [[phrase, partials, doc_freq, tokens]
+                            for phrase, (partials, doc_freq, tokens) in self.entries.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        version = data.get('version')
+        if version not in (1, SUMMARY_VERSION):
+            raise ValueError('unsupported summary version: {}.'.format(version))
+        summary = cls(capacity=data['capacity'])
+        summary.doc_num = data['doc_num']
+        summary.error = data['error']
+        for phrase, weight, doc_freq, tokens in data['entries']:
+            if version == 1:  # 版本 1 只保存舍入后的权重和
+                weight = [weight]
+            summary.entries[phrase] = [weight, doc_freq, [tuple(token) for token in tokens]]
+        return summary
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+
+def summarize_chunk(extractor, texts, options, capacity=100000):
+    """
+    汇总一块文本的候选短语，非法文本记入日志后跳过
+    :param options: 由 extractor._bind_options 补全、_compile_lexicon 编译的抽取参数
+    """
+    summary = PhraseSummary(capacity=capacity)
+    for text in texts:
+        try:
+            candidate_phrases_dict = extractor._extract_candidates(
+                extractor._preprocessing_text(text), **options)
+        except Exception as e:
+            logger.warning('the text is not legal. %s: %s', type(e).__name__, e)
+            continue
+        summary.add_document(candidate_phrases_dict)
+    return summary
+
+
+def _summarize_worker(texts, options, capacity):
+    return summarize_chunk(parallel._worker_extractor, texts, options, capacity=capacity)
+
+
+def summarize_documents(extractor, documents, capacity=100000, n_jobs=1,
+                        chunk_size=256, **kwargs):
+    """
+    流式汇总语料中的关键短语，各块的汇总在主进程合并
+    :param extractor: ChineseKeyPhrasesExtractor 对象
+    :param documents: 文本的可迭代对象
+    :param capacity: 汇总保留的短语数
+    :param n_jobs: 进程数，为 1 时在当前进程处理，-1 或 None 表示使用全部 cpu
+    :param chunk_size: 每块的文档数
+    :param kwargs: 与 extract_keyphrase 的参数一致，top_k、with_weight 无效
+    :return: PhraseSummary 对象
+    """
+    options = extractor._compile_lexicon(extractor._bind_options(kwargs)[2])
+    summary = PhraseSummary(capacity=capacity)
+    documents = iter(documents)
+    chunks = iter(lambda: list(islice(documents, chunk_size)), [])
+    n_jobs = parallel.get_n_jobs(n_jobs)
+    if n_jobs == 1:
+        for chunk in chunks:
+            summary.merge(summarize_chunk(extractor, chunk, options, capacity=capacity))
+        return summary
+
+    with parallel.create_pool(extractor, n_jobs) as pool:
+        for chunk_summary in parallel.imap_bounded(
+                pool, _summarize_worker,
+                ((chunk, options, capacity) for chunk in chunks), 2 * n_jobs):
+            summary.merge(chunk_summary)
+    return summary
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m ckpe.aggregate',
+        description='汇总语料的关键短语，生成可合并的分片汇总，或合并多个分片汇总。')
+    parser.add_argument('inputs', nargs='+',
+                        help='输入语料路径，每行一篇文本或一个 json，- 表示标准输入；'
+                             '指定 --merge 时为分片汇总的 json 文件')
+    parser.add_argument('--merge', action='store_true', help='合并多个分片汇总')
+    parser.add_argument('-o', '--output', default=None, help='汇总的 json 输出路径')
+    parser.add_argument('--top-k', type=int, default=None,
+                        help='输出权重和最高的短语，每行格式为 `短语\\t权重和\\t文档频率`')
+    parser.add_argument('--capacity', type=int, default=100000, help='汇总保留的短语数')
+    parser.add_argument('--format', dest='input_format', choices=['line', 'jsonl'],
+                        default=None, help='输入格式，默认根据文件后缀判断')
+    parser.add_argument('--text-key', default='text', help='jsonl 中文本所在的字段名')
+    parser.add_argument('--model-bundle', default=None,
+                        help='由 python -m ckpe.bundle 编译的二进制模型包路径')
+    parser.add_argument('-j', '--n-jobs', type=int, default=1, help='进程数，-1 表示全部 cpu')
+    parser.add_argument('--chunk-size', type=int, default=256, help='每块的文档数')
+
+    # 与 python -m ckpe 一致的抽取参数，指定 --merge 时无效
+    add_extraction_arguments(parser)
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+
+    if args.merge:
+        summary = PhraseSummary(capacity=args.capacity)
+        for path in args.inputs:
+            summary.merge(PhraseSummary.load(path))
+    else:
+        extractor = ChineseKeyPhrasesExtractor(model_bundle=args.model_bundle)
+        summary = PhraseSummary(capacity=args.capacity)
+        for path in args.inputs:
+            documents = (text for _, text in stream.read_documents(
+                path, input_format=args.input_format, text_key=args.text_key))
+            summary.merge(summarize_documents(
+                extractor, documents, capacity=args.capacity,
+                n_jobs=args.n_jobs, chunk_size=args.chunk_size, **extraction_options(args)))
+
+    if args.output is not None:
+        summary.save(args.output)
+    if args.top_k is not None:
+        for phrase, weight in summary.keyphrases(top_k=args.top_k, with_weight=True):
+            sys.stdout.write('{}\t{:.6f}\t{}\n'.format(phrase, weight, summary.get(phrase)[1]))
+
+
+if __name__ == '__main__':
+    main()
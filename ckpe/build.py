@@ -0,0 +1,315 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 22:00
+# File Name: build.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+由自有语料统计词汇的文档频率，生成 extractor 加载的 idf.txt 与 stop_word.txt。
+
+    1、语料逐篇流式读取，按块分配给多个进程分词并统计块内文档频率，块计数器可直接相加合并；
+    2、内存中的计数器超过 max_memory_words 个词时，按词排序写出为磁盘分片，最终由
+       heapq.merge 多路归并，长尾词汇不会撑爆内存；
+    3、统计状态（文档数、分片）保存在 state_dir 中，新一批语料只需在原状态上继续累加，
+       无须重新统计全部语料。
+
+idf 的计算方式为 log(文档总数 / (文档频率 + 1))，出现在几乎全部文档中的词其值不大于 0，
+写出时截断为 0，避免词权重为负；每行格式为 `词 idf`。
+
+使用方法：
+    $ python -m ckpe.build corpus.jsonl --state-dir df_state -j 8 \\
+          --idf-output idf.txt --stop-word-output stop_word.txt
+    $ python -m ckpe.build new_batch.jsonl --state-dir df_state -j 8 --idf-output idf.txt
+    >>> ckpe_obj = ckpe.ckpe(idf_file_path='idf.txt', stop_word_file_path='stop_word.txt')
+
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import shutil
+import argparse
+import tempfile
+from collections import Counter
+from itertools import groupby, islice
+
+from ckpe import parallel
+from ckpe import stream
+
+
+STATE_FILE = 'state.json'
+SHARD_PTN = re.compile(r'^shard_\d{6}\.txt$')
+
+
+class DocumentFrequencyCounter(object):
+    """
+    可增量更新、内存有界的文档频率计数器
+    :param state_dir: 统计状态目录，已存在时在其基础上继续累加；为 None 时使用临时目录
+    :param max_memory_words: 内存中最多保存的词数，超出时写出为磁盘分片
+    :param max_shards: 磁盘分片数超过该值时，将全部分片归并为一个
+    """
+    def __init__(self, state_dir=None, max_memory_words=1000000, max_shards=16):
+        self._temporary = state_dir is None
+        if state_dir is None:
+            state_dir = tempfile.mkdtemp(prefix='ckpe_df_')
+        os.makedirs(state_dir, exist_ok=True)
+        self.state_dir = state_dir
+        self.max_memory_words = max_memory_words
+        self.max_shards = max_shards
+
+        self.doc_num = 0
+        self.shards = list()
+        self._saved_shards = set()  # state.json 中记录的分片，须保留至下次 save
+        self._obsolete_shards = list()  # 已被归并、待 state.json 更新后删除的分片
+        self._next_shard_id = 0
+        self._counter = Counter()
+
+        state_path = os.path.join(state_dir, STATE_FILE)
+        if os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.doc_num = state['doc_num']
+            self.shards = state['shards']
+            self._next_shard_id = state['next_shard_id']
+        self._saved_shards = set(self.shards)
+
+        # 上次运行在 save 之前中断时遗留的分片未被 state.json 引用，直接删除
+        for name in os.listdir(state_dir):
+            if SHARD_PTN.match(name) and name not in self._saved_shards:
+                os.remove(os.path.join(state_dir, name))
+
+    def update(self, counter, doc_num):
+        """
+        合并一块语料的文档频率
+        :param counter: (Counter) 词 -> 该块中包含该词的文档数
+        :param doc_num: 该块的文档数
+        """
+        self._counter.update(counter)
+        self.doc_num += doc_num
+        if len(self._counter) > self.max_memory_words:
+            self._spill()
+
+    def _spill(self):
+        ''' 将内存中的计数按词排序写出为分片 '''
+        if not self._counter:
+            return
+        shard_name = 'shard_{:06d}.txt'.format(self._next_shard_id)
+        self._next_shard_id += 1
+        self._write_shard(shard_name, sorted(self._counter.items()))
+        self.shards.append(shard_name)
+        self._counter = Counter()
+
+        if len(self.shards) > self.max_shards:
+            self._compact()
+
+    def _compact(self):
+        """
+        将全部分片归并为一个。state.json 在 save 之前仍指向其中已保存的分片，这些分片须保留至
+        save 写入新的 state.json 之后再删除，否则中途崩溃时保存的状态将指向不存在的文件；
+        上次 save 之后产生的分片未被引用，可直接删除
+        """
+        shard_name = 'shard_{:06d}.txt'.format(self._next_shard_id)
+        self._next_shard_id += 1
+        old_shards = self.shards
+        self._write_shard(shard_name, _merge_sorted([self._read_shard(name) for name in old_shards]))
+        self.shards = [shard_name]
+        for name in old_shards:
+            if name in self._saved_shards:
+                self._obsolete_shards.append(name)
+            else:
+                os.remove(os.path.join(self.state_dir, name))
+
+    def _write_shard(self, shard_name, items):
+        with open(os.path.join(self.state_dir, shard_name), 'w', encoding='utf-8') as f:
+            for word, df in items:
+                f.write('{}\t{}\n'.format(word, df))
+
+    def _read_shard(self, shard_name):
+        with open(os.path.join(self.state_dir, shard_name), 'r', encoding='utf-8') as f:
+            for line in f:
+                word, df = line.rstrip('\n').rsplit('\t', 1)
+                yield word, int(df)
+
+    def items(self):
+        ''' 按词的顺序返回 (词, 文档频率)，内存占用与词表大小无关 '''
+        iterators = [self._read_shard(name) for name in self.shards]
+        iterators.append(iter(sorted(self._counter.items())))
+        return _merge_sorted(iterators)
+
+    def save(self):
+        ''' 将内存中的计数写出，并保存统计状态，供下次增量更新 '''
+        self._spill()
+        state = {'doc_num': self.doc_num, 'shards': self.shards,
+                 'next_shard_id': self._next_shard_id}
+        state_path = os.path.join(self.state_dir, STATE_FILE)
+        with open(state_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(state_path + '.tmp', state_path)
+
+        for name in self._obsolete_shards:
+            os.remove(os.path.join(self.state_dir, name))
+        self._obsolete_shards = list()
+        self._saved_shards = set(self.shards)
+
+    def close(self):
+        ''' 未指定 state_dir 时删除临时目录 '''
+        if self._temporary:
+            shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def write_idf(self, idf_path, min_df=1):
+        """
+        写出 idf 文件，每行格式为 `词 idf`，与 extractor 读取的格式一致；
+        文档频率不低于文档总数 - 1 的词 idf 截断为 0
+        :param min_df: 文档频率低于该值的词不写出，其 idf 在抽取时取中位数
+        """
+        if self.doc_num == 0:
+            raise ValueError('no documents have been counted.')
+        with open(idf_path, 'w', encoding='utf-8') as f:
+            for word, df in self.items():
+                if df < min_df:
+                    continue
+                idf = max(0.0, math.log(self.doc_num / (df + 1)))
+                f.write('{} {:.4f}\n'.format(word, idf))
+
+    def write_stop_words(self, stop_word_path, min_df_ratio=0.3, max_num=None,
+                         base_stop_words=None):
+        """
+        将文档频率占比不低于 min_df_ratio 的词写出为停用词表，按文档频率降序排列
+        :param max_num: 停用词数量上限
+        :param base_stop_words: (list) 需要保留的原有停用词，如 ckpe 自带的停用词表
+        """
+        if self.doc_num == 0:
+            raise ValueError('no documents have been counted.')
+        min_df = min_df_ratio * self.doc_num
+        stop_words = [(df, word) for word, df in self.items() if df >= min_df]
+        stop_words = [word for _, word in sorted(stop_words, reverse=True)]
+        if max_num is not None:
+            stop_words = stop_words[:max_num]
+        if base_stop_words is not None:
+            stop_words_set = set(stop_words)
+            stop_words.extend(word for word in base_stop_words
+                              if word.strip() and word not in stop_words_set)
+
+        with open(stop_word_path, 'w', encoding='utf-8') as f:
+            for word in stop_words:
+                f.write(word + '\n')
+
+
+def _merge_sorted(iterators):
+    ''' 多路归并按词有序的 (词, 计数)，相同的词计数相加 '''
+    merged = heapq.merge(*iterators, key=lambda item: item[0])
+    for word, group in groupby(merged, key=lambda item: item[0]):
+        yield word, sum(df for _, df in group)
+
+
+def count_document_frequency(extractor, texts):
+    """
+    统计一块文本的文档频率，分词方式与抽取关键短语时完全一致
+    :return: (Counter 词 -> 文档数, 文档数)
+    """
+    docs_sentences = list()
+    for text in texts:
+        if not isinstance(text, str):
+            continue
+        docs_sentences.append(extractor._split_sentences(extractor._preprocessing_text(text)))
+
+    sentences = [sen for doc_sentences in docs_sentences for sen in doc_sentences]
+    segs_list = iter(extractor._cut_batch(sentences))
+
+    counter = Counter()
+    for doc_sentences in docs_sentences:
+        words = set()
+        for sen_segs in islice(segs_list, len(doc_sentences)):
+            words.update(word for word, _ in sen_segs)
+        counter.update(words)
+    return counter, len(docs_sentences)
+
+
+def _count_worker(texts):
+    return count_document_frequency(parallel._worker_extractor, texts)
+
+
+def build_document_frequency(extractor, documents, df_counter, n_jobs=1, chunk_size=256):
+    """
+    流式统计语料的文档频率，累加进 df_counter
+    :param extractor: ChineseKeyPhrasesExtractor 对象，用于清洗文本与分词
+    :param documents: 文本的可迭代对象
+    :param df_counter: DocumentFrequencyCounter 对象
+    :param n_jobs: 进程数，为 1 时在当前进程处理，-1 或 None 表示使用全部 cpu
+    :param chunk_size: 每块的文档数
+    """
+    documents = iter(documents)
+    chunks = iter(lambda: list(islice(documents, chunk_size)), [])
+    n_jobs = parallel.get_n_jobs(n_jobs)
+    if n_jobs == 1:
+        for chunk in chunks:
+            df_counter.update(*count_document_frequency(extractor, chunk))
+        return df_counter
+
+    with parallel.create_pool(extractor, n_jobs) as pool:
+        for result in parallel.imap_bounded(
+                pool, _count_worker, ((chunk,) for chunk in chunks), 2 * n_jobs):
+            df_counter.update(*result)
+    return df_counter
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m ckpe.build',
+        description='由语料统计文档频率，生成 idf 文件与停用词表，支持增量更新。')
+    parser.add_argument('input', nargs='?', default=None,
+                        help='输入语料路径，每行一篇文本或一个 json，- 表示标准输入；'
+                             '省略时仅由 state-dir 中已有的统计结果生成文件')
+    parser.add_argument('--format', dest='input_format', choices=['line', 'jsonl'],
+                        default=None, help='输入格式，默认根据文件后缀判断')
+    parser.add_argument('--text-key', default='text', help='jsonl 中文本所在的字段名')
+    parser.add_argument('--state-dir', default=None,
+                        help='统计状态目录，已存在时在其基础上增量更新；省略时不保存状态')
+    parser.add_argument('--idf-output', default=None, help='idf 文件输出路径')
+    parser.add_argument('--stop-word-output', default=None, help='停用词表输出路径')
+    parser.add_argument('--min-df', type=int, default=2, help='写出 idf 的最小文档频率')
+    parser.add_argument('--stop-word-df-ratio', type=float, default=0.3,
+                        help='文档频率占比不低于该值的词作为停用词')
+    parser.add_argument('--keep-default-stop-words', action='store_true',
+                        help='停用词表中保留 ckpe 自带的停用词')
+    parser.add_argument('--model-bundle', default=None,
+                        help='由 python -m ckpe.bundle 编译的二进制模型包路径')
+    parser.add_argument('-j', '--n-jobs', type=int, default=1, help='进程数，-1 表示全部 cpu')
+    parser.add_argument('--chunk-size', type=int, default=256, help='每块的文档数')
+    parser.add_argument('--max-memory-words', type=int, default=1000000,
+                        help='内存中最多保存的词数，超出时写出为磁盘分片')
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+
+    from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+    extractor = ChineseKeyPhrasesExtractor(model_bundle=args.model_bundle)
+
+    df_counter = DocumentFrequencyCounter(
+        state_dir=args.state_dir, max_memory_words=args.max_memory_words)
+    try:
+        if args.input is not None:
+            documents = (text for _, text in stream.read_documents(
+                args.input, input_format=args.input_format, text_key=args.text_key))
+            build_document_frequency(extractor, documents, df_counter,
+                                     n_jobs=args.n_jobs, chunk_size=args.chunk_size)
+            if args.state_dir is not None:
+                df_counter.save()
+
+        if args.idf_output is not None:
+            df_counter.write_idf(args.idf_output, min_df=args.min_df)
+        if args.stop_word_output is not None:
+            df_counter.write_stop_words(
+                args.stop_word_output, min_df_ratio=args.stop_word_df_ratio,
+                base_stop_words=sorted(extractor.stop_words) if args.keep_default_stop_words else None)
+    finally:
+        df_counter.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 16:00
+# File Name: bundle.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+将 idf.txt、lda 模型文件、停用词、词性组合权重等预先编译为一个二进制模型包，
+加载时通过 np.memmap 映射入内存，启动只需毫秒级时间，且多进程间共享物理内存页。
+
+模型包格式：
+    magic(8 bytes) | header 长度(uint64) | header(json) | 各数组数据(64 字节对齐)
+header 中记录各数组的 dtype、shape、offset，以及停用词、词性组合权重等少量元数据。
+
+使用方法：
+    $ python -m ckpe.bundle ckpe_model.bundle
+    >>> ckpe_obj = ckpe.ckpe(model_bundle='ckpe_model.bundle')
+
+"""
+
+import json
+import struct
+import functools
+import argparse
+
+import numpy as np
+
+
+BUNDLE_MAGIC = b'CKPEBNDL'
+BUNDLE_VERSION = 1
+_ALIGNMENT = 64
+
+
+class BundleLookup(object):
+    """
+    基于有序词表的只读词典，词表与数值均为 memmap 数组，不占用额外内存。
+    查询采用二分查找，接口与 dict 的只读部分一致。
+    最近命中的 cache_size 个词缓存在进程私有的 LRU 中，未登录词不缓存；缓存大小固定，
+    长期运行的服务中不会随查询无限增长，也不会把整个词表复制到各个进程的堆上。
+    :param cache_size: LRU 缓存的词数，为 0 时不缓存
+    """
+    def __init__(self, vocab, values, cache_size=65536):
+        self.vocab = vocab
+        self.values = values
+        self.cache_size = cache_size
+        self._init_cache()
+
+    def _init_cache(self):
+        if self.cache_size:
+            # lru_cache 不缓存抛出异常的调用，故未登录词每次重新查找，不占用缓存
+            self._cached_search = functools.lru_cache(maxsize=self.cache_size)(self._search)
+        else:
+            self._cached_search = self._search
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_cached_search')
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_cache()
+
+    def _search(self, word):
+        ''' 二分查找词汇的值，不存在时抛出 KeyError '''
+        idx = int(self.vocab.searchsorted(word))
+        if idx < len(self.vocab) and self.vocab[idx] == word:
+            if not np.isnan(self.values[idx]):
+                return float(self.values[idx])
+        raise KeyError(word)
+
+    def _lookup(self, word):
+        try:
+            return self._cached_search(word)
+        except KeyError:
+            return None
+
+    def get(self, word, default=None):
+        value = self._lookup(word)
+        return default if value is None else value
+
+    def __getitem__(self, word):
+        value = self._lookup(word)
+        if value is None:
+            raise KeyError(word)
+        return value
+
+    def __contains__(self, word):
+        return self._lookup(word) is not None
+
+    def __iter__(self):
+        mask = ~np.isnan(self.values)
+        return iter(self.vocab[mask].tolist())
+
+    def __len__(self):
+        return int(np.count_nonzero(~np.isnan(self.values)))
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        mask = ~np.isnan(self.values)
+        return zip(self.vocab[mask].tolist(), self.values[mask].tolist())
+
+
+def compile_model_bundle(bundle_path, extractor=None):
+    """
+    将抽取器已加载的模型编译为二进制模型包
+    :param bundle_path: 模型包输出路径
+    :param extractor: ChineseKeyPhrasesExtractor 对象，默认使用包内自带的模型文件新建一个
+    """
+    if extractor is None:
+        from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+        extractor = ChineseKeyPhrasesExtractor()
+
+    idf_dict = extractor.idf_dict
+    topic_prominence_dict = extractor.topic_prominence_dict
+    vocab = sorted(set(idf_dict.keys()) | set(topic_prominence_dict.keys()))
+
+    arrays = {
+        'vocab': np.array(vocab, dtype='U'),
+        'idf': np.array([idf_dict.get(word, np.nan) for word in vocab],
+                        dtype='<f8'),
+        'topic_prominence': np.array(
+            [topic_prominence_dict.get(word, np.nan) for word in vocab], dtype='<f8')}
+
+    header = {
+        'version': BUNDLE_VERSION,
+        'median_idf': extractor.median_idf,
+        'unk_topic_prominence_value': extractor.unk_topic_prominence_value,
+        'topic_num': extractor.topic_num,
+        'word_num': extractor.word_num,
+        'stop_words': sorted(extractor.stop_words),
+        'pos_combine_weights': extractor.pos_combine_weights_dict,
+        'arrays': dict()}
+
+    # 先计算 header 长度，再确定各数组的 offset
+    def _dump_header(offset_base):
+        offset = offset_base
+        for name, arr in arrays.items():
+            offset = _align(offset)
+            header['arrays'][name] = {
+                'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+            offset += arr.nbytes
+        return json.dumps(header, ensure_ascii=False).encode('utf-8')
+
+    prefix_length = len(BUNDLE_MAGIC) + 8
+    header_bytes = _dump_header(0)
+    while True:
+        data_start = _align(prefix_length + len(header_bytes))
+        new_header_bytes = _dump_header(data_start)
+        if len(new_header_bytes) == len(header_bytes):
+            header_bytes = new_header_bytes
+            break
+        header_bytes = new_header_bytes
+
+    with open(bundle_path, 'wb') as f:
+        f.write(BUNDLE_MAGIC)
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for name, arr in arrays.items():
+            offset = header['arrays'][name]['offset']
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(arr.tobytes())
+
+
+def load_model_bundle(bundle_path):
+    """
+    加载二进制模型包，数组以只读 memmap 方式映射
+    :param bundle_path: 模型包路径
+    :return: dict，包含 idf_dict、median_idf、topic_prominence_dict、
+        unk_topic_prominence_value、stop_words、pos_combine_weights_dict 等
+    """
+    with open(bundle_path, 'rb') as f:
+        magic = f.read(len(BUNDLE_MAGIC))
+        if magic != BUNDLE_MAGIC:
+            raise ValueError('`{}` is not a ckpe model bundle.'.format(bundle_path))
+        header_length, = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_length).decode('utf-8'))
+    if header['version'] != BUNDLE_VERSION:
+        raise ValueError('unsupported model bundle version {}.'.format(header['version']))
+
+    arrays = dict()
+    for name, info in header['arrays'].items():
+        arrays[name] = np.memmap(bundle_path, dtype=np.dtype(info['dtype']), mode='r',
+                                 offset=info['offset'], shape=tuple(info['shape']))
+
+    return {
+        'idf_dict': BundleLookup(arrays['vocab'], arrays['idf']),
+        'median_idf': header['median_idf'],
+        'topic_prominence_dict': BundleLookup(
+            arrays['vocab'], arrays['topic_prominence']),
+        'unk_topic_prominence_value': header['unk_topic_prominence_value'],
+        'topic_num': header['topic_num'],
+        'word_num': header['word_num'],
+        'stop_words': header['stop_words'],
+        'pos_combine_weights_dict': header['pos_combine_weights']}
+
+
+def _align(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        prog='python -m ckpe.bundle',
+        description='将 ckpe 自带的 idf、lda、停用词等模型文件编译为二进制模型包。')
+    parser.add_argument('output', help='模型包输出路径')
+    parser.add_argument('--idf-file', default=None,
+                        help='idf 文件路径，默认使用自带的 idf.txt，可由 python -m ckpe.build 生成')
+    parser.add_argument('--stop-word-file', default=None,
+                        help='停用词表路径，默认使用自带的 stop_word.txt')
+    args = parser.parse_args()
+
+    from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+    compile_model_bundle(args.output, extractor=ChineseKeyPhrasesExtractor(
+        idf_file_path=args.idf_file, stop_word_file_path=args.stop_word_file))
@@ -0,0 +1,291 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 20:00
+# File Name: cache.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+import os
+import json
+import hashlib
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+from ckpe.lexicon import Lexicon
+
+
+logger = logging.getLogger(__name__)
+
+
+class _PicklableLockMixin(object):
+    ''' 序列化时去掉线程锁，反序列化后重建，非 fork 平台的子进程得到缓存的一份快照 '''
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_lock')
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class SegmentationCache(_PicklableLockMixin):
+    """
+    分词结果缓存，以句子内容为键，LRU 方式淘汰。新闻中大量重复的电头、
+    机构署名、免责声明等句子，命中缓存后无须再次调用 pkuseg。
+    缓存记录生成它的分词器的 identity（后端名称与词典指纹），由抽取器在使用前绑定，
+    一个缓存只能供同一种分词器使用；sqlite 文件中保存该 identity，与绑定的分词器不一致时拒绝加载。
+    e.g.
+    >>> seg_cache = SegmentationCache(capacity=200000, path='seg_cache.sqlite')
+    >>> ckpe_obj = ckpe.ckpe(seg_cache=seg_cache)
+    >>> ...
+    >>> seg_cache.save()  # 写入磁盘，下次启动时自动加载，保持命中率
+
+    :param capacity: 最多缓存的句子数，为 None 时不限制
+    :param max_bytes: 最多占用的字节数（按序列化后的 utf-8 字节数估计），为 None 时不限制
+    :param path: sqlite 文件路径，指定时从中加载最近使用的条目，并可通过 save 持久化
+    :param segmenter_identity: 分词器的 identity，默认由首个使用该缓存的抽取器绑定，
+        或取自 path 中保存的 identity
+    """
+    def __init__(self, capacity=100000, max_bytes=None, path=None, segmenter_identity=None):
+        if capacity is None and max_bytes is None:
+            raise ValueError('at least one of `capacity` and `max_bytes` must be given.')
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.path = path
+        self.segmenter_identity = segmenter_identity
+
+        self._entries = OrderedDict()  # sentence -> (segs, size)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path is not None:
+            self.load()
+
+    def bind(self, segmenter_identity):
+        """
+        绑定分词器的 identity，已绑定其它分词器时抛出 ValueError，避免不同分词器的结果混用
+        :param segmenter_identity: 由 ckpe.segmenter.segmenter_identity 得到
+        """
+        with self._lock:
+            if self.segmenter_identity is None:
+                self.segmenter_identity = segmenter_identity
+            elif self.segmenter_identity != segmenter_identity:
+                raise ValueError(
+                    'the segmentation cache belongs to segmenter `{}`, '
+                    'can not be used by segmenter `{}`.'.format(
+                        self.segmenter_identity, segmenter_identity))
+
+    def get(self, sentence):
+        ''' 查询句子的分词结果，未命中时返回 None '''
+        with self._lock:
+            entry = self._entries.get(sentence)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(sentence)
+            self.hits += 1
+        return list(entry[0])
+
+    def put(self, sentence, sen_segs):
+        ''' 写入句子的分词结果，超出容量时淘汰最久未使用的条目 '''
+        sen_segs = tuple((word, pos) for word, pos in sen_segs)
+        size = self._entry_size(sentence, sen_segs)
+        with self._lock:
+            old_entry = self._entries.pop(sentence, None)
+            if old_entry is not None:
+                self.total_bytes -= old_entry[1]
+            self._entries[sentence] = (sen_segs, size)
+            self.total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._entries and (
+                (self.capacity is not None and len(self._entries) > self.capacity) or
+                (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    @staticmethod
+    def _entry_size(sentence, sen_segs):
+        return len(sentence.encode('utf-8')) + sum(
+            len(word.encode('utf-8')) + len(pos) + 2 for word, pos in sen_segs)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        ''' 返回命中、未命中、淘汰次数与当前占用 '''
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries),
+                    'bytes': self.total_bytes,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, sentence):
+        return sentence in self._entries
+
+    def save(self, path=None):
+        ''' 将当前缓存按最近使用顺序写入 sqlite 文件，键为句子的 sha1，并写入分词器的 identity '''
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError('`path` must be given to save the cache.')
+        with self._lock:
+            rows = [(_sentence_key(sentence), sentence, json.dumps(segs, ensure_ascii=False), rank)
+                    for rank, (sentence, (segs, _)) in enumerate(self._entries.items())]
+            segmenter_identity = self.segmenter_identity
+
+        conn = sqlite3.connect(path)
+        try:
+            with conn:
+                _create_tables(conn)
+                conn.execute('DELETE FROM seg_cache')
+                conn.execute('DELETE FROM seg_cache_meta')
+                conn.executemany('INSERT INTO seg_cache VALUES (?, ?, ?, ?)', rows)
+                if segmenter_identity is not None:
+                    conn.execute('INSERT INTO seg_cache_meta VALUES (?, ?)',
+                                 ('segmenter', segmenter_identity))
+        finally:
+            conn.close()
+
+    def load(self, path=None):
+        """
+        从 sqlite 文件加载缓存，文件不存在时忽略。文件中的分词器 identity 与已绑定的
+        不一致时抛出 ValueError；未记录 identity 的旧文件无法校验，跳过并记入日志
+        """
+        path = path if path is not None else self.path
+        # sqlite3.connect 会新建不存在的文件，路径拼写错误时将留下空的数据库文件
+        if not os.path.exists(path):
+            return
+        conn = sqlite3.connect(path)
+        try:
+            _create_tables(conn)
+            row = conn.execute(
+                "SELECT value FROM seg_cache_meta WHERE name = 'segmenter'").fetchone()
+            rows = conn.execute('SELECT sentence, segs FROM seg_cache ORDER BY rank').fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return
+
+        if row is None:
+            logger.warning('segmentation cache `%s` has no segmenter identity, skipped.', path)
+            return
+        self.bind(row[0])
+        for sentence, segs in rows:
+            self.put(sentence, json.loads(segs))
+
+
+def _create_tables(conn):
+    conn.execute('CREATE TABLE IF NOT EXISTS seg_cache ('
+                 'key TEXT PRIMARY KEY, sentence TEXT, segs TEXT, rank INTEGER)')
+    conn.execute('CREATE TABLE IF NOT EXISTS seg_cache_meta ('
+                 'name TEXT PRIMARY KEY, value TEXT)')
+
+
+def _sentence_key(sentence):
+    return hashlib.sha1(sentence.encode('utf-8')).hexdigest()
+
+
+class ResultCache(_PicklableLockMixin):
+    """
+    整篇文本的抽取结果缓存，以清洗后的文本及抽取参数（不含 top_k、with_weight）的
+    哈希为键，保存完整的、按权重降序排列的短语列表，不同 top_k、with_weight 的请求
+    可共用同一条缓存。每个缓存对象只应供一个抽取器使用，模型或停用词变化后需清空。
+    e.g.
+    >>> result_cache = ResultCache(capacity=10000, ttl=3600)
+    >>> ckpe_obj = ckpe.ckpe(result_cache=result_cache)
+    >>> ckpe_obj.extract_keyphrase(text, top_k=5)
+    >>> ckpe_obj.extract_keyphrase(text, top_k=20, with_weight=True)  # 命中缓存
+    >>> ckpe_obj.update_stop_words(new_stop_words)  # 自动清空缓存
+
+    :param capacity: 最多缓存的文本篇数，超出时淘汰最久未使用的条目
+    :param ttl: 条目有效期（秒），为 None 时永不过期
+    """
+    def __init__(self, capacity=10000, ttl=None):
+        self.capacity = capacity
+        self.ttl = ttl
+
+        self._entries = OrderedDict()  # key -> (ranked_phrases, expire_time)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(text, options):
+        ''' 由清洗后的文本与规范化的抽取参数计算缓存键，列表参数与顺序无关，lexicon 取其内容哈希 '''
+        canonical_options = list()
+        for name in sorted(options):
+            value = options[name]
+            if isinstance(value, Lexicon):
+                value = value.fingerprint
+            elif isinstance(value, dict):
+                value = sorted(value.items(), key=lambda item: str(item[0]))
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                value = sorted(value, key=str)
+            canonical_options.append((name, value))
+        payload = json.dumps([text, canonical_options], ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        ''' 查询缓存，未命中或已过期时返回 None '''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] is not None and entry[1] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return list(entry[0])
+
+    def put(self, key, ranked_phrases):
+        expire_time = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (tuple(ranked_phrases), expire_time)
+            while self.capacity is not None and len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        ''' 清空缓存，模型、停用词等发生变化时调用 '''
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries),
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations,
+                    'invalidations': self.invalidations,
+                    'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def __len__(self):
+        return len(self._entries)
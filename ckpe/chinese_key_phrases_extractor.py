@@ -5,15 +5,48 @@
 # Edit Author: dongrixinyu
 # ------------------------------------
 
-from os.path import join, dirname, basename
+from os.path import join, dirname, basename, abspath
 import re
-import pdb
-import json
 import math
+import time
+import inspect
+import logging
 from collections import Counter
-import pkuseg
+from functools import partial
 
-import numpy as np
+from ckpe import chunked
+from ckpe import parallel
+from ckpe import resources
+from ckpe import stream
+from ckpe.instrument import new_document_stats, record_step
+from ckpe.lexicon import Lexicon
+from ckpe.segmenter import get_segmenter, segmenter_identity
+from ckpe.session import KeyphraseSession
+
+
+logger = logging.getLogger(__name__)
+
+# 模型包中包含的资源，指定 model_bundle 时由模型包加载
+BUNDLE_ATTRS = ('idf_dict', 'median_idf', 'topic_prominence_dict', 'unk_topic_prominence_value',
+                'topic_num', 'word_num', 'stop_words', 'pos_combine_weights_dict')
+
+
+class _LazyResource(object):
+    """
+    抽取器的模型属性，首次访问时调用 loader 方法，由其将属性写入实例字典；
+    此后直接从实例字典取值，无额外开销。对属性赋值即可替换该资源
+    """
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        getattr(obj, self.loader)()
+        return obj.__dict__[self.name]
 
 
 class ChineseKeyPhrasesExtractor(object):
@@ -35,8 +68,39 @@ class ChineseKeyPhrasesExtractor(object):
     >>> ckpe_obj = ckpe.ckpe()
     >>> key_phrases = ckpe_obj.extract_keyphrase(text)
     
+    模型资源均在首次使用时加载，并由同一进程中的抽取器共享，见 ckpe.resources。
     """
-    def __init__(self, ):
+    idf_dict = _LazyResource('_load_idf')
+    median_idf = _LazyResource('_load_idf')
+    stop_words = _LazyResource('_load_stop_words')
+    pos_combine_weights_dict = _LazyResource('_load_pos_combine_weights')  # 短语词性组合权重字典
+    topic_prominence_dict = _LazyResource('_topic_prominence')
+    unk_topic_prominence_value = _LazyResource('_topic_prominence')
+    topic_num = _LazyResource('_topic_prominence')
+    word_num = _LazyResource('_topic_prominence')
+    topic_word_weight = _LazyResource('_lda_prob_matrix')
+    word_topic_weight = _LazyResource('_lda_prob_matrix')
+
+    def __init__(self, model_bundle=None, seg_cache=None, result_cache=None,
+                 idf_file_path=None, stop_word_file_path=None, stats=None,
+                 segmenter=None):
+        """
+        :param model_bundle: 由 `python -m ckpe.bundle` 编译的二进制模型包路径，
+            指定时不再读取 idf.txt、lda 模型等文本文件，启动更快且多进程共享内存
+        :param idf_file_path: idf 文件路径，默认使用 ckpe 自带的 idf.txt，
+            可由 `python -m ckpe.build` 根据自有语料生成；指定 model_bundle 时无效
+        :param stop_word_file_path: 停用词表路径，默认使用 ckpe 自带的 stop_word.txt；
+            指定 model_bundle 时无效
+        :param stats: (ckpe.instrument.ExtractionStats) 运行统计，记录各步骤耗时、
+            候选短语数、各规则剪枝次数、失败次数等，默认不开启
+        :param seg_cache: (ckpe.cache.SegmentationCache) 分词结果缓存，默认不开启
+        :param result_cache: (ckpe.cache.ResultCache) 整篇文本的抽取结果缓存，默认不开启
+        :param segmenter: 分词器，'pkuseg'（默认，准确率高）、'dictionary'（基于 idf 词表的
+            词典分词，速度快，准确率较低），或 ckpe.segmenter.Segmenter 对象
+        """
+        # 由注册表加载、未被替换的资源，序列化时不写入，见 __getstate__
+        self._registry_resources = dict()
+
         # 词性预处理
         # 词性参考 https://github.com/lancopku/pkuseg-python/blob/master/tags.txt
         self.pos_name = ['n', 't', 's', 'f', 'm', 'q', 'b', 'r', 'v', 'a', 'z',
@@ -58,58 +122,112 @@ class ChineseKeyPhrasesExtractor(object):
         
         fine_punctuation='[，。;；…！、：!?？\r\n ]'
         self.puncs_fine_ptn = re.compile(fine_punctuation)
-        self.idf_file_path = join(dirname(__file__), "idf.txt")
-        self._load_idf()
-        self.seg = pkuseg.pkuseg(postag=True)  # 北大分词器
+        if idf_file_path is None:
+            idf_file_path = join(dirname(__file__), "idf.txt")
+        if stop_word_file_path is None:
+            stop_word_file_path = join(dirname(__file__), "stop_word.txt")
+        self.model_bundle = model_bundle
+        self.idf_file_path = idf_file_path
+        self.stop_word_file_path = stop_word_file_path
+        self.seg = get_segmenter(segmenter, idf_file_path=idf_file_path, model_bundle=model_bundle)
+        self.seg_cache = seg_cache
+        self._seg_cache_binding = None
+        self._bind_seg_cache()
+        self.result_cache = result_cache
+        self.stats = stats
         
         # 短语长度权重字典，调整绝大多数的短语要位于2~6个词之间
         self.phrases_length_control_dict = {
             1: 1, 2: 5.6, 3:1.1, 4:2.0, 5:0.7, 6:0.9, 7:0.48,
             8: 0.43, 9: 0.24, 10:0.15, 11:0.07, 12:0.05}
         self.phrases_length_control_none = 0.01  # 在大于 7 时选取
-        
-        # 短语词性组合权重字典
-        with open(join(dirname(__file__), 'pos_combine_weights.json'), 
-                  'r', encoding='utf8') as f:
-            self.pos_combine_weights_dict = json.load(f)
-        
-        # 读取停用词文件
-        with open(join(dirname(__file__), 'stop_word.txt'), 
-                  'r', encoding='utf8') as f:
-            self.stop_words = list(set(f.read().split()))
-            if '' in self.stop_words:
-                self.stop_words.remove('')
-            if '' not in self.stop_words:
-                self.stop_words.append('\n')
-                
-        self._lda_prob_matrix()
-        
+
+    def _set_lazy(self, **resources_dict):
+        ''' 写入懒加载的属性，已被赋值（如 update_stop_words）的属性不覆盖 '''
+        for name, value in resources_dict.items():
+            if name not in self.__dict__:
+                self.__dict__[name] = value
+                self._registry_resources[name] = value
+
+    def __getstate__(self):
+        """
+        序列化抽取器的当前状态，供非 fork 平台（spawn）的子进程使用。仍与注册表共享、
+        未被替换的资源不写入，子进程按文件路径重新懒加载（模型包仍以 memmap 映射）；
+        经 update_idf、update_stop_words、load_topic_model 或直接赋值替换的资源，
+        以及分词、结果缓存的快照随对象一并序列化，子进程的结果与当前进程一致。
+        运行统计不序列化，子进程中不记录统计
+        """
+        state = self.__dict__.copy()
+        for name, value in state.pop('_registry_resources').items():
+            if state.get(name) is value:
+                state.pop(name)
+        state['stats'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._registry_resources = dict()
+
+    def _load_model_bundle(self):
+        ''' 从二进制模型包加载 idf、主题突出度、停用词、词性组合权重 '''
+        path = abspath(self.model_bundle)
+        model = resources.get_resource(
+            ('model_bundle', path), partial(resources.load_model_bundle, path))
+        self._set_lazy(**{name: model[name] for name in BUNDLE_ATTRS})
+
+    def _load_idf(self):
+        if self.model_bundle is not None:
+            return self._load_model_bundle()
+        path = abspath(self.idf_file_path)
+        idf_dict, median_idf = resources.get_resource(
+            ('idf', path), partial(resources.read_idf, path))
+        self._set_lazy(idf_dict=idf_dict, median_idf=median_idf)
+
+    def _load_stop_words(self):
+        if self.model_bundle is not None:
+            return self._load_model_bundle()
+        path = abspath(self.stop_word_file_path)
+        self._set_lazy(stop_words=resources.get_resource(
+            ('stop_words', path), partial(resources.read_stop_words, path)))
+
+    def _load_pos_combine_weights(self):
+        if self.model_bundle is not None:
+            return self._load_model_bundle()
+        path = join(dirname(abspath(__file__)), 'pos_combine_weights.json')
+        self._set_lazy(pos_combine_weights_dict=resources.get_resource(
+            ('pos_combine_weights', path), partial(resources.read_json, path)))
+
     def _lda_prob_matrix(self):
-        ''' 读取 lda 模型有关概率分布文件，并计算 unk 词的概率分布 '''
+        ''' 读取 lda 模型有关概率分布文件，计算主题突出度时不依赖这两个属性 '''
         # 读取 p(topic|word) 概率分布文件，由于 lda 模型过大，不方便加载并计算
         # 概率 p(topic|word)，所以未考虑 p(topic|doc) 概率，可能会导致不准
         # 但是，由于默认的 lda 模型 topic_num == 100，事实上，lda 模型是否在
         # 预测的文档上收敛对结果影响不大（topic_num 越多，越不影响）。
-        with open(join(dirname(__file__), 'topic_word_weight.json'), 
-                  'r', encoding='utf8') as f:
-            self.topic_word_weight = json.load(f)
-        self.word_num = len(self.topic_word_weight)
-        
+        self._set_lazy(topic_word_weight=resources.read_json(
+            join(dirname(__file__), 'topic_word_weight.json')))
+
         # 读取 p(word|topic) 概率分布文件
-        with open(join(dirname(__file__), 'word_topic_weight.json'),
-                  'r', encoding='utf8') as f:
-            self.word_topic_weight = json.load(f)
-        self.topic_num = len(self.word_topic_weight)
-        
-        self._topic_prominence()  # 预计算主题突出度
+        self._set_lazy(word_topic_weight=resources.read_json(
+            join(dirname(__file__), 'word_topic_weight.json')))
 
-    def _load_idf(self):
-        with open(self.idf_file_path, 'r', encoding='utf-8') as f:
-            idf_list = [line.strip().split(' ') for line in f.readlines()]
-        self.idf_dict = dict()
-        for item in idf_list:
-            self.idf_dict.update({item[0]: float(item[1])})
-        self.median_idf = sorted(self.idf_dict.values())[len(self.idf_dict) // 2]
+    def warmup(self, topic_model=True):
+        """
+        预先加载全部模型资源，并生成词性集合、词性权重表、清洗正则等缓存。
+        pre-fork 服务应在 fork 子进程之前调用，子进程通过 copy-on-write 共享，不再各自加载
+        :param topic_model: 为 False 时不加载主题模型，适用于只使用 allow_topic_weight=False 的场景
+        :return: self
+        """
+        if hasattr(self.seg, 'load'):
+            self.seg.load()
+        names = ['idf_dict', 'stop_words', 'pos_combine_weights_dict']
+        if topic_model:
+            names.append('topic_prominence_dict')
+        for name in names:
+            getattr(self, name)
+        self._pos_name_sets()
+        self._pos_weight_tables()
+        self._char_normalize_ptn()
+        return self
     
     def _update_parentheses_ptn(self, parentheses):
         ''' 更新括号权重 '''
@@ -126,6 +244,17 @@ class ChineseKeyPhrasesExtractor(object):
         
         self.remove_parentheses_ptn = re.compile(remove_ptn)
         self.parentheses = parentheses
+
+        # 线性去除括号所用的 括号字符 -> 括号对序号 映射，左右括号相同（如引号）时同属左、右括号
+        self.parentheses_char_ptn = re.compile(
+            '[{}]'.format(''.join(re.escape(char) for char in parentheses))) if length else None
+        self._parentheses_type = {char: i // 2 for i, char in enumerate(parentheses)}
+        self._left_parentheses = set(parentheses[0::2])
+        self._right_parentheses = set(parentheses[1::2])
+        # 同一字符出现在多个括号对中时，退回逐层正则去除
+        self._linear_parentheses = all(
+            parentheses.count(char) == 1 or parentheses[i - i % 2: i - i % 2 + 2] == char * 2
+            for i, char in enumerate(parentheses))
         
     def _gen_redundant_char_ptn(self, redundant_char):
         """ 生成 redundant_char 的正则 pattern """
@@ -136,21 +265,139 @@ class ChineseKeyPhrasesExtractor(object):
             pattern_list.append(pattern_tmp)
         pattern = '|'.join(pattern_list)
         self.redundant_char_ptn = re.compile(pattern)
-        
+        self.redundant_char = redundant_char
+
+    def _char_normalize_ptn(self):
+        """
+        将去除异常字符、合并连续冗余字符两步合为一个正则，一次 sub 完成：
+        异常字符直接删除；冗余字符后跟若干个（异常字符* + 同一冗余字符）时只保留一个，
+        与先删除异常字符、再合并冗余字符的结果相同。exception_char_ptn 被替换时自动重新编译
+        """
+        key = (self.exception_char_ptn, self.redundant_char)
+        cached = getattr(self, '_char_normalize_ptn_cache', None)
+        if cached is None or cached[0][0] is not key[0] or cached[0][1] != key[1]:
+            exception = '(?:{})'.format(self.exception_char_ptn.pattern)
+            if self.redundant_char:
+                pattern = '{exception}+|([{redundant}])(?:{exception}*\\1)+'.format(
+                    exception=exception,
+                    redundant=''.join(re.escape(char) for char in self.redundant_char))
+            else:
+                pattern = exception + '+'
+            cached = (key, re.compile(pattern, self.exception_char_ptn.flags))
+            self._char_normalize_ptn_cache = cached
+        return cached[1]
+
     def _preprocessing_text(self, text):
         ''' 使用预处理函数去除文本中的各种杂质 '''
-        # 去除中文的异常字符
-        text = self.exception_char_ptn.sub('', text)
-        # 去除中文的冗余字符
-        text = self.redundant_char_ptn.sub('', text)
+        # 去除中文的异常字符，并合并中文的冗余字符
+        char_normalize_ptn = self._char_normalize_ptn()
+        text = char_normalize_ptn.sub('\\1' if char_normalize_ptn.groups else '', text)
         # 去除文本中的各种括号
+        text = self._remove_parentheses(text)
+
+        return text
+
+    def _remove_parentheses(self, text):
+        """
+        去除文本中成对的括号及其内容（含嵌套），结果与反复用 remove_parentheses_ptn
+        去除最内层括号直至文本不再变化相同，但只扫描一遍文本，后续仅在括号位置上计算。
+        
+        逐层正则去除时，不同类型的括号交叉（如 `{[（}）`）的结果取决于每一轮去除的先后，
+        简单的括号栈无法复现，故在括号的双向链表上模拟每一轮：同类括号中相邻的一对左右
+        括号即为本轮可去除的候选，按起点自左向右贪心选取互不重叠的区间（与正则的匹配
+        顺序一致），删除区间内的括号后，仅在删除处重新检查相邻关系，得到下一轮的候选。
+        每个括号只被删除一次，耗时与括号数量近似成线性。
+        """
+        if not self._linear_parentheses:
+            return self._remove_parentheses_iteratively(text)
+        if self.parentheses_char_ptn is None:
+            return text
+
+        positions = list()
+        types = list()
+        for match in self.parentheses_char_ptn.finditer(text):
+            positions.append(match.start())
+            types.append(self._parentheses_type[match.group()])
+        if not positions:
+            return text
+
+        chars = [text[pos] for pos in positions]
+        num = len(positions)
+        # 全部括号的链表，以及同类括号的链表
+        next_all = list(range(1, num + 1))
+        next_all[-1] = -1
+        prev_same = [-1] * num
+        next_same = [-1] * num
+        last_of_type = dict()
+        for idx, bracket_type in enumerate(types):
+            prev_idx = last_of_type.get(bracket_type, -1)
+            if prev_idx != -1:
+                next_same[prev_idx] = idx
+                prev_same[idx] = prev_idx
+            last_of_type[bracket_type] = idx
+
+        left_set, right_set = self._left_parentheses, self._right_parentheses
+        candidates = [(idx, next_same[idx]) for idx in range(num)
+                      if next_same[idx] != -1 and chars[idx] in left_set
+                      and chars[next_same[idx]] in right_set]
+
+        removed_spans = list()
+        prev_all = list(range(-1, num - 1))
+        while candidates:
+            candidates.sort()
+            selected = list()
+            last_end = -1
+            for start, end in candidates:
+                if start > last_end:
+                    selected.append((start, end))
+                    last_end = end
+
+            touched = list()
+            for start, end in selected:
+                removed_spans.append((positions[start], positions[end] + 1))
+                before, after = prev_all[start], next_all[end]
+                idx = start
+                while idx != after:
+                    prev_idx, next_idx = prev_same[idx], next_same[idx]
+                    if prev_idx != -1:
+                        next_same[prev_idx] = next_idx
+                        touched.append(prev_idx)
+                    if next_idx != -1:
+                        prev_same[next_idx] = prev_idx
+                    prev_same[idx] = next_same[idx] = -2  # 标记为已删除
+                    idx = next_all[idx]
+                if before != -1:
+                    next_all[before] = after
+                if after != -1:
+                    prev_all[after] = before
+
+            candidates = list()
+            for idx in set(touched):
+                next_idx = next_same[idx]
+                if next_idx >= 0 and chars[idx] in left_set and chars[next_idx] in right_set:
+                    candidates.append((idx, next_idx))
+
+        # 后几轮的区间包含前几轮的区间，合并后依次删除
+        removed_spans.sort()
+        pieces = list()
+        last_end = 0
+        for start, end in removed_spans:
+            if start < last_end:
+                continue
+            pieces.append(text[last_end: start])
+            last_end = end
+        pieces.append(text[last_end:])
+        return ''.join(pieces)
+
+    def _remove_parentheses_iteratively(self, text):
+        ''' 反复去除最内层的括号，直至文本不再变化 '''
         length = len(text)
         while True:
             text = self.remove_parentheses_ptn.sub('', text)
             if len(text) == length:
                 break
             length = len(text)
-            
+
         return text
     
     def _split_sentences(self, text):
@@ -158,7 +405,74 @@ class ChineseKeyPhrasesExtractor(object):
         tmp_list = self.puncs_fine_ptn.split(text)
         sentences = [sen for sen in tmp_list if sen != '']
         return sentences
-    
+
+    def _cut_batch(self, sentences, nthread=1):
+        """
+        对一批句子分词并标注词性。句子先去重，开启分词缓存时优先从缓存中读取，
+        其余句子交由分词器的 cut_batch 批量处理（pkuseg 在句子较多且 nthread > 1 时
+        使用多进程文件模式）
+        :param sentences: (list) 句子列表，可来自一篇或多篇文本
+        :param nthread: 分词器批量模式的进程数
+        :return: 与 sentences 一一对应的分词结果
+        """
+        self._bind_seg_cache()
+        sen_segs_dict = dict()
+        uncached_sentences = list()
+        for sen in dict.fromkeys(sentences):
+            if self.seg_cache is not None:
+                sen_segs = self.seg_cache.get(sen)
+                if sen_segs is not None:
+                    sen_segs_dict[sen] = sen_segs
+                    continue
+            uncached_sentences.append(sen)
+
+        if hasattr(self.seg, 'cut_batch'):
+            segs_list = self.seg.cut_batch(uncached_sentences, nthread=nthread)
+        else:  # 兼容直接赋值的 pkuseg.pkuseg 等只有 cut 方法的分词器
+            segs_list = [self.seg.cut(sen) for sen in uncached_sentences]
+
+        for sen, sen_segs in zip(uncached_sentences, segs_list):
+            sen_segs_dict[sen] = sen_segs
+            if self.seg_cache is not None:
+                self.seg_cache.put(sen, sen_segs)
+
+        return [sen_segs_dict[sen] for sen in sentences]
+
+    def _bind_seg_cache(self):
+        ''' 将分词缓存与当前分词器绑定，seg、seg_cache 被替换后重新绑定，分词器不一致时抛出 ValueError '''
+        if self.seg_cache is None:
+            return
+        binding = self._seg_cache_binding
+        if binding is not None and binding[0] is self.seg and binding[1] is self.seg_cache:
+            return
+        self.seg_cache.bind(segmenter_identity(self.seg))
+        self._seg_cache_binding = (self.seg, self.seg_cache)
+
+    def _pos_name_sets(self, without_person_name=False, without_location_name=False):
+        """
+        返回人名、地名过滤组合下的 (实词词性集合, 严格规则词性集合, 虚词词性集合)，
+        四种组合均预先计算为 frozenset 并缓存，self.pos_name 等列表被修改时自动重新计算
+        """
+        key = (tuple(self.pos_name), tuple(self.stricted_pos_name), tuple(self.pos_exception))
+        cached = getattr(self, '_pos_name_sets_cache', None)
+        if cached is None or cached[0] != key:
+            pos_name_sets_dict = dict()
+            for without_person in [False, True]:
+                for without_location in [False, True]:
+                    unwanted_pos = set()
+                    if without_person:
+                        unwanted_pos.add('nr')
+                    if without_location:
+                        unwanted_pos.add('ns')
+                    pos_name_sets_dict[(without_person, without_location)] = (
+                        frozenset(self.pos_name).union(['nr', 'ns']) - unwanted_pos,
+                        frozenset(self.stricted_pos_name).union(['nr', 'ns']) - unwanted_pos,
+                        frozenset(self.pos_exception))
+            cached = (key, pos_name_sets_dict)
+            self._pos_name_sets_cache = cached
+
+        return cached[1][(bool(without_person_name), bool(without_location_name))]
+
     def extract_keyphrase(self, text, top_k=5, with_weight=False,
                           func_word_num=1, stop_word_num=0, 
                           max_phrase_len=25,
@@ -169,7 +483,7 @@ class ChineseKeyPhrasesExtractor(object):
                           without_location_name=False,
                           remove_phrases_list=None,
                           remove_words_list=None,
-                          specified_words=dict(), bias=None):
+                          specified_words=dict(), bias=None, lexicon=None):
         """
         抽取一篇文本的关键短语
         :param text: utf-8 编码中文文本
@@ -189,229 +503,662 @@ class ChineseKeyPhrasesExtractor(object):
         :param remove_words_list: (list) 将某些不想要的词剔除，使包含该词的短语不出现在最终结果中
         :param specified_words: (dict) 行业名词:词频，若不为空，则仅返回包含该词的短语
         :param bias: (int|float) 若指定 specified_words，则可选择定义权重增加值
+        :param lexicon: (ckpe.lexicon.Lexicon) 预编译的词典约束，可代替 remove_phrases_list、
+            remove_words_list、specified_words，并支持子串、后缀规则；词典较大且反复使用时，
+            应构建一次后复用，二者不可同时指定
         :return: 关键短语及其权重
         """ 
-        try:
-            # 配置参数
-            if without_location_name:
-                if 'ns' in self.stricted_pos_name:
-                    self.stricted_pos_name.remove('ns')
-                if 'ns' in self.pos_name:
-                    self.pos_name.remove('ns')
-            else:
-                if 'ns' not in self.stricted_pos_name:
-                    self.stricted_pos_name.append('ns')
-                if 'ns' not in self.pos_name:
-                    self.pos_name.append('ns')
-
-            if without_person_name:
-                if 'nr' in self.stricted_pos_name:
-                    self.stricted_pos_name.remove('nr')
-                if 'nr' in self.pos_name:
-                    self.pos_name.remove('nr')
-            else:
-                if 'nr' not in self.stricted_pos_name:
-                    self.stricted_pos_name.append('nr')
-                if 'nr' not in self.pos_name:
-                    self.pos_name.append('nr')
+        options = dict(
+            func_word_num=func_word_num, stop_word_num=stop_word_num,
+            max_phrase_len=max_phrase_len, topic_theta=topic_theta,
+            allow_pos_weight=allow_pos_weight, stricted_pos=stricted_pos,
+            allow_length_weight=allow_length_weight,
+            allow_topic_weight=allow_topic_weight,
+            without_person_name=without_person_name,
+            without_location_name=without_location_name,
+            remove_phrases_list=remove_phrases_list,
+            remove_words_list=remove_words_list,
+            specified_words=specified_words, bias=bias, lexicon=lexicon)
+        return self._extract_keyphrase(text, top_k, with_weight, options)
+
+    def _bind_options(self, kwargs):
+        """
+        以 extract_keyphrase 的签名补全默认参数，与逐篇调用时的参数完全一致
+        :param kwargs: extract_keyphrase 除 text 以外的参数
+        :return: (top_k, with_weight, 其余参数 options)
+        """
+        arguments = inspect.signature(self.extract_keyphrase).bind('', **kwargs)
+        arguments.apply_defaults()
+        options = dict(arguments.arguments)
+        options.pop('text')
+        top_k = options.pop('top_k')
+        with_weight = options.pop('with_weight')
+        return top_k, with_weight, options
 
+    @staticmethod
+    def _compile_lexicon(options):
+        """
+        将 options 中的 remove_phrases_list、remove_words_list、specified_words
+        预先编译为 Lexicon，并校验其与 lexicon 参数不同时指定，不合法时抛出 ValueError。
+        逐篇抽取在每次调用时编译，分块抽取、增量抽取等在多次计算间复用编译后的 options
+        :return: lexicon 已编译的 options 副本
+        """
+        options = dict(options)
+        if options.get('lexicon') is None:
+            options['lexicon'] = Lexicon(
+                specified_words=options.get('specified_words'),
+                remove_words=options.get('remove_words_list'),
+                remove_phrases=options.get('remove_phrases_list'))
+        elif options.get('remove_phrases_list') or options.get('remove_words_list') \
+                or options.get('specified_words'):
+            raise ValueError('`lexicon` can not be used together with `remove_phrases_list`, '
+                             '`remove_words_list` or `specified_words`.')
+        options['remove_phrases_list'] = None
+        options['remove_words_list'] = None
+        options['specified_words'] = dict()
+        return options
+
+    def _extract_keyphrase(self, text, top_k, with_weight, options, presegmented=None):
+        """
+        extract_keyphrase 的实现
+        :param options: 除 top_k、with_weight 以外的全部抽取参数
+        :param presegmented: (dict) 预先批量分词得到的 {句子: 分词结果}，为 None 时逐篇分词
+        """
+        # 配置错误直接抛出，不作为非法文本处理
+        options = self._compile_lexicon(options)
+        self._bind_seg_cache()
+
+        # 未开启统计时 doc_stats 为 None，各步骤均不计时、不计数
+        stats = self.stats
+        doc_stats = None if stats is None else new_document_stats()
+        try:
             # step0: 清洗文本，去除杂质
+            if doc_stats is not None:
+                tick = time.perf_counter()
             text = self._preprocessing_text(text)
+            if doc_stats is not None:
+                record_step(doc_stats, 'preprocess', tick)
 
-            # step1: 分句，使用北大的分词器 pkuseg 做分词和词性标注
-            sentences_list = self._split_sentences(text)
-            sentences_segs_list = list()
-            counter_segs_list = list()
-            for sen in sentences_list:
-                sen_segs = self.seg.cut(sen)
-                sentences_segs_list.append(sen_segs)
-                counter_segs_list.extend(sen_segs)
-
-            # step2: 计算词频
-            total_length = len(counter_segs_list)
-            freq_counter = Counter([item[0] for item in counter_segs_list])
-            freq_dict = dict(freq_counter.most_common())
-
-            # step3: 计算每一个词的权重
-            sentences_segs_weights_list = list()
-            for sen, sen_segs in zip(sentences_list, sentences_segs_list):
-                sen_segs_weights = list()
-                for word_pos in sen_segs:
-                    word, pos = word_pos
-                    if pos in self.pos_name:  # 虚词权重为 0
-                        if word in self.stop_words:  # 停用词权重为 0
-                            weight = 0.0
-                        else:
-                            if word in specified_words:  # 为词计算权重
-                                if bias is None:
-                                    weight = freq_dict[word] * self.idf_dict.get(
-                                        word, self.median_idf) / total_length + 1 / specified_words[word]
-                                else:
-                                    weight = freq_dict[word] * self.idf_dict.get(
-                                        word, self.median_idf) / total_length + bias
+            if self.result_cache is None:
+                ranked_phrases = self._extract_ranked(
+                    text, presegmented=presegmented, doc_stats=doc_stats, **options)
+            else:
+                # 缓存完整的排序结果，不同 top_k、with_weight 的请求无须重新计算
+                cache_key = self.result_cache.make_key(text, options)
+                ranked_phrases = self.result_cache.get(cache_key)
+                if ranked_phrases is None:
+                    ranked_phrases = self._extract_ranked(
+                        text, presegmented=presegmented, doc_stats=doc_stats, **options)
+                    self.result_cache.put(cache_key, ranked_phrases)
+                elif doc_stats is not None:
+                    doc_stats['result_cache_hit'] = True
+
+            # step7: 选取 top_k 个
+            final_res = self._select_top_k(ranked_phrases, top_k, with_weight)
+
+        except Exception as e:
+            # 非法文本返回空结果，不中断批量处理；失败原因记入日志与运行统计
+            logger.warning('the text is not legal. %s: %s', type(e).__name__, e)
+            if doc_stats is not None:
+                doc_stats['error'] = (type(e).__name__, str(e))
+            final_res = []
+
+        if doc_stats is not None:
+            stats.record(doc_stats)
+        return final_res
+
+    def _extract_ranked(self, text, presegmented=None, doc_stats=None, **options):
+        """
+        对清洗后的文本执行 step1~step6，返回按权重降序排列的全部正权重短语，
+        格式为 [(短语, 权重)]，presegmented 同 _extract_keyphrase，其余参数含义同 extract_keyphrase
+        :param doc_stats: 单篇文本的运行统计，由 ckpe.instrument.new_document_stats 生成
+        """
+        candidate_phrases_dict = self._extract_candidates(
+            text, presegmented=presegmented, doc_stats=doc_stats, **options)
+        return self._finalize_candidates(candidate_phrases_dict.items(), doc_stats=doc_stats)
+
+    @classmethod
+    def _finalize_candidates(cls, candidate_phrases_list, top_k=-1, with_weight=True,
+                             doc_stats=None):
+        """
+        step5~step7：对候选短语做 mmr 去重，按权重降序排列并去除非正权重的短语，再选取 top_k 个。
+        逐篇抽取、分块抽取、增量抽取与语料汇总共用
+        :param candidate_phrases_list: (短语, [token 列表, 权重]) 的可迭代对象，token 数相同的
+            短语按给定的顺序去重，权重会被 mmr 修改
+        :param doc_stats: 单篇文本的运行统计，开启时记录 mmr 与排序的耗时
+        :return: [(短语, 权重)]，with_weight 为 False 时为 [短语]
+        """
+        if doc_stats is not None:
+            tick = time.perf_counter()
+
+        # step5: 将 overlaping 过量的短语进行去重过滤
+        # 尝试了依据权重高低，将较短的短语替代重复了的较长的短语，但效果不好，故删去
+        candidate_phrases_list = sorted(
+            candidate_phrases_list, 
+            key=lambda item: len(item[1][0]), reverse=True)
+
+        de_duplication_candidate_phrases_list = cls._mmr_de_duplication(
+            candidate_phrases_list, doc_stats=doc_stats)
+        if doc_stats is not None:
+            tick = record_step(doc_stats, 'mmr', tick)
+
+        # step6: 按重要程度进行排序
+        candidate_phrases_list = sorted(de_duplication_candidate_phrases_list, 
+                                        key=lambda item: item[1][1], reverse=True)
+
+        ranked_phrases = [(item[0], item[1][1]) for item in candidate_phrases_list
+                          if item[1][1] > 0]
+        if doc_stats is not None:
+            record_step(doc_stats, 'sort', tick)
+            doc_stats['phrases'] += len(ranked_phrases)
+
+        # step7: 选取 top_k 个
+        return cls._select_top_k(ranked_phrases, top_k, with_weight)
+
+    @staticmethod
+    def _select_top_k(ranked_phrases, top_k, with_weight):
+        """
+        由按权重降序排列的 [(短语, 权重)] 选取 top_k 个，返回新的列表，不修改缓存的排序结果
+        :param top_k: -1 返回所有短语
+        """
+        if top_k != -1:
+            ranked_phrases = ranked_phrases[:top_k]
+        if with_weight:
+            return list(ranked_phrases)
+        return [item[0] for item in ranked_phrases]
+
+    def _extract_candidates(self, text, presegmented=None, doc_stats=None,
+                            func_word_num=1, stop_word_num=0,
+                            max_phrase_len=25, topic_theta=0.5,
+                            allow_pos_weight=True, stricted_pos=True,
+                            allow_length_weight=True, allow_topic_weight=True,
+                            without_person_name=False, without_location_name=False,
+                            remove_phrases_list=None, remove_words_list=None,
+                            specified_words=dict(), bias=None, lexicon=None):
+        """
+        对清洗后的文本执行 step1~step4，参数含义同 _extract_ranked
+        :return: mmr 去重之前的候选短语 {短语: [token 列表, 权重]}，按首次出现的顺序排列
+        """
+        # 配置参数，词性集合为只读的 frozenset，不修改对象状态，多线程调用互不影响
+        pos_name_set, stricted_pos_name_set, pos_exception_set = self._pos_name_sets(
+            without_person_name=without_person_name,
+            without_location_name=without_location_name)
+        if lexicon is None:
+            # 原始 list 在本次调用中转为哈希集合，词典较大时应传入预先构建的 lexicon
+            lexicon = Lexicon(specified_words=specified_words, remove_words=remove_words_list,
+                              remove_phrases=remove_phrases_list)
+
+        # step1: 分句，使用北大的分词器 pkuseg 做分词和词性标注
+        if doc_stats is not None:
+            tick = time.perf_counter()
+        sentences_list = self._split_sentences(text)
+        if doc_stats is not None:
+            tick = record_step(doc_stats, 'split', tick)
+        if presegmented is None:
+            sentences_segs_list = self._cut_batch(sentences_list)
+        else:
+            sentences_segs_list = [presegmented[sen] for sen in sentences_list]
+        if doc_stats is not None:
+            tick = record_step(doc_stats, 'segment', tick)
+            doc_stats['sentences'] += len(sentences_list)
+            doc_stats['tokens'] += sum(len(sen_segs) for sen_segs in sentences_segs_list)
+
+        # step2、step3: 计算词频，以及每一个词的权重
+        sentences_segs_weights_list = self._word_weights(
+            sentences_segs_list, pos_name_set,
+            specified_words=lexicon.specified_words, bias=bias)
+        if doc_stats is not None:
+            tick = record_step(doc_stats, 'weight', tick)
+
+        # step4: 通过一定规则，找到候选短语集合，以及其权重
+        candidate_phrases_dict = self._candidate_phrases(
+            sentences_segs_list, sentences_segs_weights_list,
+            pos_sets=(stricted_pos_name_set, pos_exception_set),
+            func_word_num=func_word_num, stop_word_num=stop_word_num,
+            max_phrase_len=max_phrase_len, topic_theta=topic_theta,
+            allow_pos_weight=allow_pos_weight, stricted_pos=stricted_pos,
+            allow_length_weight=allow_length_weight,
+            allow_topic_weight=allow_topic_weight,
+            lexicon=lexicon, doc_stats=doc_stats)
+        if doc_stats is not None:
+            record_step(doc_stats, 'candidate', tick)
+            doc_stats['candidates'] += len(candidate_phrases_dict)
+        return candidate_phrases_dict
+
+    def _word_weights(self, sentences_segs_list, pos_name_set, specified_words=dict(), bias=None,
+                      freq_dict=None, total_length=None):
+        """
+        计算每个句子中每个词的 tfidf 权重，虚词与停用词权重为 0
+        :param freq_dict: 全文的词频，分块处理长文本时由各块词频合并得到；为 None 时
+            由 sentences_segs_list 统计
+        :param total_length: 全文的 token 总数，与 freq_dict 同时指定
+        :return: 与 sentences_segs_list 一一对应的权重列表
+        """
+        # step2: 计算词频
+        if freq_dict is None:
+            freq_dict, total_length = self._word_freq(sentences_segs_list)
+
+        # step3: 计算每一个词的权重
+        sentences_segs_weights_list = list()
+        for sen_segs in sentences_segs_list:
+            sen_segs_weights = list()
+            for word_pos in sen_segs:
+                word, pos = word_pos
+                if pos in pos_name_set:  # 虚词权重为 0
+                    if word in self.stop_words:  # 停用词权重为 0
+                        weight = 0.0
+                    else:
+                        if word in specified_words:  # 为词计算权重
+                            if bias is None:
+                                weight = freq_dict[word] * self.idf_dict.get(
+                                    word, self.median_idf) / total_length + 1 / specified_words[word]
                             else:
                                 weight = freq_dict[word] * self.idf_dict.get(
-                                    word, self.median_idf) / total_length
-                    else:
-                        weight = 0.0
-                    sen_segs_weights.append(weight)
-                sentences_segs_weights_list.append(sen_segs_weights)
-
-            # step4: 通过一定规则，找到候选短语集合，以及其权重
-            candidate_phrases_dict = dict()
-            for sen_segs, sen_segs_weights in zip(
-                sentences_segs_list, sentences_segs_weights_list):
-                sen_length = len(sen_segs)
-
-                for n in range(1, sen_length + 1):  # n-grams
-                    for i in range(0, sen_length - n + 1):
-                        candidate_phrase = sen_segs[i: i + n]
-
-                        # 由于 pkuseg 的缺陷，日期被识别为 n 而非 t，故删除日期
-                        res = self.extra_date_ptn.match(candidate_phrase[-1][0])
-                        if res is not None:
-                            continue
-
-                        # 找短语过程中需要进行过滤，分为严格、宽松规则
-                        if not stricted_pos:  
-                            rule_flag = self._loose_candidate_phrases_rules(
-                                candidate_phrase, func_word_num=func_word_num,
-                                max_phrase_len=max_phrase_len,  
-                                stop_word_num=stop_word_num)
-                        else:
-                            rule_flag = self._stricted_candidate_phrases_rules(
-                                candidate_phrase, max_phrase_len=max_phrase_len)
-                        if not rule_flag:
-                            continue
-
-                        # 由于 pkuseg 的缺陷，会把一些杂质符号识别为 n、v、adj，故须删除
-                        redundent_flag = False
-                        for item in candidate_phrase:
-                            matched = self.redundent_strict_pattern.search(item[0])
-                            if matched is not None:
-                                redundent_flag = True
-                                break
-                            matched = self.redundent_loose_pattern.search(item[0])
-
-                            if matched is not None and matched.group() == item[0]:
-                                redundent_flag = True
-                                break
-                        if redundent_flag:
-                            continue
-                            
-                        # 如果短语中包含了某些不想要的词，则跳过
-                        if remove_words_list is not None:
-                            unwanted_phrase_flag = False
-                            for item in candidate_phrase:
-                                if item[0] in remove_words_list:
-                                    unwanted_phrase_flag = True
-                                    break
-                            if unwanted_phrase_flag:
-                                continue
-
-                        # 如果短语中没有一个 token 存在于指定词汇中，则跳过
-                        if specified_words != dict():
-                            with_specified_words_flag = False
-                            for item in candidate_phrase:
-                                if item[0] in specified_words:
-                                    with_specified_words_flag = True
-                                    break
-                            if not with_specified_words_flag:
-                                continue
-
-                        # 条件六：短语的权重需要乘上'词性权重'
-                        if allow_pos_weight:
-                            start_end_pos = None
-                            if len(candidate_phrase) == 1:
-                                start_end_pos = candidate_phrase[0][1]
-                            elif len(candidate_phrase) >= 2:
-                                start_end_pos = candidate_phrase[0][1] + '|' + candidate_phrase[-1][1]
-                            pos_weight = self.pos_combine_weights_dict.get(start_end_pos, 1.0)
+                                    word, self.median_idf) / total_length + bias
                         else:
-                            pos_weight = 1.0
+                            weight = freq_dict[word] * self.idf_dict.get(
+                                word, self.median_idf) / total_length
+                else:
+                    weight = 0.0
+                sen_segs_weights.append(weight)
+            sentences_segs_weights_list.append(sen_segs_weights)
+        return sentences_segs_weights_list
 
-                        # 条件七：短语的权重需要乘上 '长度权重'
-                        if allow_length_weight:
-                            length_weight = self.phrases_length_control_dict.get(
-                                len(sen_segs_weights[i: i + n]), 
-                                self.phrases_length_control_none)
-                        else:
-                            length_weight = 1.0
-
-                        # 条件八：短语的权重需要加上`主题突出度权重`
-                        if allow_topic_weight:
-                            topic_weight = 0.0
-                            for item in candidate_phrase:
-                                topic_weight += self.topic_prominence_dict.get(
-                                    item[0], self.unk_topic_prominence_value)
-                            topic_weight = topic_weight / len(candidate_phrase)
-                        else:
-                            topic_weight = 0.0
-
-                        candidate_phrase_weight = sum(sen_segs_weights[i: i + n])
-                        candidate_phrase_weight *= length_weight * pos_weight
-                        candidate_phrase_weight += topic_weight * topic_theta
-
-                        candidate_phrase_string = ''.join([tup[0] for tup in candidate_phrase])
-                        if remove_phrases_list is not None:
-                            if candidate_phrase_string in remove_phrases_list:
-                                continue
-                        if candidate_phrase_string not in candidate_phrases_dict:
-                            candidate_phrases_dict.update(
-                                {candidate_phrase_string: [candidate_phrase, 
-                                                           candidate_phrase_weight]})
-
-            # step5: 将 overlaping 过量的短语进行去重过滤
-            # 尝试了依据权重高低，将较短的短语替代重复了的较长的短语，但效果不好，故删去
-            candidate_phrases_list = sorted(
-                candidate_phrases_dict.items(), 
-                key=lambda item: len(item[1][0]), reverse=True)
-
-            de_duplication_candidate_phrases_list = list()
-            for item in candidate_phrases_list:
-                sim_ratio = self._mmr_similarity(
-                    item, de_duplication_candidate_phrases_list)
-                if sim_ratio != 1:
-                    item[1][1] = (1 - sim_ratio) * item[1][1]
-                    de_duplication_candidate_phrases_list.append(item)
-
-            # step6: 按重要程度进行排序，选取 top_k 个
-            candidate_phrases_list = sorted(de_duplication_candidate_phrases_list, 
-                                            key=lambda item: item[1][1], reverse=True)
-
-            if with_weight:
-                if top_k != -1:
-                    final_res = [(item[0], item[1][1]) for item in candidate_phrases_list[:top_k]
-                                 if item[1][1] > 0]
+    @staticmethod
+    def _word_freq(sentences_segs_list):
+        ''' 统计词频，返回 (词 -> 词频, token 总数) '''
+        freq_counter = Counter()
+        total_length = 0
+        for sen_segs in sentences_segs_list:
+            freq_counter.update(item[0] for item in sen_segs)
+            total_length += len(sen_segs)
+        return dict(freq_counter), total_length
+
+    def _candidate_phrases(self, sentences_segs_list, sentences_segs_weights_list,
+                           pos_sets, func_word_num=1, stop_word_num=0,
+                           max_phrase_len=25, topic_theta=0.5,
+                           allow_pos_weight=True, stricted_pos=True,
+                           allow_length_weight=True, allow_topic_weight=True,
+                           lexicon=None, doc_stats=None):
+        """
+        按规则生成候选短语，并计算其权重
+        :param pos_sets: (严格规则词性集合, 虚词词性集合)
+        :param lexicon: (ckpe.lexicon.Lexicon) 词典约束，为 None 时不做约束
+        :param doc_stats: 单篇文本的运行统计，开启时记录各规则的剪枝次数
+        :return: {短语: [token 列表, 权重]}
+        """
+        prune_counts = None if doc_stats is None else doc_stats['pruned']
+        if lexicon is None:
+            lexicon = Lexicon()
+        candidate_phrases_dict = dict()
+        pos_single_weights, pos_pair_weights = self._pos_weight_tables()
+        for sen_segs, sen_segs_weights in zip(
+            sentences_segs_list, sentences_segs_weights_list):
+            # 预计算每个 token 的特征，每个 span 的权重和、主题突出度和在延伸时累加得到
+            token_features = self._token_features(
+                sen_segs, sen_segs_weights, allow_topic_weight=allow_topic_weight)
+            words, poses = token_features[0], token_features[1]
+
+            spans = self._candidate_spans(
+                token_features, pos_sets=pos_sets,
+                stricted_pos=stricted_pos,
+                func_word_num=func_word_num, stop_word_num=stop_word_num,
+                max_phrase_len=max_phrase_len, remove_words=lexicon.remove_words,
+                specified_words=lexicon.specified_words, prune_counts=prune_counts)
+            if doc_stats is not None:
+                doc_stats['spans'] += len(spans)
+
+            for n, i, weight_sum, prominence_sum in spans:
+                candidate_phrase_string = ''.join(words[i: i + n])
+                if candidate_phrase_string in candidate_phrases_dict:
+                    if prune_counts is not None:
+                        prune_counts['duplicate_phrase'] += 1
+                    continue
+                if lexicon.has_phrase_rules:
+                    rejected_rule = lexicon.reject_phrase(candidate_phrase_string)
+                    if rejected_rule is not None:
+                        if prune_counts is not None:
+                            prune_counts[rejected_rule] += 1
+                        continue
+
+                # 条件六：短语的权重需要乘上'词性权重'
+                if allow_pos_weight:
+                    if n == 1:
+                        pos_weight = pos_single_weights.get(poses[i], 1.0)
+                    else:
+                        pos_weight = pos_pair_weights.get((poses[i], poses[i + n - 1]), 1.0)
+                else:
+                    pos_weight = 1.0
+
+                # 条件七：短语的权重需要乘上 '长度权重'
+                if allow_length_weight:
+                    length_weight = self.phrases_length_control_dict.get(
+                        n, self.phrases_length_control_none)
                 else:
-                    final_res = [(item[0], item[1][1]) for item in candidate_phrases_list
-                                 if item[1][1] > 0]
+                    length_weight = 1.0
+
+                # 条件八：短语的权重需要加上`主题突出度权重`
+                if allow_topic_weight:
+                    topic_weight = prominence_sum / n
+                else:
+                    topic_weight = 0.0
+
+                candidate_phrase_weight = weight_sum
+                candidate_phrase_weight *= length_weight * pos_weight
+                candidate_phrase_weight += topic_weight * topic_theta
+
+                candidate_phrases_dict.update(
+                    {candidate_phrase_string: [sen_segs[i: i + n],
+                                               candidate_phrase_weight]})
+
+        return candidate_phrases_dict
+
+    def extract_keyphrase_batch(self, texts, n_jobs=None, chunksize=1,
+                                backend='process', **kwargs):
+        """
+        批量抽取多篇文本的关键短语，使用多进程并行。
+        在支持 fork 的平台上，子进程直接继承当前对象已加载的 idf、lda 与 pkuseg 模型，
+        内存以 copy-on-write 方式共享，不会随进程数成倍增长。
+        :param texts: (list) 多篇 utf-8 编码中文文本
+        :param n_jobs: 进程数，默认为 None，即使用全部 cpu；为 1 时在当前进程串行处理
+        :param chunksize: 每次分配给子进程的文本篇数，文本较短时可适当调大以降低通信开销
+        :param backend: 'process' 使用进程池；'thread' 使用线程池，所有线程共用当前对象，
+            extract_keyphrase 不修改对象状态，可安全地被多线程同时调用；
+            'segment' 将全部文本的句子去重后一次性分词（句子较多时使用 pkuseg 的多进程
+            文件模式，n_jobs 为其进程数），再在当前进程逐篇计算，适合大量短文本
+        :param kwargs: 与 extract_keyphrase 的参数一致
+        :return: 与输入顺序一致的关键短语列表，结果与逐篇调用 extract_keyphrase 相同
+        """
+        if backend == 'segment':
+            return self._extract_keyphrase_batch_segmented(texts, n_jobs=n_jobs, **kwargs)
+        return parallel.map_documents(self, texts, n_jobs=n_jobs, chunksize=chunksize,
+                                      backend=backend, **kwargs)
+
+    def _extract_keyphrase_batch_segmented(self, texts, n_jobs=None, **kwargs):
+        """ 先对全部文本的句子批量分词，再逐篇抽取 """
+        top_k, with_weight, options = self._bind_options(kwargs)
+
+        sentences = list()
+        for text in texts:
+            try:
+                sentences.extend(self._split_sentences(self._preprocessing_text(text)))
+            except Exception:
+                continue  # 非法文本在逐篇抽取时处理
+        sentences = list(dict.fromkeys(sentences))
+        presegmented = dict(zip(sentences, self._cut_batch(
+            sentences, nthread=parallel.get_n_jobs(n_jobs))))
+
+        return [self._extract_keyphrase(text, top_k, with_weight, options,
+                                        presegmented=presegmented)
+                for text in texts]
+
+    def extract_keyphrase_chunked(self, text, top_k=5, with_weight=False, n_jobs=None,
+                                  chunk_size=50000, chunk_top_n=None, **kwargs):
+        """
+        分块并行抽取一篇超长文本（如 1~50MB 的报告、书籍）的关键短语。文本按句子边界切块，
+        各块并行分词、统计词频，合并为全文词频后再并行生成候选短语，每块只保留权重最高的
+        chunk_top_n 个，合并时全文也只保留权重最高的 chunk_top_n 个，最后统一做 mmr 去重与排序。
+        分词结果暂存于磁盘，但文本本身及其句子列表仍驻留内存。不使用结果缓存，也不记录运行统计
+        :param text: utf-8 编码中文文本
+        :param n_jobs: 进程数，默认为 None，即使用全部 cpu；为 1 时在当前进程逐块处理
+        :param chunk_size: 每块的字数
+        :param chunk_top_n: 每块保留的候选短语数，默认为 max(20 * top_k, 1000)，top_k 为 -1 时
+            全部保留；为 -1 时结果与 extract_keyphrase 相同，否则排序靠前的短语近似一致
+        :param kwargs: 与 extract_keyphrase 的参数一致
+        :return: 关键短语及其权重
+        """
+        return chunked.extract_chunked(
+            self, text, top_k=top_k, with_weight=with_weight, n_jobs=n_jobs,
+            chunk_size=chunk_size, chunk_top_n=chunk_top_n, **kwargs)
+
+    def create_session(self, text=None, **kwargs):
+        """
+        创建增量抽取会话，适合持续增长的文本（直播稿、讨论串等）：追加文本时只处理新增句子，
+        并只更新权重受影响的候选短语，见 ckpe.session
+        :param text: 初始文本，可为 None
+        :param kwargs: 与 extract_keyphrase 的参数一致
+        :return: ckpe.session.KeyphraseSession 对象
+        """
+        return KeyphraseSession(self, text=text, **kwargs)
+
+    def extract_keyphrase_stream(self, source, n_jobs=1, window=64, ordered=False,
+                                 input_format=None, text_key='text', id_key='id',
+                                 **kwargs):
+        """
+        流式抽取语料中每篇文本的关键短语，内存占用受 window 限制，适合处理大规模语料
+        :param source: 文件路径、文件对象，或 str、dict、(doc_id, text) 的可迭代对象
+        :param n_jobs: 进程数，默认为 1，即在当前进程逐篇处理
+        :param window: 同一时刻处理中的文本篇数上限
+        :param ordered: 为 True 时按输入顺序返回结果，否则按完成顺序返回
+        :param input_format: 'line' 或 'jsonl'，默认根据文件后缀判断
+        :param text_key: jsonl 格式中文本所在的字段名
+        :param id_key: jsonl 格式中文档 id 所在的字段名，缺失时使用行号
+        :param kwargs: 与 extract_keyphrase 的参数一致
+        :return: (doc_id, 关键短语) 生成器
+        """
+        documents = stream.read_documents(
+            source, input_format=input_format, text_key=text_key, id_key=id_key)
+        return stream.stream_extract(self, documents, n_jobs=n_jobs, window=window,
+                                     ordered=ordered, **kwargs)
+
+    def _token_features(self, sen_segs, sen_segs_weights, allow_topic_weight=True):
+        """
+        预计算一个句子中每个 token 的特征，供 _candidate_spans 延伸 span 时直接查表
+        :return: (词列表, 词性列表, tfidf 权重列表, 主题突出度列表, 是否为杂质符号列表)
+        """
+        words = [item[0] for item in sen_segs]
+        poses = [item[1] for item in sen_segs]
+        if allow_topic_weight:
+            prominences = [self.topic_prominence_dict.get(
+                word, self.unk_topic_prominence_value) for word in words]
+        else:
+            prominences = [0.0] * len(words)
+        redundant_flags = [self._is_redundant_word(word) for word in words]
+        return words, poses, sen_segs_weights, prominences, redundant_flags
+
+    def _pos_weight_tables(self):
+        ''' 将词性组合权重字典拆分为单词性、(首词性, 尾词性) 两个查找表，并缓存 '''
+        cached = getattr(self, '_pos_weight_tables_cache', None)
+        if cached is not None and cached[0] is self.pos_combine_weights_dict:
+            return cached[1], cached[2]
+
+        pos_single_weights = dict()
+        pos_pair_weights = dict()
+        for key, weight in self.pos_combine_weights_dict.items():
+            if '|' in key:
+                start_pos, end_pos = key.split('|', 1)
+                pos_pair_weights[(start_pos, end_pos)] = weight
+            else:
+                pos_single_weights[key] = weight
+        self._pos_weight_tables_cache = (
+            self.pos_combine_weights_dict, pos_single_weights, pos_pair_weights)
+        return pos_single_weights, pos_pair_weights
+
+    def _candidate_spans(self, token_features, pos_sets=None, stricted_pos=True,
+                         func_word_num=1, stop_word_num=0, max_phrase_len=25,
+                         remove_words=frozenset(), specified_words=dict(),
+                         prune_counts=None):
+        """
+        找出一个句子中所有满足规则的候选短语 span，规则与 _stricted_candidate_phrases_rules、
+        _loose_candidate_phrases_rules 一致。每个起点向右逐词延伸，并累计字符数、虚词数、
+        停用词数，一旦违反 token 数、字符数、词性等单调规则即停止延伸，避免 O(n^2) 地构造切片。
+        延伸的同时累加 tfidf 权重与主题突出度，每个 span 的打分均为 O(1)，
+        且累加顺序与 sum(weights[i: i + n]) 相同，结果完全一致。
+        :param token_features: _token_features 的返回值
+        :param pos_sets: (严格规则词性集合, 虚词词性集合)，默认由 _pos_name_sets 得到
+        :param remove_words: (frozenset) 短语中不可包含的词
+        :param specified_words: (dict|set) 若不为空，短语中须包含其中的词
+        :param prune_counts: (Counter) 不为 None 时，按规则名累计被剪枝的次数：
+            首词规则剪掉一个起点、延伸规则剪掉该起点之后的全部延伸、末词规则剪掉一个 span
+        :return: 按 (n, i) 排序的 (n, i, 权重和, 主题突出度和) 列表，顺序与逐个枚举 n-gram 时一致
+        """
+        words, poses, weights, prominences, redundant_flags = token_features
+        if pos_sets is None:
+            pos_sets = self._pos_name_sets()[1:]
+        stricted_pos_name_set, pos_exception_set = pos_sets
+        stop_words = self.stop_words
+        require_specified_words = bool(specified_words)
+        sen_length = len(words)
+        spans = list()
+        for i in range(sen_length):
+            # 条件四：短语的首词不满足规则，则以其开头的短语均不合法
+            if stricted_pos:
+                if poses[i] in ['v', 'vd', 'vx']:  # 动名词不算在内
+                    if prune_counts is not None:
+                        prune_counts['start_pos'] += 1
+                    continue
             else:
-                if top_k != -1:
-                    final_res = [item[0] for item in candidate_phrases_list[:top_k]
-                                 if item[1][1] > 0]
+                if poses[i] in pos_exception_set:
+                    if prune_counts is not None:
+                        prune_counts['start_pos'] += 1
+                    continue
+                if words[i] in stop_words:
+                    if prune_counts is not None:
+                        prune_counts['start_stop_word'] += 1
+                    continue
+
+            char_length = 0
+            func_word_count = 0
+            stop_word_count = 0
+            with_specified_words_flag = False
+            weight_sum = 0.0
+            prominence_sum = 0.0
+            for j in range(i, min(i + 12, sen_length)):  # 条件一：一个短语不能超过 12个 token
+                word = words[j]
+                pos = poses[j]
+
+                # 条件二：一个短语不能超过 max_phrase_len 个 char
+                char_length += len(word)
+                if char_length > max_phrase_len:
+                    if prune_counts is not None:
+                        prune_counts['max_chars'] += 1
+                    break
+
+                # 条件三：严格规则下必须是名词短语，宽松规则下虚词、停用词不可超过规定个数
+                if stricted_pos:
+                    if pos not in stricted_pos_name_set:
+                        if prune_counts is not None:
+                            prune_counts['pos'] += 1
+                        break
                 else:
-                    final_res = [item[0] for item in candidate_phrases_list
-                                 if item[1][1] > 0]
-            return final_res
+                    if pos in pos_exception_set:
+                        func_word_count += 1
+                        if func_word_count > func_word_num:
+                            if prune_counts is not None:
+                                prune_counts['func_word'] += 1
+                            break
+                    if word in stop_words:
+                        stop_word_count += 1
+                        if stop_word_count > stop_word_num:
+                            if prune_counts is not None:
+                                prune_counts['stop_word'] += 1
+                            break
+
+                # 由于 pkuseg 的缺陷，会把一些杂质符号识别为 n、v、adj，故须删除
+                if redundant_flags[j]:
+                    if prune_counts is not None:
+                        prune_counts['redundant'] += 1
+                    break
+
+                # 如果短语中包含了某些不想要的词，则跳过
+                if remove_words and word in remove_words:
+                    if prune_counts is not None:
+                        prune_counts['remove_words'] += 1
+                    break
+
+                if word in specified_words:
+                    with_specified_words_flag = True
+                weight_sum += weights[j]
+                prominence_sum += prominences[j]
+
+                # 以下规则只针对末词，不满足时仍可继续延伸
+                if stricted_pos:
+                    if pos in ['a', 'ad', 'vd', 'vx', 'v']:  # 结束词必须是名词
+                        if prune_counts is not None:
+                            prune_counts['end_pos'] += 1
+                        continue
+                else:
+                    if pos in pos_exception_set or pos in ['v', 'd']:
+                        if prune_counts is not None:
+                            prune_counts['end_pos'] += 1
+                        continue
+                    if word in stop_words:
+                        if prune_counts is not None:
+                            prune_counts['end_stop_word'] += 1
+                        continue
+
+                # 由于 pkuseg 的缺陷，日期被识别为 n 而非 t，故删除日期
+                if self.extra_date_ptn.match(word) is not None:
+                    if prune_counts is not None:
+                        prune_counts['date'] += 1
+                    continue
+
+                # 如果短语中没有一个 token 存在于指定词汇中，则跳过
+                if require_specified_words and not with_specified_words_flag:
+                    if prune_counts is not None:
+                        prune_counts['specified_words'] += 1
+                    continue
+
+                spans.append((j - i + 1, i, weight_sum, prominence_sum))
+            else:
+                if prune_counts is not None and i + 12 < sen_length:
+                    prune_counts['max_tokens'] += 1
+
+        spans.sort(key=lambda span: (span[0], span[1]))
+        return spans
+
+    def _is_redundant_word(self, word):
+        ''' 判断词汇是否为杂质符号 '''
+        if self.redundent_strict_pattern.search(word) is not None:
+            return True
+        matched = self.redundent_loose_pattern.search(word)
+        if matched is not None and matched.group() == word:
+            return True
+        return False
+
+    @staticmethod
+    def _mmr_de_duplication(candidate_phrases_list, doc_stats=None):
+        """
+        依次计算每个候选短语与已选短语的 mmr 相似度，用于考察信息量：
+        相似度为 1 的短语被丢弃，其余短语的权重乘以 (1 - 相似度)。
+        维护 token 到已选短语的倒排索引，只统计与候选短语有公共 token 的已选短语，
+        结果与逐一比较全部已选短语相同。
+        :param candidate_phrases_list: 按 token 数降序排列的 (短语, [tokens, 权重]) 列表
+        :param doc_stats: 单篇文本的运行统计，开启时记录相似度比较次数与丢弃的短语数
+        :return: 去重后的短语列表，权重已按相似度调整
+        """
+        de_duplication_candidate_phrases_list = list()
+        token_index = dict()  # token -> 包含该 token 的已选短语序号
+        for item in candidate_phrases_list:
+            candidate_info = set([token[0] for token in item[1][0]])
+            candidate_length = len(candidate_info)
+
+            max_common_length = 0
+            common_length_dict = dict()
+            for token in candidate_info:
+                postings = token_index.get(token, ())
+                if doc_stats is not None:
+                    doc_stats['mmr_comparisons'] += len(postings)
+                for idx in postings:
+                    common_length = common_length_dict.get(idx, 0) + 1
+                    common_length_dict[idx] = common_length
+                    if common_length > max_common_length:
+                        max_common_length = common_length
+                if max_common_length == candidate_length:
+                    break  # 已被某个短语完全覆盖，相似度为 1
+
+            sim_ratio = max_common_length / candidate_length
+            if sim_ratio != 1:
+                item[1][1] = (1 - sim_ratio) * item[1][1]
+                idx = len(de_duplication_candidate_phrases_list)
+                de_duplication_candidate_phrases_list.append(item)
+                for token in candidate_info:
+                    token_index.setdefault(token, []).append(idx)
+            elif doc_stats is not None:
+                doc_stats['mmr_removed'] += 1
+
+        return de_duplication_candidate_phrases_list
 
-        except Exception as e:
-            print('the text is not legal. \n{}'.format(e))
-            return []
-
-    def _mmr_similarity(self, candidate_item, 
-                        de_duplication_candidate_phrases_list):
-        ''' 计算 mmr 相似度，用于考察信息量 '''
-        sim_ratio = 0.0
-        candidate_info = set([item[0] for item in candidate_item[1][0]])
-        
-        for de_du_item in de_duplication_candidate_phrases_list:
-            no_info = set([item[0] for item in de_du_item[1][0]])
-            common_part = candidate_info & no_info
-            if sim_ratio < len(common_part) / len(candidate_info):
-                sim_ratio = len(common_part) / len(candidate_info)
-        return sim_ratio
-        
     def _loose_candidate_phrases_rules(self, candidate_phrase,
                                        max_phrase_len=25, 
                                        func_word_num=1, stop_word_num=0):
@@ -483,34 +1230,66 @@ class ChineseKeyPhrasesExtractor(object):
         
     def _topic_prominence(self):
         ''' 计算每个词语的主题突出度，并保存在内存 '''
-        init_prob_distribution = np.array([self.topic_num for i in range(self.topic_num)])
-        
-        topic_prominence_dict = dict()
-        for word in self.topic_word_weight:
-            conditional_prob_list = list()
-            for i in range(self.topic_num):
-                if str(i) in self.topic_word_weight[word]:
-                    conditional_prob_list.append(self.topic_word_weight[word][str(i)])
-                else:
-                    conditional_prob_list.append(1e-5)
-            conditional_prob = np.array(conditional_prob_list)
-            
-            tmp_dot_log_res = np.log2(np.multiply(conditional_prob, init_prob_distribution))
-            kl_div_sum = np.dot(conditional_prob, tmp_dot_log_res)  # kl divergence
-            topic_prominence_dict.update({word: float(kl_div_sum)})
-            
-        tmp_list = [i[1] for i in tuple(topic_prominence_dict.items())]
-        max_prominence = max(tmp_list)
-        min_prominence = min(tmp_list)
-        for k, v in topic_prominence_dict.items():
-            topic_prominence_dict[k] = (v - min_prominence) / (max_prominence - min_prominence)
-            
-        self.topic_prominence_dict = topic_prominence_dict
+        if self.model_bundle is not None:
+            return self._load_model_bundle()
+        topic_word_path = join(dirname(abspath(__file__)), 'topic_word_weight.json')
+        word_topic_path = join(dirname(abspath(__file__)), 'word_topic_weight.json')
+        topic_prominence_dict, unk_topic_prominence_value, topic_num, word_num = \
+            resources.get_resource(
+                ('topic_prominence', topic_word_path, word_topic_path),
+                partial(resources.compute_topic_prominence, topic_word_path, word_topic_path))
+        self._set_lazy(topic_prominence_dict=topic_prominence_dict,
+                       unk_topic_prominence_value=unk_topic_prominence_value,
+                       topic_num=topic_num, word_num=word_num)
+
+    def load_topic_model(self, topic_word=None, word_topic=None, vocab=None):
+        """
+        加载新的 lda 主题模型，并重新计算主题突出度，无须写出 json 文件。
+        e.g.
+        >>> ckpe_obj.load_topic_model(word_topic=gensim_lda)  # gensim LdaModel
+        >>> ckpe_obj.load_topic_model(word_topic=sklearn_lda.components_,
+                                      vocab=vectorizer.get_feature_names_out())
         
-        # 计算未知词汇的主题突出度，由于停用词已经预先过滤，所以这里不需要再考停用词无突出度
-        tmp_prominence_list = [item[1] for item in self.topic_prominence_dict.items()]
-        self.unk_topic_prominence_value = sum(tmp_prominence_list) / (2 * len(tmp_prominence_list))
+        :param topic_word: p(topic|word)，{word: {topic_id: prob}} 字典，
+            或 shape 为 (word_num, topic_num) 的 numpy 数组、scipy 稀疏矩阵
+        :param word_topic: p(word|topic)，{topic_id: {word: prob}} 字典，
+            或 shape 为 (topic_num, word_num) 的矩阵，或 gensim 的 LdaModel 对象。
+            若未指定 topic_word，则由其按主题均匀先验计算 p(topic|word)
+        :param vocab: (list) 词表，以矩阵形式传入模型时必须指定
+        """
+        from ckpe import topic_model  # 依赖 numpy，推迟导入
+
+        vocab, prominence, self.topic_num = topic_model.topic_prominence(
+            topic_word=topic_word, word_topic=word_topic, vocab=vocab)
+        self.word_num = len(vocab)
+        self.topic_prominence_dict, self.unk_topic_prominence_value = \
+            resources.topic_prominence_summary(vocab, prominence)
+        self.invalidate_result_cache()
+
+    def update_idf(self, idf_file_path):
+        """
+        重新加载 idf 文件，并清空抽取结果缓存，用于定期由新语料重建 idf 后热更新
+        :param idf_file_path: idf 文件路径，可由 `python -m ckpe.build` 生成
+        """
+        self.idf_file_path = idf_file_path
+        path = abspath(idf_file_path)
+        # 同一路径的文件已被重写，须重新读取，已持有旧 idf 的其它抽取器不受影响
+        self.idf_dict, self.median_idf = resources.get_resource(
+            ('idf', path), partial(resources.read_idf, path), reload=True)
+        self.invalidate_result_cache()
+
+    def update_stop_words(self, stop_words):
+        """
+        替换停用词表，并清空抽取结果缓存
+        :param stop_words: (list|set) 新的停用词表
+        """
+        self.stop_words = frozenset(stop_words)
+        self.invalidate_result_cache()
 
+    def invalidate_result_cache(self):
+        """ 清空抽取结果缓存，直接修改 idf_dict、pos_combine_weights_dict 等模型参数后须调用 """
+        if self.result_cache is not None:
+            self.result_cache.clear()
 
 if __name__ == '__main__':
     title = '巴黎圣母院大火：保安查验火警失误 现场找到7根烟头'
@@ -0,0 +1,221 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 18:00
+# File Name: chunked.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+超长文本（1~50MB 的报告、书籍、会议记录等）的分块并行抽取。
+
+逐篇抽取时，全文每个句子的分词结果、词权重与全部候选短语同时驻留内存，且完全串行。
+分块模式按句子边界将清洗后的文本切为约 chunk_size 字的块：
+    1、各块并行分词并统计块内词频，分词结果写入临时目录，词频与 token 总数在主进程合并为全文词频；
+    2、各块并行读取分词结果，按全文词频计算词权重并生成候选短语，每块只返回权重最高的
+       chunk_top_n 个；
+    3、主进程按块的顺序合并候选短语（同一短语保留最先出现的一个），合并结果超过
+       2 * chunk_top_n 个时只保留全文权重最高的 chunk_top_n 个，最后做 mmr 去重与排序。
+
+词权重使用全文词频，与逐篇抽取完全一致，同一短语在各块中的权重相同；chunk_top_n 足够大
+（或为 -1，保留全部候选）时，结果与 extract_keyphrase 相同，否则被截断的低权重短语不再参与
+mmr 去重，排序靠前的短语及其权重与逐篇抽取近似一致。
+
+内存：分词结果暂存于磁盘，候选短语不超过 2 * chunk_top_n 个，其余占用取决于 chunk_size、
+进程数与词表大小；输入文本及其句子列表仍需完整驻留内存，chunk_top_n 为 -1 时全部候选短语
+也驻留内存，二者随文本长度增长。
+
+使用方法：
+    >>> ckpe_obj.extract_keyphrase_chunked(text, top_k=20, n_jobs=8)
+
+"""
+
+import os
+import heapq
+import pickle
+import shutil
+import logging
+import tempfile
+from collections import Counter
+
+from ckpe import parallel
+
+
+logger = logging.getLogger(__name__)
+
+SHARED_FILE = 'shared.pkl'
+
+# 子进程中缓存的 (共享文件路径, 全文词频等参数)，每个进程只读取一次
+_worker_shared = (None, None)
+
+
+def split_chunks(sentences, chunk_size):
+    ''' 将句子依次合并为字数不少于 chunk_size 的块，最后一块可能不足 '''
+    chunk = list()
+    chunk_length = 0
+    for sen in sentences:
+        chunk.append(sen)
+        chunk_length += len(sen)
+        if chunk_length >= chunk_size:
+            yield chunk
+            chunk = list()
+            chunk_length = 0
+    if chunk:
+        yield chunk
+
+
+def count_chunk(extractor, sentences, segs_path):
+    """
+    对一块句子分词，分词结果写入 segs_path
+    :return: (词 -> 块内词频, 块内 token 数)
+    """
+    sentences_segs_list = extractor._cut_batch(sentences)
+    with open(segs_path, 'wb') as f:
+        pickle.dump(sentences_segs_list, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return extractor._word_freq(sentences_segs_list)
+
+
+def rank_chunk(extractor, segs_path, shared, chunk_top_n=-1):
+    """
+    读取一块的分词结果，按全文词频生成候选短语
+    :param shared: (全文词频, 全文 token 数, 抽取参数)
+    :param chunk_top_n: 保留权重最高的短语数，-1 表示全部保留
+    :return: 按块内首次出现顺序排列的 [(短语, [token 列表, 权重])]
+    """
+    freq_dict, total_length, options = shared
+    with open(segs_path, 'rb') as f:
+        sentences_segs_list = pickle.load(f)
+
+    pos_name_set, stricted_pos_name_set, pos_exception_set = extractor._pos_name_sets(
+        without_person_name=options['without_person_name'],
+        without_location_name=options['without_location_name'])
+    lexicon = options['lexicon']
+
+    sentences_segs_weights_list = extractor._word_weights(
+        sentences_segs_list, pos_name_set,
+        specified_words=lexicon.specified_words, bias=options['bias'],
+        freq_dict=freq_dict, total_length=total_length)
+
+    candidate_phrases_dict = extractor._candidate_phrases(
+        sentences_segs_list, sentences_segs_weights_list,
+        pos_sets=(stricted_pos_name_set, pos_exception_set),
+        func_word_num=options['func_word_num'], stop_word_num=options['stop_word_num'],
+        max_phrase_len=options['max_phrase_len'], topic_theta=options['topic_theta'],
+        allow_pos_weight=options['allow_pos_weight'], stricted_pos=options['stricted_pos'],
+        allow_length_weight=options['allow_length_weight'],
+        allow_topic_weight=options['allow_topic_weight'],
+        lexicon=lexicon)
+
+    return top_candidates(list(candidate_phrases_dict.items()), chunk_top_n)
+
+
+def top_candidates(candidate_phrases_list, top_n):
+    """
+    取权重最高的 top_n 个候选短语，并保持原先的顺序，使合并后权重相同的短语排序稳定
+    :param top_n: -1 表示全部保留
+    """
+    if top_n == -1 or len(candidate_phrases_list) <= top_n:
+        return candidate_phrases_list
+
+    top_indices = heapq.nlargest(
+        top_n, range(len(candidate_phrases_list)),
+        key=lambda idx: candidate_phrases_list[idx][1][1])
+    return [candidate_phrases_list[idx] for idx in sorted(top_indices)]
+
+
+def _load_shared(shared_path):
+    global _worker_shared
+    if _worker_shared[0] != shared_path:
+        with open(shared_path, 'rb') as f:
+            _worker_shared = (shared_path, pickle.load(f))
+    return _worker_shared[1]
+
+
+def _count_worker(sentences, segs_path):
+    return count_chunk(parallel._worker_extractor, sentences, segs_path)
+
+
+def _rank_worker(args):
+    segs_path, shared_path, chunk_top_n = args
+    return rank_chunk(parallel._worker_extractor, segs_path,
+                      _load_shared(shared_path), chunk_top_n=chunk_top_n)
+
+
+def extract_chunked(extractor, text, top_k=5, with_weight=False, n_jobs=None,
+                    chunk_size=50000, chunk_top_n=None, **kwargs):
+    """
+    分块并行抽取一篇超长文本的关键短语，参数含义见 extract_keyphrase_chunked
+    """
+    options = extractor._compile_lexicon(extractor._bind_options(kwargs)[2])
+    if chunk_top_n is None:
+        chunk_top_n = -1 if top_k == -1 else max(20 * top_k, 1000)
+
+    n_jobs = parallel.get_n_jobs(n_jobs)
+    spill_dir = tempfile.mkdtemp(prefix='ckpe_chunk_')
+    pool = None
+    try:
+        sentences = extractor._split_sentences(extractor._preprocessing_text(text))
+        if n_jobs > 1:
+            pool = parallel.create_pool(extractor, n_jobs)
+
+        # 阶段一：分块分词，统计全文词频；同时处理中的块数有上限，内存有界
+        segs_paths = list()
+
+        def _chunk_args(sentences):
+            for chunk_id, chunk in enumerate(split_chunks(sentences, chunk_size)):
+                segs_path = os.path.join(spill_dir, 'chunk_{:06d}.pkl'.format(chunk_id))
+                segs_paths.append(segs_path)
+                yield chunk, segs_path
+
+        if pool is None:
+            chunk_counts = (count_chunk(extractor, *args) for args in _chunk_args(sentences))
+        else:
+            chunk_counts = parallel.imap_bounded(
+                pool, _count_worker, _chunk_args(sentences), 2 * n_jobs)
+        freq_counter = Counter()
+        total_length = 0
+        for chunk_counter, chunk_length in chunk_counts:
+            freq_counter.update(chunk_counter)
+            total_length += chunk_length
+        del sentences
+
+        # 阶段二：各块按全文词频生成候选短语，主进程按块的顺序合并
+        shared = (dict(freq_counter), total_length, options)
+        del freq_counter
+        if pool is None:
+            chunk_results = (rank_chunk(extractor, segs_path, shared, chunk_top_n=chunk_top_n)
+                             for segs_path in segs_paths)
+        else:
+            shared_path = os.path.join(spill_dir, SHARED_FILE)
+            with open(shared_path, 'wb') as f:
+                pickle.dump(shared, f, protocol=pickle.HIGHEST_PROTOCOL)
+            chunk_results = pool.imap(
+                _rank_worker, [(segs_path, shared_path, chunk_top_n)
+                                    for segs_path in segs_paths])
+
+        # 短语权重只取决于其 token 与全文词频，剪掉的短语权重低于此后保留的全部短语，
+        # 合并过程中剪枝与合并全部候选后再取前 chunk_top_n 个等价
+        candidate_phrases_dict = dict()
+        for candidate_phrases_list in chunk_results:
+            for candidate_phrase, info in candidate_phrases_list:
+                if candidate_phrase not in candidate_phrases_dict:
+                    candidate_phrases_dict[candidate_phrase] = info
+            if chunk_top_n != -1 and len(candidate_phrases_dict) > 2 * chunk_top_n:
+                candidate_phrases_dict = dict(top_candidates(
+                    list(candidate_phrases_dict.items()), chunk_top_n))
+
+        # step5~step7: 与 extract_keyphrase 相同
+        final_res = extractor._finalize_candidates(
+            top_candidates(list(candidate_phrases_dict.items()), chunk_top_n),
+            top_k=top_k, with_weight=with_weight)
+
+    except Exception as e:
+        # 与 extract_keyphrase 一致，非法文本返回空结果
+        logger.warning('the text is not legal. %s: %s', type(e).__name__, e)
+        return []
+
+    finally:
+        if pool is not None:
+            pool.terminate()
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    return final_res
@@ -0,0 +1,38 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/18 21:00
+# File Name: cli.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+各命令行工具（python -m ckpe、python -m ckpe.aggregate 等）共用的参数定义。
+
+"""
+
+
+def add_extraction_arguments(parser):
+    ''' 添加与 extract_keyphrase 一致的抽取参数（top_k、with_weight 除外），供各命令行工具共用 '''
+    parser.add_argument('--func-word-num', type=int, default=1)
+    parser.add_argument('--stop-word-num', type=int, default=0)
+    parser.add_argument('--max-phrase-len', type=int, default=25)
+    parser.add_argument('--topic-theta', type=float, default=0.5)
+    parser.add_argument('--loose-pos', dest='stricted_pos', action='store_false',
+                        help='使用宽松规则，允许非名词短语')
+    parser.add_argument('--no-pos-weight', dest='allow_pos_weight', action='store_false')
+    parser.add_argument('--no-length-weight', dest='allow_length_weight', action='store_false')
+    parser.add_argument('--no-topic-weight', dest='allow_topic_weight', action='store_false')
+    parser.add_argument('--without-person-name', action='store_true')
+    parser.add_argument('--without-location-name', action='store_true')
+
+
+def extraction_options(args):
+    ''' 由 add_extraction_arguments 解析得到的参数，转为 extract_keyphrase 的关键字参数 '''
+    return dict(
+        func_word_num=args.func_word_num, stop_word_num=args.stop_word_num,
+        max_phrase_len=args.max_phrase_len, topic_theta=args.topic_theta,
+        stricted_pos=args.stricted_pos, allow_pos_weight=args.allow_pos_weight,
+        allow_length_weight=args.allow_length_weight,
+        allow_topic_weight=args.allow_topic_weight,
+        without_person_name=args.without_person_name,
+        without_location_name=args.without_location_name)
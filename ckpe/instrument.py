@@ -0,0 +1,100 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 12:00
+# File Name: instrument.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+extract_keyphrase 的运行统计：各步骤耗时、句子数、token 数、候选短语数、
+各条规则剪枝的次数、MMR 比较次数，以及失败次数与原因。未开启时不做任何计时与计数。
+
+使用方法：
+    >>> stats = ExtractionStats(callback=exporter.observe)  # callback 可选
+    >>> ckpe_obj = ckpe.ckpe(stats=stats)
+    >>> ckpe_obj.extract_keyphrase(text)
+    >>> stats.snapshot()
+    {'documents': 1, 'errors': 0, 'steps': {'preprocess': {...}, ...}, 'pruned': {...}, ...}
+
+"""
+
+import time
+import threading
+from collections import Counter
+
+
+STEPS = ('preprocess', 'split', 'segment', 'weight', 'candidate', 'mmr', 'sort')
+COUNTS = ('sentences', 'tokens', 'spans', 'candidates', 'phrases',
+          'mmr_comparisons', 'mmr_removed')
+
+
+def new_document_stats():
+    ''' 单篇文本的统计，由 extract_keyphrase 在处理过程中填写 '''
+    doc_stats = {'steps': dict.fromkeys(STEPS, 0.0), 'pruned': Counter(),
+                 'result_cache_hit': False, 'error': None}
+    doc_stats.update(dict.fromkeys(COUNTS, 0))
+    return doc_stats
+
+
+def record_step(doc_stats, step, begin):
+    ''' 累计某一步骤的耗时，返回当前时间，作为下一步骤的起点 '''
+    now = time.perf_counter()
+    doc_stats['steps'][step] += now - begin
+    return now
+
+
+class ExtractionStats(object):
+    """
+    线程安全地汇总每篇文本的统计
+    :param callback: 每篇文本处理完毕后，以该篇的统计 dict 调用，用于对接指标导出等
+    """
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.documents = 0
+            self.errors = 0
+            self.error_types = Counter()
+            self.last_error = None
+            self.result_cache_hits = 0
+            self.step_seconds = dict.fromkeys(STEPS, 0.0)
+            self.counts = dict.fromkeys(COUNTS, 0)
+            self.pruned = Counter()
+
+    def record(self, doc_stats):
+        with self._lock:
+            self.documents += 1
+            if doc_stats['error'] is not None:
+                self.errors += 1
+                self.error_types[doc_stats['error'][0]] += 1
+                self.last_error = doc_stats['error']
+            if doc_stats['result_cache_hit']:
+                self.result_cache_hits += 1
+            for step, seconds in doc_stats['steps'].items():
+                self.step_seconds[step] += seconds
+            for name in COUNTS:
+                self.counts[name] += doc_stats[name]
+            self.pruned.update(doc_stats['pruned'])
+
+        if self.callback is not None:
+            self.callback(doc_stats)
+
+    def snapshot(self):
+        ''' 返回当前累计的统计，耗时单位为秒，mean_ms 为每篇平均毫秒数 '''
+        with self._lock:
+            documents = self.documents
+            steps = {step: {'total_s': seconds,
+                            'mean_ms': seconds / documents * 1000 if documents else 0.0}
+                     for step, seconds in self.step_seconds.items()}
+            snapshot = {'documents': documents,
+                        'errors': self.errors,
+                        'error_types': dict(self.error_types),
+                        'last_error': self.last_error,
+                        'result_cache_hits': self.result_cache_hits,
+                        'steps': steps,
+                        'pruned': dict(self.pruned)}
+            snapshot.update(self.counts)
+        return snapshot
@@ -0,0 +1,166 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 14:00
+# File Name: lexicon.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+预编译的词典约束，供 extract_keyphrase 的 lexicon 参数使用。
+
+行业词典、NER 扩充等场景中，specified_words、remove_words_list、remove_phrases_list
+常有数万个词条，若每次调用都传入原始 list，逐个 token 的查找为线性扫描。Lexicon 对象
+只需构建一次即可反复使用：词、短语均存为哈希集合，子串与后缀规则（如“以 局/法院 结尾”）
+编译为 Aho-Corasick 自动机，每个候选短语的判断耗时只与短语长度有关，与词典大小无关。
+
+使用方法：
+    >>> from ckpe.lexicon import Lexicon
+    >>> lexicon = Lexicon(specified_words={'局': 1, '法院': 1, '检察院': 1},
+                          remove_phrases=['麻将局'], specified_suffixes=['局', '院'])
+    >>> ckpe_obj.extract_keyphrase(text, top_k=-1, lexicon=lexicon)
+
+"""
+
+import json
+import hashlib
+from collections import deque
+
+
+class AhoCorasick(object):
+    """
+    多模式串匹配自动机
+    :param patterns: 模式串的可迭代对象，空串被忽略
+    """
+    def __init__(self, patterns):
+        self._goto = [dict()]  # 状态 -> {字符: 下一状态}
+        self._fail = [0]
+        self._output = [False]  # 状态对应的后缀中是否存在某个完整的模式串
+
+        for pattern in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append(dict())
+                    self._fail.append(0)
+                    self._output.append(False)
+                state = next_state
+            self._output[state] = True
+
+        # 按层构建失配指针，output 沿失配指针向下传递
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                fail_state = self._fail[state]
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._goto[fail_state].get(char, 0)
+                self._output[next_state] = self._output[next_state] or \
+                    self._output[self._fail[next_state]]
+                queue.append(next_state)
+
+    def __len__(self):
+        return len(self._goto) - 1
+
+    def _next(self, state, char):
+        goto = self._goto
+        while state and char not in goto[state]:
+            state = self._fail[state]
+        return goto[state].get(char, 0)
+
+    def search(self, text):
+        ''' text 中是否包含任一模式串 '''
+        state = 0
+        for char in text:
+            state = self._next(state, char)
+            if self._output[state]:
+                return True
+        return False
+
+    def match_suffix(self, text):
+        ''' text 是否以任一模式串结尾 '''
+        state = 0
+        for char in text:
+            state = self._next(state, char)
+        return self._output[state]
+
+
+class Lexicon(object):
+    """
+    预编译的词典约束，构建一次，可在多次调用、多个进程间复用，构建后不应再修改
+    :param specified_words: (dict|list) 行业名词:词频，若不为空，则仅返回包含该词的短语；
+        传入 list、set 时词频均视为 1
+    :param remove_words: (list|set) 包含这些词的短语不出现在结果中
+    :param remove_phrases: (list|set) 这些短语不出现在结果中
+    :param remove_substrings: (list|set) 包含这些子串的短语不出现在结果中，不受分词边界限制
+    :param remove_suffixes: (list|set) 以这些字符串结尾的短语不出现在结果中
+    :param specified_suffixes: (list|set) 若不为空，则仅返回以这些字符串结尾的短语，如 ['局', '法院']
+    """
+    def __init__(self, specified_words=None, remove_words=None, remove_phrases=None,
+                 remove_substrings=None, remove_suffixes=None, specified_suffixes=None):
+        if specified_words is None:
+            specified_words = dict()
+        elif not isinstance(specified_words, dict):
+            specified_words = dict.fromkeys(specified_words, 1)
+        self.specified_words = dict(specified_words)
+        self.remove_words = frozenset(remove_words or ())
+        self.remove_phrases = frozenset(remove_phrases or ())
+        self.remove_substrings = frozenset(remove_substrings or ())
+        self.remove_suffixes = frozenset(remove_suffixes or ())
+        self.specified_suffixes = frozenset(specified_suffixes or ())
+
+        self._remove_substrings_matcher = AhoCorasick(self.remove_substrings) \
+            if self.remove_substrings else None
+        self._remove_suffixes_matcher = AhoCorasick(self.remove_suffixes) \
+            if self.remove_suffixes else None
+        self._specified_suffixes_matcher = AhoCorasick(self.specified_suffixes) \
+            if self.specified_suffixes else None
+
+        # 是否存在需要按整个短语字符串判断的规则
+        self.has_phrase_rules = bool(
+            self.remove_phrases or self.remove_substrings
+            or self.remove_suffixes or self.specified_suffixes)
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        ''' 词典内容的哈希值，内容相同的 Lexicon 对象相同，用于结果缓存的键 '''
+        if self._fingerprint is None:
+            payload = json.dumps(
+                [sorted(self.specified_words.items(), key=lambda item: str(item[0])),
+                 sorted(self.remove_words), sorted(self.remove_phrases),
+                 sorted(self.remove_substrings), sorted(self.remove_suffixes),
+                 sorted(self.specified_suffixes)],
+                ensure_ascii=False, default=str)
+            self._fingerprint = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        return self._fingerprint
+
+    def reject_phrase(self, phrase):
+        """
+        按短语级规则判断是否剔除该短语
+        :return: 触发的规则名，不剔除时返回 None
+        """
+        if phrase in self.remove_phrases:
+            return 'remove_phrases'
+        if self._remove_substrings_matcher is not None and \
+                self._remove_substrings_matcher.search(phrase):
+            return 'remove_substrings'
+        if self._remove_suffixes_matcher is not None and \
+                self._remove_suffixes_matcher.match_suffix(phrase):
+            return 'remove_suffixes'
+        if self._specified_suffixes_matcher is not None and \
+                not self._specified_suffixes_matcher.match_suffix(phrase):
+            return 'specified_suffixes'
+        return None
+
+    def __repr__(self):
+        return ('Lexicon(specified_words={}, remove_words={}, remove_phrases={}, '
+                'remove_substrings={}, remove_suffixes={}, specified_suffixes={})').format(
+            len(self.specified_words), len(self.remove_words), len(self.remove_phrases),
+            len(self.remove_substrings), len(self.remove_suffixes),
+            len(self.specified_suffixes))
@@ -0,0 +1,119 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 14:00
+# File Name: parallel.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+import os
+from functools import partial
+from collections import deque
+
+
+# 子进程中使用的抽取器，由进程池的 initializer 在每个子进程（包括重启的子进程）中设置
+_worker_extractor = None
+
+
+def _init_worker(extractor):
+    """
+    fork 模式下，子进程通过 copy-on-write 直接继承父进程中已加载的 idf、lda 与 pkuseg 模型，
+    warmup 不再重复加载；非 fork 平台（如 windows）下，子进程收到序列化的抽取器，其中包含
+    update_idf 等替换过的资源与缓存快照，其余未修改的模型由子进程按路径自行加载
+    """
+    global _worker_extractor
+    _worker_extractor = extractor.warmup()
+
+
+def _extract_worker(text, **kwargs):
+    return _worker_extractor.extract_keyphrase(text, **kwargs)
+
+
+def extract_items(extractor, items):
+    """
+    逐篇处理一批 (text, kwargs)，单篇出错不影响同批其它文本
+    :return: 与输入顺序一致的 (result, error) 列表，成功时 error 为 None
+    """
+    results = list()
+    for text, kwargs in items:
+        try:
+            results.append((extractor.extract_keyphrase(text, **kwargs), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
+def _extract_batch_worker(items):
+    ''' 处理一批 (text, kwargs)，供 ckpe.server 攒批后调用 '''
+    return extract_items(_worker_extractor, items)
+
+
+def _get_context():
+    ''' 优先使用 fork，使子进程共享父进程已加载的模型 '''
+    import multiprocessing as mp  # 仅批量抽取时需要，不拖慢 import ckpe
+    if 'fork' in mp.get_all_start_methods():
+        return mp.get_context('fork'), True
+    return mp.get_context('spawn'), False
+
+
+def get_n_jobs(n_jobs):
+    ''' 将 n_jobs 参数转换为实际进程数，None 或 -1 表示使用全部 cpu '''
+    if n_jobs is None or n_jobs == -1:
+        return os.cpu_count() or 1
+    if n_jobs < 1:
+        raise ValueError('`n_jobs` must be a positive integer or -1.')
+    return n_jobs
+
+
+def create_pool(extractor, n_jobs):
+    """
+    创建进程池，fork 模式下子进程继承 extractor 及其已加载的模型。extractor 经 initializer
+    传给每个子进程，因 maxtasksperchild 或崩溃而重启的子进程同样可用
+    """
+    ctx, use_fork = _get_context()
+    if use_fork:
+        # 先在父进程中加载全部模型，子进程才能共享，而不是各自懒加载；
+        # fork 模式下 initargs 随进程继承，不经序列化
+        extractor.warmup()
+    return ctx.Pool(processes=n_jobs, initializer=_init_worker, initargs=(extractor,))
+
+
+def imap_bounded(pool, func, args_iterable, window):
+    """
+    依次将 args_iterable 中的参数元组提交给进程池，按提交顺序逐个返回结果。
+    同时处理中的任务数不超过 window，输入读取快于处理时阻塞读取，内存有界
+    :param pool: create_pool 创建的进程池
+    :param func: 子进程中执行的函数
+    :param args_iterable: 参数元组的可迭代对象，可为生成器
+    :param window: 处理中任务数的上限，通常取进程数的 2 倍
+    """
+    pending = deque()
+    for args in args_iterable:
+        if len(pending) >= window:
+            yield pending.popleft().get()
+        pending.append(pool.apply_async(func, args))
+    while pending:
+        yield pending.popleft().get()
+
+
+def map_documents(extractor, texts, n_jobs=None, chunksize=1, backend='process',
+                  **kwargs):
+    '''
+    将多篇文本分配给进程池或线程池抽取关键短语，结果与输入顺序一致。
+    线程池模式下所有线程共用同一个 extractor 及其模型，仅在分词等释放 GIL 的部分并行
+    '''
+    if backend not in ('process', 'thread'):
+        raise ValueError('`backend` must be `process` or `thread`.')
+
+    n_jobs = get_n_jobs(n_jobs)
+    if n_jobs == 1:
+        return [extractor.extract_keyphrase(text, **kwargs) for text in texts]
+
+    if backend == 'thread':
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            return list(executor.map(
+                partial(extractor.extract_keyphrase, **kwargs), texts))
+
+    with create_pool(extractor, n_jobs) as pool:
+        return list(pool.imap(partial(_extract_worker, **kwargs), texts,
+                              chunksize=chunksize))
@@ -0,0 +1,121 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 15:00
+# File Name: resources.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+进程级的模型资源注册表。pkuseg 模型、idf、停用词、词性组合权重、主题突出度等资源
+按 (资源类型, 文件路径) 注册，首次使用时才加载，同一进程中参数相同的多个抽取器
+共用一份，import ckpe 与构造抽取器本身不读取任何模型文件。
+
+注册表中的资源为多个抽取器共享，应视为只读；需要修改时，先复制再赋值给抽取器属性。
+
+使用方法：
+    >>> ckpe_obj = ckpe.ckpe()  # 不加载模型
+    >>> ckpe_obj.warmup()  # 预先加载全部资源，如 pre-fork 服务在 fork 子进程之前调用
+    >>> ckpe.resources.loaded_resources()
+    [('idf', '.../idf.txt'), ('pkuseg', True), ...]
+
+"""
+
+import json
+import threading
+
+
+_resources = dict()
+_lock = threading.Lock()
+_key_locks = dict()  # 每个资源一把锁，不同资源可并发加载，同一资源只加载一次
+
+
+def get_resource(key, loader, reload=False):
+    """
+    取出已注册的资源，不存在时调用 loader 加载并注册
+    :param key: 可哈希的资源标识，如 ('idf', 文件路径)
+    :param loader: 无参函数，返回资源对象
+    :param reload: 为 True 时重新加载并替换已注册的资源，已持有旧资源的抽取器不受影响
+    """
+    with _lock:
+        if not reload and key in _resources:
+            return _resources[key]
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        if not reload:
+            with _lock:
+                if key in _resources:  # 等待期间已由其它线程加载
+                    return _resources[key]
+        resource = loader()
+        with _lock:
+            _resources[key] = resource
+    return resource
+
+
+def loaded_resources():
+    ''' 返回已加载的资源标识 '''
+    with _lock:
+        return sorted(_resources, key=str)
+
+
+def clear_resources():
+    ''' 清空注册表，已持有资源的抽取器不受影响，之后新构造的抽取器重新加载 '''
+    with _lock:
+        _resources.clear()
+
+
+def load_pkuseg(postag=True):
+    ''' 北大分词器，import pkuseg 较慢，故推迟到首次分词时 '''
+    import pkuseg
+    return pkuseg.pkuseg(postag=postag)
+
+
+def read_idf(idf_file_path):
+    ''' 读取 idf 文件，每行格式为 `词 idf`，返回 (idf 字典, idf 中位数) '''
+    with open(idf_file_path, 'r', encoding='utf-8') as f:
+        idf_list = [line.strip().split(' ') for line in f.readlines()]
+    idf_dict = dict()
+    for item in idf_list:
+        idf_dict.update({item[0]: float(item[1])})
+    median_idf = sorted(idf_dict.values())[len(idf_dict) // 2]
+    return idf_dict, median_idf
+
+
+def read_stop_words(stop_word_file_path):
+    ''' 读取停用词文件，存为 frozenset，逐 token 查找为 O(1) '''
+    with open(stop_word_file_path, 'r', encoding='utf8') as f:
+        return frozenset(f.read().split()).union(['\n'])
+
+
+def read_json(file_path):
+    with open(file_path, 'r', encoding='utf8') as f:
+        return json.load(f)
+
+
+def compute_topic_prominence(topic_word_file_path, word_topic_file_path):
+    """
+    由 lda 模型的 json 文件计算主题突出度，原始概率分布用完即释放，不常驻内存
+    :return: (词 -> 突出度字典, 未知词突出度, topic_num, word_num)
+    """
+    from ckpe import topic_model  # 依赖 numpy，推迟导入
+
+    vocab, prominence, topic_num = topic_model.topic_prominence(
+        topic_word=read_json(topic_word_file_path),
+        word_topic=read_json(word_topic_file_path))
+    return topic_prominence_summary(vocab, prominence) + (topic_num, len(vocab))
+
+
+def topic_prominence_summary(vocab, prominence):
+    ''' 返回 (词 -> 突出度字典, 未知词突出度) '''
+    topic_prominence_dict = dict(zip(vocab, prominence.tolist()))
+    # 计算未知词汇的主题突出度，由于停用词已经预先过滤，所以这里不需要再考停用词无突出度
+    # 与原实现一样按词表顺序依次累加，保证逐位一致
+    unk_topic_prominence_value = sum(topic_prominence_dict.values()) / (2 * len(prominence))
+    return topic_prominence_dict, unk_topic_prominence_value
+
+
+def load_model_bundle(model_bundle):
+    from ckpe.bundle import load_model_bundle as _load_model_bundle  # 依赖 numpy，推迟导入
+    model = _load_model_bundle(model_bundle)
+    model['stop_words'] = frozenset(model['stop_words'])
+    return model
@@ -0,0 +1,493 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 16:00
+# File Name: segmenter.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+分词与词性标注后端，extractor 通过 Segmenter 接口分词，不直接调用 pkuseg。
+词性统一采用 pkuseg 的标注集，参考 https://github.com/lancopku/pkuseg-python/blob/master/tags.txt
+
+    1、PkusegSegmenter：北大 pkuseg 的 CRF 分词器，准确率高，默认使用；
+    2、DictionarySegmenter：基于词典的最大概率分词，由 idf 词表构建前缀词典，对句子中
+       所有可能的切分构成的有向无环图做动态规划，词的对数概率取 -idf（文档频率近似词频），
+       词性查 POS 词典，未登录词按规则标注。速度比 pkuseg 快一个数量级以上，适用于对时延
+       敏感、可接受一定质量损失的场景。词表与 extractor 共用同一份已加载的 idf 或模型包。
+
+POS 词典每行格式为 `词 词性 [次数]`。未指定 POS 词典时，首次加载用 pkuseg 逐词标注整个
+词表得到，耗时与词表大小成正比；生产环境宜预先生成，可由自有语料经 pkuseg 标注后统计，
+并以逐词标注的词表补全：
+    $ python -m ckpe.segmenter corpus.txt --vocabulary -o pos_lexicon.txt
+
+使用方法：
+    >>> ckpe_obj = ckpe.ckpe(segmenter='dictionary')
+    >>> ckpe_obj = ckpe.ckpe(segmenter=DictionarySegmenter(pos_lexicon_path='pos_lexicon.txt'))
+
+"""
+
+import re
+import abc
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+from functools import partial
+from os.path import join, dirname, abspath
+from collections import Counter, defaultdict
+
+from ckpe import resources
+
+
+# 待分词句子数不少于该值时，才使用 pkuseg 的多进程文件模式，否则进程启动与模型加载得不偿失
+FILE_MODE_MIN_SENTENCES = 2000
+
+# 未登录 POS 词典的词使用的封闭词类，虚词决定了短语的边界，对抽取结果影响最大
+_CLOSED_CLASS_WORDS = {
+    'u': '的 地 得 了 着 过 所 之 等 等等 似的 一样',
+    'p': '在 从 对 向 把 被 于 以 按 据 由 自 往 跟 给 比 将 对于 关于 根据 按照 通过 随着 为了 除了',
+    'c': '和 与 及 或 而 并 但 且 以及 或者 并且 但是 而且 因为 所以 如果 虽然 因此 然而 还是 不仅',
+    'd': '不 没 也 都 就 又 还 很 更 最 已 已经 正在 曾 曾经 再 才 只 仅 均 尚 未 并未 尚未 迅速 再次',
+    'r': '我 你 他 她 它 我们 你们 他们 她们 这 那 其 此 该 这些 那些 这个 那个 哪 谁 什么 自己 各',
+    'v': '是 有 为 说 表示 进行 认为 发现 没有 成为 需要 可能 可以 能够 应该 开始 继续',
+    'y': '吗 呢 吧 啊 呀 嘛 罢了',
+    'q': '个 种 次 位 名 件 项 条 家 些',
+    'f': '上 下 中 内 外 前 后 间 里 旁 之间 以上 以下 之后 之前 以来'}
+CLOSED_CLASS_POS = {word: pos for pos, words in _CLOSED_CLASS_WORDS.items()
+                    for word in words.split()}
+
+_TOKEN_PTN = re.compile(
+    '([\u4e00-\u9fa5]+)'  # 汉字串，交由词典分词
+    '|([0-9]+(?:\\.[0-9]+)?%?)'  # 数字
+    '|([a-zA-Z][a-zA-Z0-9_\\-\\.]*)'  # 英文、型号
+    '|(\\s+)'  # 空白，与 pkuseg 一致地丢弃
+    '|(.)')  # 标点及其它符号
+_CHINESE_WORD_PTN = re.compile('^[\u4e00-\u9fa5]+$')
+
+
+class Segmenter(metaclass=abc.ABCMeta):
+    """
+    分词器接口，子类实现 cut，返回 [(词, 词性)] 列表；identity 标识分词器的类型与词典，
+    分词结果相同的分词器 identity 相同，供分词缓存校验，子类应覆盖
+    """
+    @property
+    def identity(self):
+        return '{}.{}'.format(type(self).__module__, type(self).__qualname__)
+
+    def load(self):
+        ''' 预先加载模型，供 extractor.warmup 在 fork 之前调用 '''
+
+    @abc.abstractmethod
+    def cut(self, sentence):
+        ''' 对一个句子分词，返回 [(词, 词性)] 列表 '''
+
+    def cut_batch(self, sentences, nthread=1):
+        ''' 对一批句子分词，默认逐句调用 cut，子类可实现更快的批量方式 '''
+        return [self.cut(sen) for sen in sentences]
+
+
+class PkusegSegmenter(Segmenter):
+    """
+    pkuseg 分词器，模型在首次分词时加载，并由同一进程中的抽取器共享
+    :param min_file_mode_size: 批量分词的句子数不少于该值且 nthread > 1 时，
+        使用 pkuseg 的多进程文件模式
+    """
+    def __init__(self, min_file_mode_size=FILE_MODE_MIN_SENTENCES):
+        self.min_file_mode_size = min_file_mode_size
+        self._model = None
+
+    @property
+    def identity(self):
+        ''' 使用 pkuseg 自带的默认模型与词典，由 pkuseg 的版本区分 '''
+        return 'pkuseg:default:postag:{}'.format(_package_version('pkuseg'))
+
+    def __getstate__(self):
+        # 非 fork 平台的子进程中重新加载模型，不随对象序列化
+        state = self.__dict__.copy()
+        state['_model'] = None
+        return state
+
+    def load(self):
+        if self._model is None:
+            self._model = resources.get_resource(('pkuseg', True), resources.load_pkuseg)
+        return self._model
+
+    def cut(self, sentence):
+        return self.load().cut(sentence)
+
+    def cut_batch(self, sentences, nthread=1):
+        if nthread > 1 and len(sentences) >= self.min_file_mode_size:
+            return self._cut_file_mode(sentences, nthread)
+        model = self.load()
+        return [model.cut(sen) for sen in sentences]
+
+    def _cut_file_mode(self, sentences, nthread):
+        """ 使用 pkuseg.test 的多进程文件模式分词，每行一个句子，输出格式为 `词/词性` """
+        import pkuseg
+
+        model = self.load()
+        tmp_dir = tempfile.mkdtemp(prefix='ckpe_seg_')
+        try:
+            input_path = join(tmp_dir, 'input.txt')
+            output_path = join(tmp_dir, 'output.txt')
+            with open(input_path, 'w', encoding='utf-8') as fw:
+                for sen in sentences:
+                    fw.write(sen + '\n')
+            pkuseg.test(input_path, output_path, postag=True, nthread=nthread)
+            with open(output_path, 'r', encoding='utf-8') as fr:
+                lines = fr.read().split('\n')
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if lines and lines[-1] == '':
+            lines.pop()
+        if len(lines) != len(sentences):  # 行数对不上时无法对齐，整体回退逐句分词
+            return [model.cut(sen) for sen in sentences]
+
+        segs_list = list()
+        for sen, line in zip(sentences, lines):
+            sen_segs = [tuple(token.rsplit('/', 1)) for token in line.split(' ') if token != '']
+            # 个别句子（如含特殊空白字符）与逐句分词的结果对不上时，回退逐句分词
+            if any(len(item) != 2 for item in sen_segs) or \
+                    ''.join(item[0] for item in sen_segs) != ''.join(sen.split()):
+                sen_segs = model.cut(sen)
+            segs_list.append(sen_segs)
+        return segs_list
+
+
+def read_pos_lexicon(pos_lexicon_path):
+    ''' 读取 POS 词典，每行格式为 `词 词性 [次数]`，返回 {词: 词性} '''
+    pos_lexicon = dict()
+    with open(pos_lexicon_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            items = line.split()
+            if len(items) >= 2:
+                pos_lexicon[items[0]] = items[1]
+    return pos_lexicon
+
+
+def vocabulary_key(idf_file_path=None, model_bundle=None):
+    ''' 词表在资源注册表中的标识，与 extractor 加载 idf 或模型包时一致 '''
+    if model_bundle is not None:
+        return ('model_bundle', abspath(model_bundle))
+    return ('idf', abspath(idf_file_path))
+
+
+def load_vocabulary(idf_file_path=None, model_bundle=None):
+    """
+    经资源注册表取出 idf 词表，extractor 已加载同一 idf 文件或模型包时直接复用，不重复读取
+    :return: (idf 字典或模型包中的 BundleLookup, idf 中位数)
+    """
+    key = vocabulary_key(idf_file_path=idf_file_path, model_bundle=model_bundle)
+    if model_bundle is not None:
+        model = resources.get_resource(key, partial(resources.load_model_bundle, key[1]))
+        return model['idf_dict'], model['median_idf']
+    return resources.get_resource(key, partial(resources.read_idf, key[1]))
+
+
+def _is_dictionary_word(word, max_word_len):
+    return len(word) <= max_word_len and _CHINESE_WORD_PTN.match(word) is not None
+
+
+def derive_pos_lexicon(words, model=None):
+    """
+    用 pkuseg 逐词标注词表，返回 {词: 词性}。词孤立地标注、没有上下文，兼类词取其单独
+    出现时的词性；与句中的常见词性不一致时，可由语料统计的 POS 词典覆盖
+    :param words: 待标注的词
+    :param model: pkuseg.pkuseg(postag=True) 对象，默认临时加载一个，标注完即释放
+    """
+    if model is None:
+        model = resources.load_pkuseg(postag=True)
+    # 直接用词性标注器标注整词，不经分词；没有标注器时逐词分词，只保留未被切开的词
+    tagger = getattr(model, 'tagger', None)
+    pos_lexicon = dict()
+    for word in words:
+        if tagger is not None:
+            pos_lexicon[word] = tagger.tag([word])[0]
+        else:
+            segs = model.cut(word)
+            if len(segs) == 1 and segs[0][0] == word:
+                pos_lexicon[word] = segs[0][1]
+    return pos_lexicon
+
+
+def build_dictionary_model(idf_dict, median_idf, pos_lexicon, max_word_len=8):
+    """
+    构建词典分词模型
+    :param idf_dict: 词表，dict 或模型包中的 BundleLookup
+    :param pos_lexicon: {词: 词性}
+    :return: (前缀词典, 词性词典, 未登录单字的对数概率, 最大词长)。前缀词典中，
+        词的值为其对数概率，仅为词前缀的值为 None
+    """
+    log_probs = dict()
+    for word, idf in idf_dict.items():
+        if _is_dictionary_word(word, max_word_len):
+            log_probs[word] = -idf
+    for word in pos_lexicon:  # POS 词典中有、idf 词表中没有的词，概率取中位数
+        if word not in log_probs and _is_dictionary_word(word, max_word_len):
+            log_probs[word] = -median_idf
+
+    prefix_dict = dict()
+    for word, log_prob in log_probs.items():
+        for end in range(1, len(word)):
+            prefix_dict.setdefault(word[:end], None)
+    prefix_dict.update(log_probs)
+
+    # 未登录的单字比任何已知词的概率都低，使已知词优先
+    unk_log_prob = min(log_probs.values(), default=0.0) - 2.0
+    return prefix_dict, pos_lexicon, unk_log_prob, max_word_len
+
+
+class DictionarySegmenter(Segmenter):
+    """
+    基于词典的最大概率分词器，速度快，准确率低于 pkuseg
+    :param idf_file_path: 构建词表的 idf 文件，默认使用 ckpe 自带的 idf.txt
+    :param pos_lexicon_path: POS 词典路径；未指定时在首次加载时用 pkuseg 逐词标注词表得到
+    :param max_word_len: 词表中词的最大字数
+    :param default_pos: POS 词典与封闭词类中均未登录的词的词性
+    :param model_bundle: 由 python -m ckpe.bundle 编译的模型包，指定时由其中的 idf 构建词表，
+        代替 idf_file_path
+    """
+    def __init__(self, idf_file_path=None, pos_lexicon_path=None, max_word_len=8,
+                 default_pos='n', model_bundle=None):
+        if idf_file_path is None:
+            idf_file_path = join(dirname(abspath(__file__)), 'idf.txt')
+        self.idf_file_path = abspath(idf_file_path)
+        self.model_bundle = None if model_bundle is None else abspath(model_bundle)
+        self.pos_lexicon_path = None if pos_lexicon_path is None else abspath(pos_lexicon_path)
+        self.max_word_len = max_word_len
+        self.default_pos = default_pos
+        self._model = None
+        self._identity = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_model'] = None
+        return state
+
+    @property
+    def identity(self):
+        """
+        由词表文件（idf 文件或模型包）、POS 词典的内容与分词参数计算，文件路径不同而内容
+        相同时一致；POS 词典由 pkuseg 标注得到时，以 pkuseg 的版本区分
+        """
+        if self._identity is None:
+            sha1 = hashlib.sha1()
+            vocabulary_path = self.model_bundle if self.model_bundle is not None \
+                else self.idf_file_path
+            for path in [vocabulary_path, self.pos_lexicon_path]:
+                if path is not None:
+                    with open(path, 'rb') as f:
+                        for block in iter(lambda: f.read(1 << 20), b''):
+                            sha1.update(block)
+                else:
+                    sha1.update('pkuseg-derived:{}'.format(
+                        _package_version('pkuseg')).encode('utf-8'))
+                sha1.update(b'\0')
+            sha1.update(json.dumps([self.max_word_len, self.default_pos]).encode('utf-8'))
+            self._identity = 'dictionary:{}'.format(sha1.hexdigest())
+        return self._identity
+
+    def _vocabulary_key(self):
+        return vocabulary_key(idf_file_path=self.idf_file_path, model_bundle=self.model_bundle)
+
+    def _load_pos_lexicon(self, idf_dict):
+        if self.pos_lexicon_path is not None:
+            return resources.get_resource(
+                ('pos_lexicon', self.pos_lexicon_path),
+                partial(read_pos_lexicon, self.pos_lexicon_path))
+        return resources.get_resource(
+            ('derived_pos_lexicon',) + self._vocabulary_key() + (self.max_word_len,),
+            lambda: derive_pos_lexicon(
+                word for word in idf_dict.keys() if _is_dictionary_word(word, self.max_word_len)))
+
+    def _build_model(self):
+        idf_dict, median_idf = load_vocabulary(
+            idf_file_path=self.idf_file_path, model_bundle=self.model_bundle)
+        return build_dictionary_model(
+            idf_dict, median_idf, self._load_pos_lexicon(idf_dict), self.max_word_len)
+
+    def load(self):
+        if self._model is None:
+            self._model = resources.get_resource(
+                ('dictionary_segmenter',) + self._vocabulary_key() +
+                (self.pos_lexicon_path, self.max_word_len),
+                self._build_model)
+        return self._model
+
+    def cut(self, sentence):
+        prefix_dict, pos_lexicon, unk_log_prob, max_word_len = self.load()
+        sen_segs = list()
+        for matched in _TOKEN_PTN.finditer(sentence):
+            chinese, number, latin, space, other = matched.groups()
+            if chinese is not None:
+                for word in self._cut_chinese(chinese, prefix_dict, unk_log_prob, max_word_len):
+                    pos = pos_lexicon.get(word) or CLOSED_CLASS_POS.get(word, self.default_pos)
+                    sen_segs.append((word, pos))
+            elif number is not None:
+                sen_segs.append((number, pos_lexicon.get(number, 'm')))
+            elif latin is not None:
+                sen_segs.append((latin, pos_lexicon.get(latin, 'nx')))
+            elif other is not None:
+                sen_segs.append((other, pos_lexicon.get(other, 'w')))
+        return sen_segs
+
+    @staticmethod
+    def _cut_chinese(chars, prefix_dict, unk_log_prob, max_word_len):
+        ''' 在切分构成的有向无环图上，由后向前动态规划求对数概率之和最大的切分 '''
+        length = len(chars)
+        scores = [0.0] * (length + 1)
+        ends = [length] * (length + 1)
+        for i in range(length - 1, -1, -1):
+            log_prob = prefix_dict.get(chars[i])
+            best_score = (unk_log_prob if log_prob is None else log_prob) + scores[i + 1]
+            best_end = i + 1
+            for end in range(i + 2, min(i + max_word_len, length) + 1):
+                fragment = chars[i: end]
+                if fragment not in prefix_dict:
+                    break
+                log_prob = prefix_dict[fragment]
+                if log_prob is not None and log_prob + scores[end] > best_score:
+                    best_score = log_prob + scores[end]
+                    best_end = end
+            scores[i] = best_score
+            ends[i] = best_end
+
+        words = list()
+        i = 0
+        while i < length:
+            words.append(chars[i: ends[i]])
+            i = ends[i]
+        return words
+
+
+SEGMENTERS = {'pkuseg': PkusegSegmenter, 'dictionary': DictionarySegmenter}
+
+
+def segmenter_identity(segmenter):
+    """
+    返回分词器的 identity；没有 identity 的分词器（如直接传入的 pkuseg.pkuseg 对象）
+    以其类名标识，无法区分其中的自定义词典
+    """
+    identity = getattr(segmenter, 'identity', None)
+    if identity is None:
+        identity = '{}.{}'.format(type(segmenter).__module__, type(segmenter).__qualname__)
+    return identity
+
+
+def _package_version(name):
+    try:
+        from importlib import metadata
+        return metadata.version(name)
+    except Exception:
+        return 'unknown'
+
+
+def get_segmenter(segmenter=None, idf_file_path=None, model_bundle=None):
+    """
+    由名称或对象得到分词器
+    :param segmenter: 'pkuseg'（默认）、'dictionary'，或 Segmenter 对象，
+        也可以是任意带有 cut 方法的对象，如自定义词典的 pkuseg.pkuseg
+    :param idf_file_path: 'dictionary' 分词器构建词表使用的 idf 文件
+    :param model_bundle: 'dictionary' 分词器构建词表使用的模型包，指定时代替 idf_file_path
+    """
+    if segmenter is None:
+        segmenter = 'pkuseg'
+    if not isinstance(segmenter, str):
+        return segmenter
+    if segmenter not in SEGMENTERS:
+        raise ValueError('`segmenter` must be one of {} or a segmenter object.'.format(
+            sorted(SEGMENTERS)))
+    if segmenter == 'dictionary':
+        return DictionarySegmenter(idf_file_path=idf_file_path, model_bundle=model_bundle)
+    return SEGMENTERS[segmenter]()
+
+
+def count_pos(extractor, texts, nthread=1):
+    """
+    统计一批文本中每个词各词性出现的次数，分词方式与抽取关键短语时一致
+    :return: {词: Counter(词性 -> 次数)}
+    """
+    sentences = list()
+    for text in texts:
+        if isinstance(text, str):
+            sentences.extend(extractor._split_sentences(extractor._preprocessing_text(text)))
+
+    pos_counts = defaultdict(Counter)
+    for sen_segs in extractor._cut_batch(sentences, nthread=nthread):
+        for word, pos in sen_segs:
+            pos_counts[word][pos] += 1
+    return pos_counts
+
+
+def write_pos_lexicon(pos_counts, pos_lexicon_path, min_count=2, base_lexicon=None):
+    """
+    每个词取出现次数最多的词性，写出为 `词 词性 次数`
+    :param base_lexicon: {词: 词性}，如逐词标注的词表；语料中次数不足 min_count 的词
+        使用其中的词性，次数记为 0
+    """
+    with open(pos_lexicon_path, 'w', encoding='utf-8') as f:
+        for word in sorted(set(pos_counts) | set(base_lexicon or ())):
+            counter = pos_counts.get(word)
+            if counter is not None and sum(counter.values()) >= min_count:
+                pos, count = counter.most_common(1)[0]
+            elif base_lexicon is not None and word in base_lexicon:
+                pos, count = base_lexicon[word], 0
+            else:
+                continue
+            f.write('{} {} {}\n'.format(word, pos, count))
+
+
+def main(argv=None):
+    from itertools import islice
+    from ckpe import stream
+    from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+
+    parser = argparse.ArgumentParser(
+        prog='python -m ckpe.segmenter',
+        description='由语料经 pkuseg 标注统计，或逐词标注 idf 词表，'
+                    '生成 DictionarySegmenter 使用的 POS 词典。')
+    parser.add_argument('input', nargs='?', default=None,
+                        help='输入语料路径，每行一篇文本或一个 json，- 表示标准输入；'
+                             '省略时须指定 --vocabulary')
+    parser.add_argument('-o', '--output', required=True, help='POS 词典输出路径')
+    parser.add_argument('--format', dest='input_format', choices=['line', 'jsonl'],
+                        default=None, help='输入格式，默认根据文件后缀判断')
+    parser.add_argument('--text-key', default='text', help='jsonl 中文本所在的字段名')
+    parser.add_argument('--min-count', type=int, default=2, help='出现次数低于该值的词不写出')
+    parser.add_argument('-j', '--nthread', type=int, default=1, help='pkuseg 文件模式的进程数')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='每批分词的文档数')
+    parser.add_argument('--vocabulary', action='store_true',
+                        help='逐词标注 idf 词表，补全语料中未出现或次数不足的词')
+    parser.add_argument('--idf-file', default=None, help='词表使用的 idf 文件，默认为 ckpe 自带')
+    parser.add_argument('--model-bundle', default=None,
+                        help='由 python -m ckpe.bundle 编译的模型包，指定时由其中的 idf 构建词表')
+    parser.add_argument('--max-word-len', type=int, default=8, help='逐词标注的词的最大字数')
+    args = parser.parse_args(argv)
+    if args.input is None and not args.vocabulary:
+        parser.error('`input` or --vocabulary is required.')
+
+    extractor = ChineseKeyPhrasesExtractor(segmenter='pkuseg')
+    pos_counts = defaultdict(Counter)
+    if args.input is not None:
+        documents = (text for _, text in stream.read_documents(
+            args.input, input_format=args.input_format, text_key=args.text_key))
+        for chunk in iter(lambda: list(islice(documents, args.chunk_size)), []):
+            for word, counter in count_pos(extractor, chunk, nthread=args.nthread).items():
+                pos_counts[word].update(counter)
+
+    base_lexicon = None
+    if args.vocabulary:
+        idf_file_path = args.idf_file if args.idf_file is not None \
+            else join(dirname(abspath(__file__)), 'idf.txt')
+        idf_dict, _ = load_vocabulary(idf_file_path=idf_file_path, model_bundle=args.model_bundle)
+        base_lexicon = derive_pos_lexicon(
+            (word for word in idf_dict.keys() if _is_dictionary_word(word, args.max_word_len)),
+            model=extractor.seg.load())
+    write_pos_lexicon(pos_counts, args.output, min_count=args.min_count,
+                      base_lexicon=base_lexicon)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,401 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 19:00
+# File Name: server.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+基于标准库 asyncio 的关键短语抽取 HTTP 服务。服务常驻一个已加载模型的
+ChineseKeyPhrasesExtractor，将并发到达的请求按批大小与最长等待时间攒成小批，
+交给线程池或进程池处理，以平滑突发流量下的延迟。
+
+接口：
+    POST /extract   {"text": "...", "top_k": 5, ...}       -> {"phrases": [...]}
+                    {"texts": ["...", ...], "top_k": 5, ...} -> {"results": [[...], ...]}
+    GET  /health    -> {"status": "ok"}
+    GET  /metrics   -> 请求数、批次数、延迟 p50/p95/p99、吞吐量等
+
+使用方法：
+    $ python -m ckpe.server --host 127.0.0.1 --port 8000 --workers 4
+
+"""
+
+import time
+import json
+import asyncio
+import inspect
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from ckpe import parallel
+from ckpe.chinese_key_phrases_extractor import ChineseKeyPhrasesExtractor
+
+
+# extract_keyphrase 中允许通过请求指定的参数
+EXTRACT_OPTIONS = frozenset(
+    name for name in inspect.signature(
+        ChineseKeyPhrasesExtractor.extract_keyphrase).parameters
+    if name not in ('self', 'text', 'lexicon'))  # lexicon 无法由 json 传入
+
+# 各参数允许的 json 类型，bool 是 int 的子类，需单独区分
+_INT_OPTIONS = frozenset(['top_k', 'func_word_num', 'stop_word_num', 'max_phrase_len'])
+_NUMBER_OPTIONS = frozenset(['topic_theta', 'bias'])
+_STR_LIST_OPTIONS = frozenset(['remove_phrases_list', 'remove_words_list'])
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 413: 'Payload Too Large',
+            500: 'Internal Server Error'}
+
+
+class ServerMetrics(object):
+    ''' 统计请求数、批次数、延迟分位数与吞吐量 '''
+    def __init__(self, window=10000, throughput_seconds=60):
+        self.start_time = time.time()
+        self.requests = 0
+        self.documents = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_documents = 0
+        self.latencies = deque(maxlen=window)
+        self.finish_times = deque()
+        self.throughput_seconds = throughput_seconds
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_documents += size
+
+    def record_document(self, latency):
+        now = time.time()
+        self.documents += 1
+        self.latencies.append(latency)
+        self.finish_times.append(now)
+        while self.finish_times and self.finish_times[0] < now - self.throughput_seconds:
+            self.finish_times.popleft()
+
+    def snapshot(self, queue_size=0):
+        latencies = sorted(self.latencies)
+        now = time.time()
+        while self.finish_times and self.finish_times[0] < now - self.throughput_seconds:
+            self.finish_times.popleft()
+        elapsed = min(now - self.start_time, self.throughput_seconds)
+
+        return {
+            'uptime_seconds': now - self.start_time,
+            'requests': self.requests,
+            'documents': self.documents,
+            'errors': self.errors,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_documents / self.batches if self.batches else 0.0,
+            'queue_size': queue_size,
+            'latency_ms': {
+                'p50': _percentile(latencies, 50) * 1000,
+                'p95': _percentile(latencies, 95) * 1000,
+                'p99': _percentile(latencies, 99) * 1000},
+            'throughput_docs_per_second': len(self.finish_times) / elapsed if elapsed > 0 else 0.0}
+
+
+def _percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _check_options(options):
+    ''' 校验请求参数的类型，不合法时抛出 ValueError，使坏请求在进入批次之前即返回 400 '''
+    for name, value in options.items():
+        if name in _INT_OPTIONS:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        elif name in _NUMBER_OPTIONS:
+            valid = _is_number(value) or (name == 'bias' and value is None)
+        elif name in _STR_LIST_OPTIONS:
+            valid = value is None or (
+                isinstance(value, list) and all(isinstance(item, str) for item in value))
+        elif name == 'specified_words':
+            if isinstance(value, dict):
+                valid = all(isinstance(word, str) and _is_number(freq) and freq != 0
+                            for word, freq in value.items())
+            else:
+                valid = isinstance(value, list) and all(isinstance(word, str) for word in value)
+        else:
+            valid = isinstance(value, bool)
+        if not valid:
+            raise ValueError('invalid value for `{}`: {!r}'.format(name, value))
+
+
+def _extract_batch(extractor, items):
+    return parallel.extract_items(extractor, items)
+
+
+class KeyphraseServer(object):
+    """
+    关键短语抽取 HTTP 服务
+    :param extractor: ChineseKeyPhrasesExtractor 对象，默认新建一个
+    :param host: 监听地址
+    :param port: 监听端口，为 0 时由系统分配，可通过 self.port 获取
+    :param workers: 同时处理的批次数，即线程或进程数
+    :param backend: 'thread' 所有线程共用同一份模型；'process' 使用 fork 共享模型的进程池
+    :param max_batch_size: 每批最多文本篇数
+    :param max_wait: 攒批的最长等待时间（秒）
+    :param max_body_size: 请求体最大字节数
+    """
+    def __init__(self, extractor=None, host='127.0.0.1', port=8000, workers=4,
+                 backend='thread', max_batch_size=32, max_wait=0.01,
+                 max_body_size=10 * 1024 * 1024):
+        if backend not in ('process', 'thread'):
+            raise ValueError('`backend` must be `process` or `thread`.')
+        self.extractor = extractor if extractor is not None else ChineseKeyPhrasesExtractor()
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_body_size = max_body_size
+        self.metrics = ServerMetrics()
+
+        self._server = None
+        self._queue = None
+        self._batcher_task = None
+        self._executor = None
+        self._pool = None
+        self._slots = None
+        self._batch_tasks = set()
+
+    async def start(self):
+        ''' 启动服务，返回后即可接收请求 '''
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        if self.backend == 'thread':
+            self.extractor.warmup()  # 模型在首个请求之前加载，避免首批请求超时
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        else:
+            self._pool = parallel.create_pool(self.extractor, self.workers)
+
+        self._batcher_task = asyncio.ensure_future(self._batcher())
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        ''' 停止接收请求并释放线程池或进程池 '''
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._batcher_task is not None:
+            self._batcher_task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def extract(self, text, options):
+        ''' 将一篇文本加入攒批队列，并等待其结果 '''
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, options, future, time.perf_counter()))
+        return await future
+
+    async def _batcher(self):
+        ''' 按 max_batch_size 与 max_wait 将队列中的请求攒成批次，分发给工作线程或进程 '''
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()  # 所有工作者都在忙时不再分发，形成背压
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch):
+        items = [(text, options) for text, options, _, _ in batch]
+        self.metrics.record_batch(len(batch))
+        try:
+            results = await self._submit(items)
+        except Exception as e:
+            self.metrics.errors += 1
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            now = time.perf_counter()
+            # 每篇文本单独设置结果或异常，一篇出错不影响同批其它请求
+            for (_, _, future, begin), (result, error) in zip(batch, results):
+                self.metrics.record_document(now - begin)
+                if error is not None:
+                    self.metrics.errors += 1
+                if not future.done():
+                    if error is not None:
+                        future.set_exception(error)
+                    else:
+                        future.set_result(result)
+        finally:
+            self._slots.release()
+
+    def _submit(self, items):
+        loop = asyncio.get_running_loop()
+        if self._executor is not None:
+            return loop.run_in_executor(self._executor, _extract_batch, self.extractor, items)
+
+        future = loop.create_future()
+
+        def _callback(result):
+            loop.call_soon_threadsafe(_set_future, future, result, None)
+
+        def _error_callback(error):
+            loop.call_soon_threadsafe(_set_future, future, None, error)
+
+        self._pool.apply_async(parallel._extract_batch_worker, (items,),
+                               callback=_callback, error_callback=_error_callback)
+        return future
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write_response(writer, 400, {'error': 'bad request line'}, False)
+                    break
+
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get('connection', '').lower() != 'close' \
+                    and version.upper() == 'HTTP/1.1'
+                try:
+                    content_length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    await self._write_response(writer, 400, {'error': 'bad content-length'}, False)
+                    break
+                if content_length < 0 or content_length > self.max_body_size:
+                    await self._write_response(writer, 413, {'error': 'body too large'}, False)
+                    break
+                body = await reader.readexactly(content_length) if content_length else b''
+
+                status, payload = await self._route(method.upper(), path, body)
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        path = path.split('?', 1)[0]
+        if path == '/health':
+            return 200, {'status': 'ok'}
+        if path == '/metrics':
+            return 200, self.metrics.snapshot(queue_size=self._queue.qsize())
+        if path != '/extract':
+            return 404, {'error': 'not found'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+
+        self.metrics.requests += 1
+        try:
+            request = json.loads(body.decode('utf-8'))
+            if not isinstance(request, dict):
+                raise ValueError('request body must be a json object.')
+            options = {k: v for k, v in request.items() if k not in ('text', 'texts')}
+            unknown_options = set(options) - EXTRACT_OPTIONS
+            if unknown_options:
+                raise ValueError('unknown options: {}'.format(sorted(unknown_options)))
+            _check_options(options)
+
+            if 'texts' in request:
+                texts = request['texts']
+                if not isinstance(texts, list):
+                    raise ValueError('`texts` must be a list.')
+            elif 'text' in request:
+                texts = [request['text']]
+            else:
+                raise ValueError('`text` or `texts` is required.')
+            if not all(isinstance(text, str) for text in texts):
+                raise ValueError('texts must be strings.')
+        except ValueError as e:
+            self.metrics.errors += 1
+            return 400, {'error': str(e)}
+
+        try:
+            results = await asyncio.gather(*[self.extract(text, options) for text in texts])
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+        if 'texts' in request:
+            return 200, {'results': results}
+        return 200, {'phrases': results[0]}
+
+    async def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = ('HTTP/1.1 {} {}\r\n'
+                'Content-Type: application/json; charset=utf-8\r\n'
+                'Content-Length: {}\r\n'
+                'Connection: {}\r\n\r\n').format(
+                    status, _REASONS[status], len(body),
+                    'keep-alive' if keep_alive else 'close')
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+def _set_future(future, result, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def serve(extractor=None, **kwargs):
+    ''' 启动服务并阻塞运行，参数同 KeyphraseServer '''
+    server = KeyphraseServer(extractor=extractor, **kwargs)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m ckpe.server',
+                                     description='关键短语抽取 HTTP 服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=4, help='线程或进程数')
+    parser.add_argument('--backend', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=10.0, help='攒批最长等待毫秒数')
+    parser.add_argument('--model-bundle', default=None,
+                        help='由 python -m ckpe.bundle 编译的二进制模型包路径')
+    args = parser.parse_args()
+
+    serve(ChineseKeyPhrasesExtractor(model_bundle=args.model_bundle),
+          host=args.host, port=args.port, workers=args.workers, backend=args.backend,
+          max_batch_size=args.max_batch_size, max_wait=args.max_wait_ms / 1000)
@@ -0,0 +1,203 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/17 20:00
+# File Name: session.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+持续增长的文本（直播稿、新闻实时更新、讨论串）的增量抽取。
+
+每次追加几段文字后重新调用 extract_keyphrase，会对全文重新分词、重新打分。
+KeyphraseSession 保存此前各句子的分词结果、词频、token 总数与全部候选短语，追加文本时：
+    1、只对新增句子分词，并累加 freq_dict 与 total_length；
+    2、只在新增句子中生成候选短语，已出现过的短语保留最先出现的一个，与全文抽取一致；
+    3、候选短语的权重为 (sum(freq * idf) / total_length + 指定词加成) * 词性、长度权重 + 主题权重，
+       其中只有 sum(freq * idf) 随词频变化，每个短语保存这一分子，并由 词 -> 候选短语 的
+       倒排索引找到包含词频变化了的词的短语，只对它们重新求和。
+追加的耗时与新增文本的长度、受影响的短语数成正比，不对已有文本重新分词。
+
+取结果不是增量的：total_length 每次追加都会变化，全部短语的权重随之改变、相对次序可能
+交换，且 mmr 中一个短语是否被丢弃取决于所有比它长的短语，因此每次追加后首次取结果时，
+须对全部候选短语重新计算权重、做 mmr 去重与排序，耗时随会话中的候选短语总数增长；
+结果缓存至下一次追加。频繁追加且每次都取结果时，这一步是主要开销。
+
+各次追加的文本视为以句子边界分隔，结果与对 '\\n'.join(全部追加文本) 调用 extract_keyphrase
+一致（浮点误差以内），跨两次追加的成对括号不会被去除。KeyphraseSession 不是线程安全的。
+
+使用方法：
+    >>> session = ckpe_obj.create_session(top_k=10)
+    >>> session.append(first_paragraphs)
+    >>> session.keyphrases()
+    >>> session.append(new_paragraph)  # 仅处理新增段落
+    >>> session.keyphrases(with_weight=True)
+
+"""
+
+from collections import Counter
+
+
+class KeyphraseSession(object):
+    """
+    增量抽取会话，抽取参数在创建时确定
+    :param extractor: ChineseKeyPhrasesExtractor 对象，会话期间不应更新其 idf、停用词等资源
+    :param text: 初始文本，可为 None
+    :param kwargs: 与 extract_keyphrase 的参数一致，top_k、with_weight 为 keyphrases 的默认值
+    """
+    def __init__(self, extractor, text=None, **kwargs):
+        self.extractor = extractor
+        self.top_k, self.with_weight, options = extractor._bind_options(kwargs)
+        self.options = extractor._compile_lexicon(options)
+
+        self._pos_name_set, stricted_pos_name_set, pos_exception_set = extractor._pos_name_sets(
+            without_person_name=self.options['without_person_name'],
+            without_location_name=self.options['without_location_name'])
+        self._pos_sets = (stricted_pos_name_set, pos_exception_set)
+
+        self.sentences_segs_list = list()
+        self.freq_dict = Counter()
+        self.total_length = 0
+
+        # 短语 -> [token 列表, sum(freq * idf), 受词频影响的 (词, idf) 元组, 指定词加成之和,
+        #          词性与长度权重之积, 主题权重]
+        self._candidates = dict()
+        self._word_index = dict()  # 词 -> 包含该词且其权重受词频影响的短语集合
+        self._ranked_phrases = None
+
+        if text is not None:
+            self.append(text)
+
+    def __len__(self):
+        ''' 候选短语数 '''
+        return len(self._candidates)
+
+    def append(self, text):
+        """
+        追加一段文本，只对新增句子分词、生成候选短语，并更新受词频变化影响的短语
+        :param text: utf-8 编码中文文本
+        :return: 新增句子数
+        """
+        extractor = self.extractor
+        sentences = extractor._split_sentences(extractor._preprocessing_text(text))
+        if not sentences:
+            return 0
+        sentences_segs_list = extractor._cut_batch(sentences)
+        self.sentences_segs_list.extend(sentences_segs_list)
+
+        freq_delta, length_delta = extractor._word_freq(sentences_segs_list)
+        self.freq_dict.update(freq_delta)
+        self.total_length += length_delta
+
+        dirty_phrases = set()
+        for sen_segs in sentences_segs_list:
+            dirty_phrases.update(self._add_candidates(sen_segs))
+        for word in freq_delta:
+            dirty_phrases.update(self._word_index.get(word, ()))
+
+        freq_dict = self.freq_dict
+        for phrase in dirty_phrases:
+            candidate = self._candidates[phrase]
+            candidate[1] = sum(freq_dict[word] * idf for word, idf in candidate[2])
+
+        self._ranked_phrases = None
+        return len(sentences)
+
+    def _add_candidates(self, sen_segs):
+        """
+        在一个新增句子中生成候选短语，规则与 _candidate_phrases 一致，权重中随词频变化的
+        部分留待 append 统一计算
+        :return: 新增的短语列表
+        """
+        extractor = self.extractor
+        options = self.options
+        lexicon = options['lexicon']
+        specified_words = lexicon.specified_words
+        bias = options['bias']
+        stop_words = extractor.stop_words
+        idf_dict, median_idf = extractor.idf_dict, extractor.median_idf
+        pos_single_weights, pos_pair_weights = extractor._pos_weight_tables()
+
+        # 词权重仅用于 span 的权重和，此处不需要
+        token_features = extractor._token_features(
+            sen_segs, [0.0] * len(sen_segs), allow_topic_weight=options['allow_topic_weight'])
+        words, poses = token_features[0], token_features[1]
+        spans = extractor._candidate_spans(
+            token_features, pos_sets=self._pos_sets,
+            stricted_pos=options['stricted_pos'],
+            func_word_num=options['func_word_num'], stop_word_num=options['stop_word_num'],
+            max_phrase_len=options['max_phrase_len'], remove_words=lexicon.remove_words,
+            specified_words=specified_words)
+
+        new_phrases = list()
+        for n, i, _, prominence_sum in spans:
+            candidate_phrase_string = ''.join(words[i: i + n])
+            if candidate_phrase_string in self._candidates:
+                continue
+            if lexicon.has_phrase_rules and \
+                    lexicon.reject_phrase(candidate_phrase_string) is not None:
+                continue
+
+            # 与 _candidate_phrases 的条件六、七、八相同
+            if options['allow_pos_weight']:
+                if n == 1:
+                    pos_weight = pos_single_weights.get(poses[i], 1.0)
+                else:
+                    pos_weight = pos_pair_weights.get((poses[i], poses[i + n - 1]), 1.0)
+            else:
+                pos_weight = 1.0
+            if options['allow_length_weight']:
+                length_weight = extractor.phrases_length_control_dict.get(
+                    n, extractor.phrases_length_control_none)
+            else:
+                length_weight = 1.0
+            if options['allow_topic_weight']:
+                topic_weight = prominence_sum / n * options['topic_theta']
+            else:
+                topic_weight = 0.0
+
+            # 与 _word_weights 相同，虚词、停用词权重为 0，其余词权重为 freq * idf / total_length，
+            # 指定词另有固定的加成
+            terms = list()
+            bias_sum = 0.0
+            for word, pos in sen_segs[i: i + n]:
+                if pos not in self._pos_name_set or word in stop_words:
+                    continue
+                terms.append((word, idf_dict.get(word, median_idf)))
+                if word in specified_words:
+                    bias_sum += 1 / specified_words[word] if bias is None else bias
+
+            self._candidates[candidate_phrase_string] = [
+                sen_segs[i: i + n], 0.0, tuple(terms), bias_sum,
+                pos_weight * length_weight, topic_weight]
+            for word in set(word for word, _ in terms):
+                self._word_index.setdefault(word, set()).add(candidate_phrase_string)
+            new_phrases.append(candidate_phrase_string)
+
+        return new_phrases
+
+    def _rank(self):
+        ''' 对全部候选短语重新计算权重、做 mmr 去重并排序，耗时随候选短语总数增长，结果缓存至下一次追加 '''
+        if self._ranked_phrases is not None:
+            return self._ranked_phrases
+        if self.total_length == 0:
+            self._ranked_phrases = list()
+            return self._ranked_phrases
+
+        total_length = self.total_length
+        # _mmr_de_duplication 会修改传入的权重，故每次重新构造
+        self._ranked_phrases = self.extractor._finalize_candidates(
+            (phrase, [candidate[0],
+                      (candidate[1] / total_length + candidate[3]) * candidate[4] + candidate[5]])
+            for phrase, candidate in self._candidates.items())
+        return self._ranked_phrases
+
+    def keyphrases(self, top_k=None, with_weight=None):
+        """
+        返回当前全文的关键短语
+        :param top_k: 默认为创建会话时的 top_k，-1 返回所有短语
+        :param with_weight: 默认为创建会话时的 with_weight
+        :return: 关键短语及其权重
+        """
+        top_k = self.top_k if top_k is None else top_k
+        with_weight = self.with_weight if with_weight is None else with_weight
+        return self.extractor._select_top_k(self._rank(), top_k, with_weight)
@@ -0,0 +1,122 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 15:00
+# File Name: stream.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+import sys
+import json
+import queue
+from collections import deque
+from functools import partial
+
+from ckpe import parallel
+
+
+def read_documents(source, input_format=None, text_key='text', id_key='id'):
+    """
+    逐篇读取语料，返回 (doc_id, text) 生成器，不会一次性将语料读入内存
+    :param source: 文件路径（'-' 表示标准输入）、文件对象，或任意可迭代对象。
+        可迭代对象中的元素可以是 str、dict 或 (doc_id, text) 二元组
+    :param input_format: 'line' 每行一篇文本，'jsonl' 每行一个 json，
+        默认根据文件后缀判断，后缀为 .jsonl/.json 时按 jsonl 读取
+    :param text_key: jsonl 格式中文本所在的字段名
+    :param id_key: jsonl 格式中文档 id 所在的字段名，缺失时使用行号
+    """
+    if isinstance(source, str):
+        if input_format is None:
+            input_format = 'jsonl' if source.endswith(('.jsonl', '.json')) else 'line'
+        if source == '-':
+            yield from read_documents(sys.stdin, input_format=input_format,
+                                      text_key=text_key, id_key=id_key)
+            return
+        with open(source, 'r', encoding='utf-8') as f:
+            yield from read_documents(f, input_format=input_format,
+                                      text_key=text_key, id_key=id_key)
+        return
+
+    if input_format is None:
+        input_format = 'line'
+    if input_format not in ('line', 'jsonl'):
+        raise ValueError('`input_format` must be `line` or `jsonl`.')
+
+    for idx, item in enumerate(source):
+        if isinstance(item, tuple):
+            yield item
+            continue
+        if isinstance(item, str):
+            item = item.rstrip('\r\n')
+            if input_format == 'line':
+                yield idx, item
+                continue
+            if item.strip() == '':
+                continue
+            item = json.loads(item)
+        yield item.get(id_key, idx), item[text_key]
+
+
+def stream_extract(extractor, documents, n_jobs=1, window=64,
+                   ordered=False, **kwargs):
+    """
+    流水线式地抽取关键短语，同一时刻在处理中的文本不超过 window 篇
+    :param extractor: ChineseKeyPhrasesExtractor 对象
+    :param documents: (doc_id, text) 可迭代对象，可由 read_documents 生成
+    :param n_jobs: 进程数，为 1 时在当前进程逐篇处理，-1 或 None 表示使用全部 cpu
+    :param window: 处理中文本数的上限，用于控制内存，读取速度超过处理速度时会阻塞读取
+    :param ordered: 为 True 时按输入顺序返回，否则哪篇先处理完先返回哪篇
+    :param kwargs: 与 extract_keyphrase 的参数一致
+    :return: (doc_id, 关键短语) 生成器
+    """
+    if window < 1:
+        raise ValueError('`window` must be a positive integer.')
+
+    n_jobs = parallel.get_n_jobs(n_jobs)
+    if n_jobs == 1:
+        for doc_id, text in documents:
+            yield doc_id, extractor.extract_keyphrase(text, **kwargs)
+        return
+
+    func = partial(parallel._extract_worker, **kwargs)
+    with parallel.create_pool(extractor, n_jobs) as pool:
+        if ordered:
+            doc_ids = deque()
+
+            def _args():
+                for doc_id, text in documents:
+                    doc_ids.append(doc_id)
+                    yield (text,)
+
+            for phrases in parallel.imap_bounded(pool, func, _args(), window):
+                yield doc_ids.popleft(), phrases
+            return
+
+        done = queue.Queue()
+        in_flight = 0
+        for doc_id, text in documents:
+            pool.apply_async(
+                func, (text,),
+                callback=partial(_put_result, done, doc_id),
+                error_callback=partial(_put_error, done, doc_id))
+            in_flight += 1
+            if in_flight >= window:
+                yield _get_result(done)
+                in_flight -= 1
+        while in_flight > 0:
+            yield _get_result(done)
+            in_flight -= 1
+
+
+def _put_result(done, doc_id, phrases):
+    done.put((doc_id, phrases, None))
+
+
+def _put_error(done, doc_id, error):
+    done.put((doc_id, None, error))
+
+
+def _get_result(done):
+    doc_id, phrases, error = done.get()
+    if error is not None:
+        raise error
+    return doc_id, phrases
@@ -0,0 +1,150 @@
+# -*- encoding=utf-8 -*-
+# ------------------------------------
+# Create On 2026/10/16 17:00
+# File Name: topic_model.py
+# Edit Author: dongrixinyu
+# ------------------------------------
+
+"""
+根据 lda 主题模型计算词汇的主题突出度（Salience Rank 中的 KL 散度形式）。
+p(topic|word) 以稀疏的 (行, 值) 数组表示，按词分块展开计算，结果与原逐词实现逐位一致。
+
+支持的主题模型输入：
+    1、ckpe 自带的 json 格式：
+        topic_word: {word: {topic_id: p(topic|word)}}
+        word_topic: {topic_id: {word: p(word|topic)}}
+    2、numpy 数组或 scipy 稀疏矩阵，需同时给出词表 vocab：
+        topic_word: shape 为 (word_num, topic_num) 的 p(topic|word)
+        word_topic: shape 为 (topic_num, word_num) 的 p(word|topic)，
+            如 gensim 的 `lda.get_topics()`、sklearn 的 `lda.components_`
+    3、gensim 的 LdaModel 对象，作为 word_topic 传入，词表取自 `lda.id2word`
+
+"""
+
+import numpy as np
+
+
+# p(topic|word) 中缺失的主题，其概率取该值
+MISSING_TOPIC_PROB = 1e-5
+# 计算 KL 散度时每次展开为稠密矩阵的词数，限制内存占用
+BLOCK_ROWS = 4096
+
+
+def topic_prominence(topic_word=None, word_topic=None, vocab=None):
+    """
+    计算词表中每个词汇归一化后的主题突出度
+    :param topic_word: p(topic|word)，格式见模块说明
+    :param word_topic: p(word|topic)，格式见模块说明。若未给出 topic_word，
+        则按主题均匀先验，由 p(word|topic) 计算 p(topic|word)
+    :param vocab: (list) 词表，topic_word 或 word_topic 为矩阵时必须给出
+    :return: (词表, 归一化主题突出度 np.ndarray, topic_num)
+    """
+    if word_topic is not None and hasattr(word_topic, 'get_topics'):
+        # gensim LdaModel
+        if vocab is None:
+            vocab = [word_topic.id2word[i] for i in range(len(word_topic.id2word))]
+        word_topic = word_topic.get_topics()
+
+    if topic_word is None and word_topic is None:
+        raise ValueError('at least one of `topic_word` and `word_topic` must be given.')
+
+    if topic_word is None:
+        vocab, rows, cols, probs, topic_num = _word_topic_to_topic_word(word_topic, vocab)
+    elif isinstance(topic_word, dict):
+        vocab, rows, cols, probs, topic_num = _dict_to_coo(topic_word)
+        if word_topic is not None:
+            topic_num = _get_topic_num(word_topic)
+    else:
+        if vocab is None:
+            raise ValueError('`vocab` must be given when `topic_word` is a matrix.')
+        rows, cols, probs = _matrix_to_coo(topic_word)
+        topic_num = topic_word.shape[1]
+        vocab = list(vocab)
+
+    word_num = len(vocab)
+    if word_num == 0:
+        raise ValueError('the topic model has an empty vocabulary.')
+
+    # KL 散度 sum_t p(t|w) * log2(p(t|w) * topic_num)，缺失主题概率取 1e-5。
+    # 每个词的求和须与原逐词实现一样使用 np.dot，浮点累加顺序不同会导致权重相差
+    # 若干 ulp，使排序中权重相同的短语先后颠倒，故按行分块展开为稠密矩阵后逐行 np.dot
+    kl_div = np.empty(word_num, dtype=np.float64)
+    valid = cols < topic_num  # 编号超出主题数的主题不参与计算，与原实现一致
+    rows, cols, probs = rows[valid], cols[valid], probs[valid]
+    order = np.argsort(rows, kind='stable')
+    rows, cols, probs = rows[order], cols[order], probs[order]
+    for start in range(0, word_num, BLOCK_ROWS):
+        end = min(start + BLOCK_ROWS, word_num)
+        lo, hi = np.searchsorted(rows, [start, end])
+        block = np.full((end - start, topic_num), MISSING_TOPIC_PROB, dtype=np.float64)
+        block[rows[lo: hi] - start, cols[lo: hi]] = probs[lo: hi]
+        log_block = np.log2(block * topic_num)
+        for idx in range(end - start):
+            kl_div[start + idx] = np.dot(block[idx], log_block[idx])
+
+    max_prominence = kl_div.max()
+    min_prominence = kl_div.min()
+    prominence = (kl_div - min_prominence) / (max_prominence - min_prominence)
+
+    return vocab, prominence, topic_num
+
+
+def _get_topic_num(word_topic):
+    if isinstance(word_topic, dict):
+        return len(word_topic)
+    return word_topic.shape[0]
+
+
+def _dict_to_coo(topic_word):
+    ''' 将 {word: {topic_id: prob}} 转换为稀疏坐标数组 '''
+    vocab = list(topic_word.keys())
+    lengths = np.fromiter((len(topic_word[word]) for word in vocab),
+                          dtype=np.int64, count=len(vocab))
+    rows = np.repeat(np.arange(len(vocab)), lengths)
+    cols = np.fromiter((int(topic) for word in vocab for topic in topic_word[word]),
+                       dtype=np.int64, count=int(lengths.sum()))
+    probs = np.fromiter((prob for word in vocab for prob in topic_word[word].values()),
+                        dtype=np.float64, count=int(lengths.sum()))
+    topic_num = int(cols.max()) + 1 if len(cols) > 0 else 0
+    return vocab, rows, cols, probs, topic_num
+
+
+def _matrix_to_coo(matrix):
+    ''' 将 numpy 数组或 scipy 稀疏矩阵转换为稀疏坐标数组，0 值视为缺失 '''
+    if hasattr(matrix, 'tocoo'):
+        coo = matrix.tocoo()
+        rows, cols, probs = coo.row, coo.col, coo.data
+    else:
+        matrix = np.asarray(matrix, dtype=np.float64)
+        rows, cols = np.nonzero(matrix)
+        probs = matrix[rows, cols]
+    mask = probs > 0
+    return (rows[mask].astype(np.int64), cols[mask].astype(np.int64),
+            probs[mask].astype(np.float64))
+
+
+def _word_topic_to_topic_word(word_topic, vocab):
+    ''' 由 p(word|topic) 按主题均匀先验计算 p(topic|word) '''
+    if isinstance(word_topic, dict):
+        topics = sorted(word_topic.keys(), key=int)
+        vocab = sorted(set(word for topic in topics for word in word_topic[topic]))
+        word_index = {word: idx for idx, word in enumerate(vocab)}
+        matrix = np.zeros((len(topics), len(vocab)), dtype=np.float64)
+        for topic_idx, topic in enumerate(topics):
+            for word, prob in word_topic[topic].items():
+                matrix[topic_idx, word_index[word]] = prob
+    else:
+        if vocab is None:
+            raise ValueError('`vocab` must be given when `word_topic` is a matrix.')
+        vocab = list(vocab)
+        matrix = word_topic.toarray() if hasattr(word_topic, 'toarray') else word_topic
+        matrix = np.asarray(matrix, dtype=np.float64)
+
+    # sklearn 的 components_ 未归一化，先按主题归一化为 p(word|topic)
+    matrix = matrix / matrix.sum(axis=1, keepdims=True)
+    word_sum = matrix.sum(axis=0)
+    word_sum[word_sum == 0] = 1.0
+    topic_word = (matrix / word_sum).T
+
+    rows, cols, probs = _matrix_to_coo(topic_word)
+    return vocab, rows, cols, probs, matrix.shape[0]